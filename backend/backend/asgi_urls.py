@@ -0,0 +1,17 @@
+"""URL configuration for requests served through backend.asgi.
+
+The read-heavy endpoints below resolve to their async twins; everything else
+falls through to the regular URLconf. myapp.middleware.AsyncRoutesMiddleware
+selects this module for ASGI requests.
+"""
+from django.urls import include, path
+
+from myapp.views import async_views
+
+urlpatterns = [
+    path('api/events/', async_views.user_event_list),
+    path('api/availability/filter/', async_views.filtered_user_events),
+    path('api/groups/my-groups/', async_views.my_groups),
+    path('api/groups/<int:group_id>/members/', async_views.get_group_members),
+    path('', include('backend.urls')),
+]
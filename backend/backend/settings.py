@@ -37,6 +37,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.metrics_middleware',
+    'myapp.middleware.async_routes_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -161,3 +163,28 @@ EMAIL_USE_TLS = config("EMAIL_USE_TLS", cast=bool, default=False)
 EMAIL_USE_SSL = config("EMAIL_USE_SSL", cast=bool, default=True)
 DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL")
 
+GOOGLE_CALENDAR_API_BASE = config("GOOGLE_CALENDAR_API_BASE", default="https://www.googleapis.com/calendar/v3")
+GOOGLE_CALENDAR_MAX_WORKERS = config("GOOGLE_CALENDAR_MAX_WORKERS", cast=int, default=8)
+
+CACHES = {
+    'default': {
+        'BACKEND': config("CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"),
+        'LOCATION': config("CACHE_LOCATION", default="team-availability-calendar"),
+    }
+}
+
+# Seconds a rendered calendar page may be served from cache; writes invalidate it earlier.
+CALENDAR_CACHE_TIMEOUT = 300
+
+# Pub/sub behind api/events/stream/. The in-process broker only reaches streams
+# served by the same worker; multi-worker deployments plug in a shared one.
+PUSH_BROKER = config("PUSH_BROKER", default="myapp.push.InProcessBroker")
+PUSH_QUEUE_SIZE = config("PUSH_QUEUE_SIZE", cast=int, default=256)
+
+# Per-route latency, query and cache metrics served at /metrics. Values are kept
+# per worker process; METRICS_TOKEN, when set, must be sent as a bearer token.
+METRICS_ENABLED = config("METRICS_ENABLED", cast=bool, default=False)
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
+# Event list responses of at least this many bytes are gzipped for clients that accept it.
+GZIP_MIN_BYTES = config("GZIP_MIN_BYTES", cast=int, default=16384)
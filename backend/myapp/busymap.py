@@ -0,0 +1,244 @@
+"""Per-user busy bitmaps kept in UserBusyDay rows.
+
+A row packs one user's day into SLOTS_PER_DAY bits, little-endian: bit i is
+set when a solo event of the user, or an event of one of their groups,
+covers the i-th 15-minute slot. Signals recompute the (user, day) pairs a
+change touches, so availability reads fetch one row per member and day and
+combine them bitwise instead of comparing event rows. refresh() reports the
+bitmaps that changed, from which the group heatmap is kept. Recurring series
+are not stored; readers expand them.
+
+NumPy, when installed, decodes large batches of bitmaps at once.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .freebusy import MINUTES_PER_DAY, time_to_minutes
+from .models import GroupMembership, UserBusyDay, UserEvent
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = MINUTES_PER_DAY // SLOT_MINUTES
+BITMAP_BYTES = SLOTS_PER_DAY // 8
+
+# Below this many bitmaps the pure Python decoding is as fast as NumPy's.
+NUMPY_MIN_BITMAPS = 64
+# (user, day) pairs recomputed per query.
+REFRESH_BATCH = 2000
+# Days OR-ed into one statement; keeps it within SQLite's expression depth.
+UPDATE_BATCH_DAYS = 200
+
+EVENT_COLUMNS = ('type', 'user_id', 'group_id', 'date', 'start_time', 'end_time')
+TEMPORAL_COLUMNS = {'date', 'start_time', 'end_time'}
+
+
+def mask(start_time, end_time):
+    """Bits of the slots an event touches; an end at or before the start runs until midnight."""
+    start, end = time_to_minutes(start_time), time_to_minutes(end_time)
+    if end <= start:
+        end = MINUTES_PER_DAY
+    first, stop = start // SLOT_MINUTES, -(-end // SLOT_MINUTES)
+    return ((1 << (stop - first)) - 1) << first
+
+
+def to_bytes(bits):
+    return bits.to_bytes(BITMAP_BYTES, 'little')
+
+
+def from_bytes(value):
+    return int.from_bytes(value, 'little')
+
+
+def runs(bits):
+    """(first, stop) slot of every run of busy slots, in order."""
+    slot = 0
+    while bits:
+        skip = (bits & -bits).bit_length() - 1
+        bits >>= skip
+        slot += skip
+        length = (~bits & (bits + 1)).bit_length() - 1
+        yield slot, slot + length
+        bits >>= length
+        slot += length
+
+
+def all_runs(bitmaps):
+    """(index, first, stop) of every run in a list of stored bitmaps."""
+    if numpy is None or len(bitmaps) < NUMPY_MIN_BITMAPS:
+        return [(index, first, stop) for index, value in enumerate(bitmaps) for first, stop in runs(from_bytes(value))]
+    # One flat bit array; the zero byte after each bitmap keeps runs from crossing rows.
+    width = (BITMAP_BYTES + 1) * 8
+    bits = numpy.unpackbits(numpy.frombuffer(b'\0'.join(bitmaps) + b'\0', dtype=numpy.uint8), bitorder='little')
+    edges = numpy.diff(bits.view(numpy.int8), prepend=numpy.int8(0))
+    starts, stops = numpy.flatnonzero(edges == 1), numpy.flatnonzero(edges == -1)
+    rows, firsts = numpy.divmod(starts, width)
+    return list(zip(rows.tolist(), firsts.tolist(), (stops - rows * width).tolist()))
+
+
+def event_row(event):
+    """The EVENT_COLUMNS of a UserEvent instance as a tuple."""
+    # Dates and times may still be strings on an instance saved from raw input.
+    return tuple(
+        UserEvent._meta.get_field(column).to_python(getattr(event, column)) if column in TEMPORAL_COLUMNS
+        else getattr(event, column)
+        for column in EVENT_COLUMNS
+    )
+
+
+def day_bitmaps(rows, members, keys=None):
+    """{(user_id, date): bits} of EVENT_COLUMNS ``rows``; ``members`` maps group ids to user ids.
+
+    With ``keys`` only those pairs are filled, all of them, free ones as 0.
+    """
+    bits = defaultdict(int) if keys is None else dict.fromkeys(keys, 0)
+    for event_type, user_id, group_id, day, start_time, end_time in rows:
+        span = mask(start_time, end_time)
+        for owner in ((user_id,) if event_type == 'solo' else members.get(group_id, ())):
+            if keys is None or (owner, day) in bits:
+                bits[owner, day] |= span
+    return bits
+
+
+def _members(group_ids):
+    members = defaultdict(list)
+    if not group_ids:
+        return members
+    for group_id, user_id in GroupMembership.objects.filter(group_id__in=group_ids).values_list('group_id', 'user_id'):
+        members[group_id].append(user_id)
+    return members
+
+
+def keys_of(rows):
+    """(user_id, date) pairs whose bitmaps the EVENT_COLUMNS ``rows`` touch."""
+    rows = list(rows)
+    members = _members({group_id for event_type, _, group_id, *_ in rows if event_type == 'group' and group_id})
+    keys = set()
+    for event_type, user_id, group_id, day, *_ in rows:
+        owners = (user_id,) if event_type == 'solo' else members.get(group_id, ())
+        keys.update((owner, day) for owner in owners if owner is not None)
+    return keys
+
+
+def refresh(keys):
+    """Recompute the bitmaps of (user_id, date) pairs from their events.
+
+    Returns {(user_id, date): (old bits, new bits)} for the bitmaps that changed.
+    """
+    keys = sorted(set(keys), key=lambda key: (key[1], key[0]))
+    changes = {}
+    for offset in range(0, len(keys), REFRESH_BATCH):
+        changes.update(_refresh(keys[offset:offset + REFRESH_BATCH]))
+    return changes
+
+
+def _refresh(keys):
+    user_ids = {user_id for user_id, _ in keys}
+    days = {day for _, day in keys}
+    groups = defaultdict(list)
+    for user_id, group_id in GroupMembership.objects.filter(user_id__in=user_ids).values_list('user_id', 'group_id'):
+        groups[group_id].append(user_id)
+    rows = UserEvent.objects.filter(date__in=days).filter(
+        Q(type='solo', user_id__in=user_ids) | Q(type='group', group_id__in=list(groups))
+    ).order_by().values_list(*EVENT_COLUMNS)
+    bits = day_bitmaps(rows, groups, keys)
+    old = UserBusyDay.objects.filter(user_id__in=user_ids, date__in=days).values_list('user_id', 'date', 'slots')
+    old = {(user_id, day): from_bytes(slots) for user_id, day, slots in old if (user_id, day) in bits}
+    changes = {key: (old.get(key, 0), value) for key, value in bits.items() if old.get(key, 0) != value}
+
+    UserBusyDay.objects.bulk_create(
+        [UserBusyDay(user_id=user_id, date=day, slots=to_bytes(new))
+         for (user_id, day), (_, new) in changes.items() if new],
+        update_conflicts=True, unique_fields=['user', 'date'], update_fields=['slots'],
+    )
+    free = defaultdict(list)
+    for (user_id, day), (_, new) in changes.items():
+        if not new:
+            free[day].append(user_id)
+    free = list(free.items())
+    for offset in range(0, len(free), UPDATE_BATCH_DAYS):
+        cells = Q()
+        for day, free_users in free[offset:offset + UPDATE_BATCH_DAYS]:
+            cells |= Q(date=day, user_id__in=free_users)
+        UserBusyDay.objects.filter(cells).delete()
+    return changes
+
+
+def event_saved(event, previous):
+    """Refresh the days a created or edited UserEvent covered and covers."""
+    current = event_row(event)
+    old = tuple(previous[column] for column in EVENT_COLUMNS) if previous else None
+    if old == current:
+        return {}
+    return refresh(keys_of([current, old] if old else [current]))
+
+
+def events_created(events):
+    """Bulk-created events skip the model signals."""
+    return refresh(keys_of(event_row(event) for event in events))
+
+
+def _group_days(group_id):
+    return set(UserEvent.objects.filter(type='group', group_id=group_id).order_by().values_list('date', flat=True))
+
+
+def group_keys(group_id):
+    """Every (member, day) on which ``group_id`` has events."""
+    member_ids = list(GroupMembership.objects.filter(group_id=group_id).values_list('user_id', flat=True))
+    return {(user_id, day) for day in _group_days(group_id) for user_id in member_ids}
+
+
+def membership_changed(user_id, group_id):
+    """Refresh the days a member gained or lost through ``group_id``'s events."""
+    return refresh((user_id, day) for day in _group_days(group_id))
+
+
+@transaction.atomic
+def rebuild(user_ids):
+    """Recompute all bitmaps of ``user_ids`` from scratch."""
+    user_ids = list(user_ids)
+    for offset in range(0, len(user_ids), REFRESH_BATCH):
+        chunk = user_ids[offset:offset + REFRESH_BATCH]
+        UserBusyDay.objects.filter(user_id__in=chunk).delete()
+        groups = defaultdict(list)
+        for user_id, group_id in GroupMembership.objects.filter(user_id__in=chunk).values_list('user_id', 'group_id'):
+            groups[group_id].append(user_id)
+        rows = UserEvent.objects.filter(
+            Q(type='solo', user_id__in=chunk) | Q(type='group', group_id__in=list(groups))
+        ).order_by().values_list(*EVENT_COLUMNS).iterator()
+        bits = day_bitmaps(rows, groups)
+        UserBusyDay.objects.bulk_create(
+            [UserBusyDay(user_id=user_id, date=day, slots=to_bytes(value)) for (user_id, day), value in bits.items()],
+            batch_size=5000,
+        )
+
+
+def load(user_ids, start_date, end_date):
+    """(user_id, date, slots) of the stored busy days of ``user_ids`` in a window."""
+    return list(UserBusyDay.objects.filter(
+        user_id__in=user_ids, date__range=(start_date, end_date)
+    ).order_by().values_list('user_id', 'date', 'slots'))
+
+
+def fill_window(window, user_ids, start_date, end_date):
+    """Add the stored busy time of ``user_ids`` to a FreeBusyWindow."""
+    rows = load(user_ids, start_date, end_date)
+    for index, first, stop in all_runs([slots for _, _, slots in rows]):
+        user_id, day, _ = rows[index]
+        window.add_minutes(user_id, day, first * SLOT_MINUTES, stop * SLOT_MINUTES)
+
+
+def busy_users(user_ids, day, start_time, end_time):
+    """Those of ``user_ids`` with stored events in the slots ``start_time``-``end_time`` touches.
+
+    The check works on whole 15-minute slots, so it may report events that
+    only share a slot; callers needing exact overlaps recheck these users.
+    """
+    wanted = mask(start_time, end_time)
+    rows = UserBusyDay.objects.filter(user_id__in=user_ids, date=day).values_list('user_id', 'slots')
+    return {user_id for user_id, slots in rows if from_bytes(slots) & wanted}
@@ -0,0 +1,107 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+from .models import GroupMembership
+
+VERSION_KEY = "calendar:version:{user_id}"
+# "page2": entries hold (next cursor, data) since pages stopped caching their next link.
+PAGE_KEY = "calendar:page2:{user_id}:{version}:{params}"
+HITS_KEY = "calendar:stats:hits"
+MISSES_KEY = "calendar:stats:misses"
+
+
+def _timeout():
+    return getattr(settings, "CALENDAR_CACHE_TIMEOUT", 300)
+
+
+def get_version(user_id):
+    """Current calendar version of a user, created on first use.
+
+    Invalidation deletes the version key, so every cached page of that user
+    becomes unreachable at once and simply expires later.
+    """
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(user_id):
+    key = VERSION_KEY.format(user_id=user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key)
+    return version
+
+
+def invalidate_users(user_ids):
+    cache.delete_many([VERSION_KEY.format(user_id=user_id) for user_id in set(user_ids) if user_id])
+
+
+def invalidate_groups(group_ids):
+    group_ids = [group_id for group_id in set(group_ids) if group_id]
+    if group_ids:
+        invalidate_users(GroupMembership.objects.filter(group_id__in=group_ids).values_list('user_id', flat=True))
+
+
+def invalidate_event_owners(owners):
+    """Invalidate for (user_id, group_id) pairs of changed events."""
+    owners = list(owners)
+    invalidate_users(user_id for user_id, _ in owners)
+    invalidate_groups(group_id for _, group_id in owners)
+
+
+def page_key(user_id, params):
+    return PAGE_KEY.format(user_id=user_id, version=get_version(user_id), params=_encode_params(params))
+
+
+def _encode_params(params):
+    return "&".join(f"{name}={params.get(name, '')}" for name in sorted(params))
+
+
+async def apage_key(user_id, params):
+    return PAGE_KEY.format(user_id=user_id, version=await aget_version(user_id), params=_encode_params(params))
+
+
+def get_page(key):
+    data = cache.get(key)
+    metrics.cache_lookup('calendar', data is not None)
+    try:
+        cache.incr(HITS_KEY if data is not None else MISSES_KEY)
+    except ValueError:
+        cache.add(HITS_KEY if data is not None else MISSES_KEY, 1, None)
+    return data
+
+
+async def aget_page(key):
+    data = await cache.aget(key)
+    metrics.cache_lookup('calendar', data is not None)
+    try:
+        await cache.aincr(HITS_KEY if data is not None else MISSES_KEY)
+    except ValueError:
+        await cache.aadd(HITS_KEY if data is not None else MISSES_KEY, 1, None)
+    return data
+
+
+# Pages are stored as (next cursor, data without 'next'): the next link is
+# built from each request's own URL, whose format and other parameters are
+# not part of the key.
+def set_page(key, next_cursor, data):
+    cache.set(key, (next_cursor, data), _timeout())
+
+
+async def aset_page(key, next_cursor, data):
+    await cache.aset(key, (next_cursor, data), _timeout())
+
+
+def stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
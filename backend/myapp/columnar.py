@@ -0,0 +1,136 @@
+"""Columnar encoding of event lists, served for ``?format=columnar``.
+
+A page of events becomes one array per field instead of one object per row:
+
+* ``type``, ``description``, ``location``, ``user``, ``group`` and
+  ``google_event_id`` are dictionary encoded: ``{"values": [...], "index": [...]}``;
+* ``date`` is ``{"start": "YYYY-MM-DD", "delta": [...]}``, days after the
+  previous row (the first delta is 0);
+* ``start_time`` is seconds after midnight, ``end_time`` seconds after
+  ``start_time``;
+* ``created_at`` and ``updated_at`` are microseconds since the Unix epoch;
+* everything else is a plain array.
+
+Each block states its ``encoding`` so clients can decode it generically;
+decode() is the reference implementation.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+
+FORMAT = 'columnar/1'
+
+DICTIONARY_FIELDS = {'type', 'description', 'location', 'user', 'group', 'google_event_id'}
+TIMESTAMP_FIELDS = {'created_at', 'updated_at'}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+# Dates and times repeat a lot within a window; parse each distinct one once.
+@lru_cache(maxsize=4096)
+def _seconds(value):
+    moment = time.fromisoformat(value)
+    seconds = moment.hour * 3600 + moment.minute * 60 + moment.second
+    return seconds + moment.microsecond / 1_000_000 if moment.microsecond else seconds
+
+
+def _dictionary(column):
+    positions = {}
+    index = [positions.setdefault(value, len(positions)) for value in column]
+    return {'values': list(positions), 'index': index}
+
+
+@lru_cache(maxsize=4096)
+def _ordinal(value):
+    return date.fromisoformat(value).toordinal()
+
+
+def _dates(column):
+    days = [_ordinal(value) for value in column]
+    deltas = [current - previous for previous, current in zip([days[0]] + days, days)]
+    return {'start': column[0], 'delta': deltas}
+
+
+def _timestamp(value):
+    if value is None:
+        return None
+    # Exact: epoch microseconds stay far below 2 ** 53.
+    return round(datetime.fromisoformat(value).timestamp() * 1_000_000)
+
+
+def encode_rows(rows):
+    """(columns, encoding) for a list of event-shaped dicts."""
+    if not rows:
+        return {}, {}
+    columns, encoding = {}, {}
+    for name in rows[0]:
+        column = [row[name] for row in rows]
+        if name in DICTIONARY_FIELDS:
+            columns[name], encoding[name] = _dictionary(column), 'dictionary'
+        elif name == 'date':
+            columns[name], encoding[name] = _dates(column), 'delta_days'
+        elif name == 'start_time':
+            columns[name], encoding[name] = [_seconds(value) for value in column], 'seconds'
+        elif name == 'end_time' and 'start_time' in rows[0]:
+            starts = [_seconds(row['start_time']) for row in rows]
+            columns[name] = [_seconds(value) - start for value, start in zip(column, starts)]
+            encoding[name] = 'seconds_after_start'
+        elif name in TIMESTAMP_FIELDS:
+            columns[name], encoding[name] = [_timestamp(value) for value in column], 'epoch_us'
+        else:
+            columns[name], encoding[name] = column, 'plain'
+    return columns, encoding
+
+
+def encode(data):
+    """Columnar form of a paginated event list (``next``, ``results``, ``occurrences``)."""
+    encoded = {'format': FORMAT, 'next': data.get('next'), 'count': len(data['results'])}
+    for key in ('results', 'occurrences'):
+        if key in data:
+            columns, encoding = encode_rows(data[key])
+            encoded[key] = {'count': len(data[key]), 'encoding': encoding, 'columns': columns}
+    return encoded
+
+
+def _clock(seconds):
+    moment = datetime.combine(date.min, time()) + timedelta(seconds=seconds)
+    return moment.time().isoformat()
+
+
+def _iso_timestamp(value):
+    if value is None:
+        return None
+    moment = (_EPOCH + timedelta(microseconds=value)).isoformat()
+    return moment[:-6] + 'Z' if moment.endswith('+00:00') else moment
+
+
+def _decode_block(block):
+    count, columns, encoding = block['count'], block['columns'], block['encoding']
+    decoded, seconds = {}, {}
+    for name, column in columns.items():
+        kind = encoding[name]
+        if kind == 'dictionary':
+            decoded[name] = [column['values'][position] for position in column['index']]
+        elif kind == 'delta_days':
+            day, values = date.fromisoformat(column['start']).toordinal(), []
+            for delta in column['delta']:
+                day += delta
+                values.append(date.fromordinal(day).isoformat())
+            decoded[name] = values
+        elif kind == 'seconds':
+            seconds[name] = column
+            decoded[name] = [_clock(value) for value in column]
+        elif kind == 'seconds_after_start':
+            decoded[name] = [_clock(start + value) for start, value in zip(seconds['start_time'], column)]
+        elif kind == 'epoch_us':
+            decoded[name] = [_iso_timestamp(value) for value in column]
+        else:
+            decoded[name] = column
+    return [{name: values[position] for name, values in decoded.items()} for position in range(count)]
+
+
+def decode(encoded):
+    """The rows of a columnar payload as the JSON format lists them.
+
+    Timestamps come back in UTC, whatever the server's time zone.
+    """
+    return {key: _decode_block(encoded[key]) for key in ('results', 'occurrences') if key in encoded}
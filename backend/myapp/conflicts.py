@@ -0,0 +1,128 @@
+"""Overlap checks for new events.
+
+Two events conflict when they have the same owner (the user of a solo
+event, the group of a group event), the same date and
+``start_time < other.end_time AND end_time > other.start_time``; an end at
+or before the start runs until midnight. Existing events are read through
+the owner + date indexes of UserEvent; a submitted batch is checked against
+them and against itself with one IntervalTree.
+"""
+from django.db.models import F, Q
+
+from .freebusy import MINUTES_PER_DAY, time_to_minutes
+from .models import UserEvent
+
+# Values of the ``conflicts`` query parameter: create anyway, refuse the
+# whole request, or (batches only) create just the slots that fit.
+ALLOW, REJECT, SKIP = 'allow', 'reject', 'skip'
+
+
+class EventConflictError(Exception):
+    def __init__(self, conflicts):
+        super().__init__(f"{len(conflicts)} conflicting event(s)")
+        self.conflicts = conflicts
+
+
+def conflict_mode(request, modes=(ALLOW, REJECT, SKIP)):
+    """The requested mode, or None when it is not one of ``modes``."""
+    mode = request.query_params.get('conflicts') or ALLOW
+    return mode if mode in modes else None
+
+
+def span(day, start_time, end_time):
+    """[start, end) of an event in minutes since day one, for comparing across dates."""
+    start, end = time_to_minutes(start_time), time_to_minutes(end_time)
+    if end <= start:
+        end = MINUTES_PER_DAY
+    base = day.toordinal() * MINUTES_PER_DAY
+    return base + start, base + end
+
+
+class IntervalTree:
+    """Static interval tree over half-open [start, end) intervals.
+
+    The intervals are sorted by start and read as an implicit balanced binary
+    tree, every node keeping the largest end below it, so overlapping() visits
+    O(log n + k) nodes for k results.
+    """
+
+    def __init__(self, intervals):
+        self.intervals = sorted(intervals, key=lambda interval: interval[0])
+        self.max_end = [0] * len(self.intervals)
+        self._build(0, len(self.intervals))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return float('-inf')
+        mid = (lo + hi) // 2
+        self.max_end[mid] = max(self.intervals[mid][1], self._build(lo, mid), self._build(mid + 1, hi))
+        return self.max_end[mid]
+
+    def overlapping(self, start, end):
+        """Items of the intervals overlapping [start, end)."""
+        found = []
+        pending = [(0, len(self.intervals))]
+        while pending:
+            lo, hi = pending.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] <= start:
+                continue
+            pending.append((lo, mid))
+            interval_start, interval_end, item = self.intervals[mid]
+            if interval_start < end:
+                if interval_end > start:
+                    found.append(item)
+                pending.append((mid + 1, hi))
+        return found
+
+
+def _owner_filter(event_type, user_id, group_id):
+    if event_type == 'solo':
+        return Q(type='solo', user_id=user_id)
+    return Q(type='group', group_id=group_id)
+
+
+def overlapping_events(event_type, user_id, group_id, day, start_time, end_time):
+    """Existing events of the same owner overlapping one new event."""
+    start, end = time_to_minutes(start_time), time_to_minutes(end_time)
+    events = UserEvent.objects.filter(_owner_filter(event_type, user_id, group_id), date=day).filter(
+        # Events running until midnight end at or before their start.
+        Q(end_time__gt=start_time) | Q(end_time__lte=F('start_time'))
+    )
+    if end > start:
+        events = events.filter(start_time__lt=end_time)
+    return events.order_by('start_time', 'id')
+
+
+def batch_conflicts(event_type, user_id, group_id, slots, mode):
+    """Check (date, start_time, end_time) ``slots`` against their owner's events and each other.
+
+    Returns the indexes of the slots to create and the conflicts found:
+    ``{"slot": i, "event": id}`` for an existing event and
+    ``{"slot": i, "other_slot": j}`` for an earlier slot of the batch. In
+    SKIP mode a slot overlapping only skipped slots is still created.
+    """
+    existing = UserEvent.objects.filter(
+        _owner_filter(event_type, user_id, group_id), date__in={day for day, _, _ in slots}
+    ).order_by().values_list('id', 'date', 'start_time', 'end_time')
+    intervals = [(*span(day, start_time, end_time), ('event', event_id))
+                 for event_id, day, start_time, end_time in existing]
+    intervals += [(*span(*slot), ('slot', index)) for index, slot in enumerate(slots)]
+    tree = IntervalTree(intervals)
+
+    keep, conflicts = [], []
+    kept = set()
+    for index, slot in enumerate(slots):
+        found = []
+        for kind, other in sorted(tree.overlapping(*span(*slot))):
+            if kind == 'event':
+                found.append({"slot": index, "event": other})
+            elif other < index and (mode != SKIP or other in kept):
+                found.append({"slot": index, "other_slot": other})
+        conflicts.extend(found)
+        if not found:
+            keep.append(index)
+            kept.add(index)
+    return keep, conflicts
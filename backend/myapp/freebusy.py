@@ -0,0 +1,193 @@
+from array import array
+from bisect import bisect_right
+from heapq import heappush, heapreplace
+from datetime import timedelta
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def time_to_minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def merge_intervals(points):
+    """Sort and coalesce a flat [start, end, start, end, ...] array."""
+    pairs = sorted(zip(points[0::2], points[1::2]))
+    merged = array('l')
+    for start, end in pairs:
+        if merged and start <= merged[-1]:
+            if end > merged[-1]:
+                merged[-1] = end
+        else:
+            merged.append(start)
+            merged.append(end)
+    return merged
+
+
+class BusyTimeline:
+    """Busy intervals of a single member inside a date window.
+
+    Intervals are kept as a flat array of minute offsets from the start of the
+    window, so a member with a few hundred events costs a few KB at most.
+    """
+
+    __slots__ = ('points',)
+
+    def __init__(self):
+        self.points = array('l')
+
+    def add(self, start, end):
+        if end > start:
+            self.points.append(start)
+            self.points.append(end)
+
+    def merged(self):
+        return merge_intervals(self.points)
+
+
+class FreeBusyWindow:
+    """Collects event intervals per member and merges them on demand."""
+
+    def __init__(self, start_date, end_date, granularity=15):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.granularity = granularity
+        self.timelines = {}
+
+    def _offset(self, day, minutes):
+        return (day - self.start_date).days * MINUTES_PER_DAY + minutes
+
+    def add_event(self, user_id, day, start_time, end_time):
+        start = time_to_minutes(start_time)
+        end = time_to_minutes(end_time)
+        # An end at or before the start means the event runs until midnight.
+        if end <= start:
+            end = MINUTES_PER_DAY
+        self.add_minutes(user_id, day, start, end)
+
+    def add_minutes(self, user_id, day, start, end):
+        """Add busy time given in minutes after ``day``'s midnight."""
+        start -= start % self.granularity
+        end += -end % self.granularity
+        timeline = self.timelines.get(user_id)
+        if timeline is None:
+            timeline = self.timelines[user_id] = BusyTimeline()
+        timeline.add(self._offset(day, start), self._offset(day, min(end, MINUTES_PER_DAY)))
+
+    def member_busy(self, user_id):
+        timeline = self.timelines.get(user_id)
+        return timeline.merged() if timeline else array('l')
+
+    def group_busy(self):
+        combined = array('l')
+        for timeline in self.timelines.values():
+            combined.extend(timeline.points)
+        return merge_intervals(combined)
+
+    def to_slots(self, points):
+        """Convert merged offsets back into per-day date/start/end dicts."""
+        slots = []
+        dates = {}
+        for start, end in zip(points[0::2], points[1::2]):
+            while start < end:
+                day_index, start_minute = divmod(start, MINUTES_PER_DAY)
+                day_end = (day_index + 1) * MINUTES_PER_DAY
+                stop = min(end, day_end)
+                day = dates.get(day_index)
+                if day is None:
+                    day = dates[day_index] = (self.start_date + timedelta(days=day_index)).isoformat()
+                slots.append({
+                    "date": day,
+                    "start_time": _clock(start_minute),
+                    "end_time": _clock(stop - day_index * MINUTES_PER_DAY),
+                })
+                start = stop
+        return slots
+
+
+def _clock(minutes):
+    """'HH:MM' of minutes after midnight; midnight at the end of the day is '00:00'."""
+    hours, minutes = divmod(minutes % MINUTES_PER_DAY, 60)
+    return f"{hours:02d}:{minutes:02d}"
+
+
+def find_common_slots(window, member_ids, duration, work_start, work_end,
+                      weekdays=(0, 1, 2, 3, 4), quorum=1, limit=5):
+    """Return the ``limit`` best slots of ``duration`` minutes in ``window``.
+
+    Each merged busy interval [s, e) of a member blocks every candidate start
+    in (s - duration, e). Those blocked ranges are added to a difference array
+    over the candidate grid, so the cost is linear in the number of intervals
+    plus the number of candidates instead of members x candidates. Only the
+    ``limit`` best candidates are kept while scanning.
+    """
+    step = window.granularity
+    per_day = MINUTES_PER_DAY // step
+    days = (window.end_date - window.start_date).days + 1
+    size = days * per_day
+    blocked = array('l', bytes(array('l').itemsize * (size + 1)))
+    busy_by_member = {}
+
+    for member_id in member_ids:
+        busy = window.member_busy(member_id)
+        busy_by_member[member_id] = busy
+        current_lo = current_hi = None
+        for start, end in zip(busy[0::2], busy[1::2]):
+            lo = max((start - duration) // step + 1, 0)
+            hi = min(-(-end // step), size)
+            if current_hi is not None and lo <= current_hi:
+                current_hi = max(current_hi, hi)
+                continue
+            if current_hi is not None and current_lo < current_hi:
+                blocked[current_lo] += 1
+                blocked[current_hi] -= 1
+            current_lo, current_hi = lo, hi
+        if current_hi is not None and current_lo < current_hi:
+            blocked[current_lo] += 1
+            blocked[current_hi] -= 1
+
+    total = len(member_ids)
+    first = -(-work_start // step)
+    best = []  # min-heap of the best (available, -index) pairs so far
+    running = 0
+    for day_index in range(days):
+        day = window.start_date + timedelta(days=day_index)
+        base = day_index * per_day
+        if day.weekday() not in weekdays:
+            for index in range(base, base + per_day):
+                running += blocked[index]
+            continue
+        for slot in range(per_day):
+            running += blocked[base + slot]
+            minute = slot * step
+            if slot < first or minute + duration > work_end:
+                continue
+            available = total - running
+            if available >= quorum:
+                candidate = (available, -(base + slot))
+                if len(best) < limit:
+                    heappush(best, candidate)
+                elif candidate > best[0]:
+                    heapreplace(best, candidate)
+
+    results = []
+    for available, negative_index in sorted(best, reverse=True):
+        start = -negative_index * step
+        end = start + duration
+        free_members = [
+            member_id for member_id in member_ids
+            if not _overlaps(busy_by_member[member_id], start, end)
+        ]
+        slot = window.to_slots(array('l', (start, end)))[0]
+        slot["available"] = available
+        slot["available_members"] = free_members
+        results.append(slot)
+    return results
+
+
+def _overlaps(points, start, end):
+    index = bisect_right(points, start)
+    # Inside an interval when the insertion point falls after a start offset.
+    if index % 2 == 1:
+        return True
+    return index < len(points) and points[index] < end
@@ -0,0 +1,127 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from .models import GroupMembership
+
+DEFAULT_BASE_URL = "https://www.googleapis.com/calendar/v3"
+DEFAULT_MAX_WORKERS = 8
+EVENT_TIME_ZONE = "Europe/Budapest"
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide keep-alive session shared by every calendar call."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers())
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def base_url():
+    return getattr(settings, "GOOGLE_CALENDAR_API_BASE", DEFAULT_BASE_URL).rstrip("/")
+
+
+def max_workers():
+    return getattr(settings, "GOOGLE_CALENDAR_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+
+
+def attendees_by_group(group_ids):
+    """Attendee lists for several groups in one query."""
+    attendees = defaultdict(list)
+    rows = (GroupMembership.objects.filter(group_id__in=group_ids)
+            .exclude(user__email='')
+            .values_list('group_id', 'user__email'))
+    for group_id, email in rows:
+        attendees[group_id].append({"email": email})
+    return attendees
+
+
+def _end(user_event):
+    # An end at or before the start runs until midnight, i.e. 00:00 of the next day.
+    if user_event.end_time <= user_event.start_time:
+        return datetime.combine(user_event.date + timedelta(days=1), time(0))
+    return datetime.combine(user_event.date, user_event.end_time)
+
+
+def build_event_data(user_event, attendees=()):
+    """Calendar API body for a stored UserEvent."""
+    return {
+        "summary": user_event.description,
+        "description": user_event.description,
+        "location": user_event.location,
+        "start": {
+            "dateTime": datetime.combine(user_event.date, user_event.start_time).isoformat(),
+            "timeZone": EVENT_TIME_ZONE,
+        },
+        "end": {
+            "dateTime": _end(user_event).isoformat(),
+            "timeZone": EVENT_TIME_ZONE,
+        },
+        "attendees": list(attendees),
+    }
+
+
+class GoogleCalendarSync:
+    """Pushes events to a user's primary calendar over the shared session."""
+
+    def __init__(self, token, session=None, api_base=None):
+        self.session = session or get_session()
+        self.api_base = api_base or base_url()
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+
+    def _events_url(self, google_event_id=None):
+        url = f"{self.api_base}/calendars/primary/events"
+        return f"{url}/{google_event_id}" if google_event_id else url
+
+    def push(self, event_data, google_event_id=None):
+        """Insert a new calendar event, or patch it when it is already synced."""
+        if google_event_id:
+            return self.session.patch(self._events_url(google_event_id), headers=self.headers, json=event_data)
+        return self.session.post(self._events_url(), headers=self.headers, json=event_data)
+
+    def delete(self, google_event_id):
+        return self.session.delete(self._events_url(google_event_id), headers=self.headers)
+
+    def push_many(self, user_events):
+        """Push several UserEvents concurrently through a bounded thread pool.
+
+        Only HTTP calls run in the pool; the caller persists the returned
+        google_event_ids. Returns (user_event, status_code, google_event_id)
+        tuples in input order.
+        """
+        attendees = attendees_by_group({event.group_id for event in user_events if event.group_id})
+
+        def push_one(user_event):
+            data = build_event_data(user_event, attendees.get(user_event.group_id, ()))
+            try:
+                response = self.push(data, user_event.google_event_id)
+            except requests.RequestException:
+                return user_event, 502, user_event.google_event_id
+            google_event_id = user_event.google_event_id
+            if response.status_code in (200, 201):
+                try:
+                    google_event_id = response.json().get("id", google_event_id)
+                except (ValueError, AttributeError):
+                    # Not a JSON object; keep the id we had.
+                    pass
+            return user_event, response.status_code, google_event_id
+
+        with ThreadPoolExecutor(max_workers=max_workers()) as pool:
+            return list(pool.map(push_one, user_events))
@@ -0,0 +1,92 @@
+"""Group directory search for ``GET api/groups/?search=``.
+
+Matching is case-insensitive on Group.name: anywhere in the name by
+default, or at the start of the name or of one of its words with
+``mode=prefix`` (autocomplete). Results rank exact names first, then names
+starting with the query, then names with a word starting with it, then the
+rest; ties go to bigger groups.
+
+On PostgreSQL the LIKE patterns are served by the pg_trgm index of
+migration 0017 and ties are also broken by trigram similarity. On SQLite an
+FTS5 trigram table narrows the candidates first; when it is missing (old
+SQLite, or a later table rebuild dropped its triggers) names are scanned.
+Queries shorter than a trigram scan on both.
+"""
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connections
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+from django.db.models.expressions import RawSQL
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import GroupMembership
+
+CONTAINS, PREFIX = 'contains', 'prefix'
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MIN_INDEXED_LENGTH = 3
+
+SQLITE_TABLE = 'myapp_group_search'
+
+
+def not_member(user):
+    """NOT EXISTS filter for groups ``user`` does not belong to."""
+    return ~Exists(GroupMembership.objects.filter(group=OuterRef('pk'), user=user))
+
+
+def _sqlite_index_ready(connection):
+    # Looked up once per connection; the triggers vanish if the table is rebuilt.
+    ready = getattr(connection, '_group_search_ready', None)
+    if ready is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = %s", [f'{SQLITE_TABLE}_insert']
+            )
+            ready = connection._group_search_ready = cursor.fetchone() is not None
+    return ready
+
+
+def search(queryset, query, mode=CONTAINS, limit=DEFAULT_LIMIT):
+    """The ``limit`` best matches of ``query`` among the groups of ``queryset``."""
+    query = query.strip()
+    word_start = Q(name__istartswith=query) | Q(name__icontains=' ' + query)
+    queryset = queryset.filter(word_start if mode == PREFIX else Q(name__icontains=query))
+
+    connection = connections[queryset.db]
+    if connection.vendor == 'sqlite' and len(query) >= MIN_INDEXED_LENGTH and _sqlite_index_ready(connection):
+        phrase = '"' + query.replace('"', '""') + '"'
+        queryset = queryset.filter(id__in=RawSQL(
+            f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s", [phrase]
+        ))
+
+    queryset = queryset.annotate(rank=Case(
+        When(name__iexact=query, then=Value(3)),
+        When(name__istartswith=query, then=Value(2)),
+        When(name__icontains=' ' + query, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+    ordering = ['-rank']
+    if connection.vendor == 'postgresql':
+        queryset = queryset.annotate(similarity=TrigramSimilarity('name', query))
+        ordering.append('-similarity')
+    return queryset.order_by(*ordering, '-member_count', 'name', 'id')[:limit]
+
+
+class GroupSearchFilter(BaseFilterBackend):
+    """``search``, ``mode`` (contains or prefix) and ``limit`` on group listings."""
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get('search', '').strip()
+        if not query or getattr(view, 'action', None) != 'list':
+            return queryset
+        mode = request.query_params.get('mode') or CONTAINS
+        if mode not in (CONTAINS, PREFIX):
+            raise ValidationError({"mode": f"Use {CONTAINS} or {PREFIX}."})
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= MAX_LIMIT:
+            raise ValidationError({"limit": f"Use a number from 1 to {MAX_LIMIT}."})
+        return search(queryset, query, mode, limit)
@@ -0,0 +1,181 @@
+"""Per-group busy heatmap kept in GroupHeatmapBucket rows.
+
+Each row holds, for one group, day and 30-minute bucket, how many of the
+group's members are busy then. The counts come from the members' busy
+bitmaps (see myapp.busymap), so a member counts once per bucket however many
+of their events touch it. Whenever bitmaps change, busy_changed() adds the
+buckets each member gained or lost to every group of theirs, so reading a
+window costs O(days x buckets) however many events it holds.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from . import busymap
+from .freebusy import MINUTES_PER_DAY
+from .models import GroupHeatmapBucket, GroupMembership, RecurringEvent, UserBusyDay
+
+BUCKET_MINUTES = 30
+BUCKETS_PER_DAY = MINUTES_PER_DAY // BUCKET_MINUTES
+SLOTS_PER_BUCKET = BUCKET_MINUTES // busymap.SLOT_MINUTES
+
+# Groups recomputed per pass of rebuild().
+REBUILD_BATCH = 500
+
+
+def bucket_bits(slots):
+    """Bits of the buckets a busy bitmap touches."""
+    bits = 0
+    for first, stop in busymap.runs(slots):
+        first, stop = first // SLOTS_PER_BUCKET, -(-stop // SLOTS_PER_BUCKET)
+        bits |= ((1 << (stop - first)) - 1) << first
+    return bits
+
+
+def _add(deltas, group_ids, day, bits, sign):
+    for first, stop in busymap.runs(bits):
+        for bucket in range(first, stop):
+            for group_id in group_ids:
+                deltas[group_id, day, bucket] += sign
+
+
+def bucket_counts(bitmaps, groups_of):
+    """Counter of (group_id, date, bucket) -> busy members.
+
+    ``bitmaps`` yields (user_id, date, slot bits); ``groups_of`` maps user
+    ids to the groups they count for.
+    """
+    counts = Counter()
+    for user_id, day, slots in bitmaps:
+        group_ids = groups_of.get(user_id)
+        if group_ids:
+            _add(counts, group_ids, day, bucket_bits(slots), 1)
+    return counts
+
+
+def _groups_of(user_ids):
+    groups_of = defaultdict(list)
+    if not user_ids:
+        return groups_of
+    for user_id, group_id in GroupMembership.objects.filter(user_id__in=user_ids).values_list('user_id', 'group_id'):
+        groups_of[user_id].append(group_id)
+    return groups_of
+
+
+def apply(deltas):
+    """Write a Counter of (group_id, date, bucket) -> change to the table."""
+    deltas = {key: change for key, change in deltas.items() if change}
+    if not deltas:
+        return
+    GroupHeatmapBucket.objects.bulk_create(
+        [GroupHeatmapBucket(group_id=group_id, date=day, bucket=bucket) for group_id, day, bucket in deltas],
+        ignore_conflicts=True,
+    )
+    # One UPDATE per group and change, covering up to UPDATE_BATCH_DAYS days.
+    grouped = defaultdict(lambda: defaultdict(list))
+    for (group_id, day, bucket), change in deltas.items():
+        grouped[group_id, change][day].append(bucket)
+    for (group_id, change), days in grouped.items():
+        days = list(days.items())
+        for offset in range(0, len(days), busymap.UPDATE_BATCH_DAYS):
+            cells = Q()
+            for day, bucket_list in days[offset:offset + busymap.UPDATE_BATCH_DAYS]:
+                cells |= Q(date=day, bucket__in=bucket_list)
+            GroupHeatmapBucket.objects.filter(cells, group_id=group_id).update(busy=F('busy') + change)
+
+
+def busy_changed(changes):
+    """Apply the bitmap changes busymap.refresh() returns to the groups of their users."""
+    groups_of = _groups_of({user_id for user_id, _ in changes})
+    deltas = Counter()
+    for (user_id, day), (old, new) in changes.items():
+        group_ids = groups_of.get(user_id)
+        if not group_ids:
+            continue
+        old, new = bucket_bits(old), bucket_bits(new)
+        _add(deltas, group_ids, day, new & ~old, 1)
+        _add(deltas, group_ids, day, old & ~new, -1)
+    apply(deltas)
+
+
+def member_changed(user_id, group_id, sign):
+    """Add (sign 1) or remove (sign -1) a member's stored busy time to or from one group.
+
+    Run before refreshing the member's bitmaps for the membership change:
+    busy_changed() then adds what the group's own events change.
+    """
+    rows = UserBusyDay.objects.filter(user_id=user_id).values_list('date', 'slots').iterator()
+    deltas = Counter()
+    for day, slots in rows:
+        _add(deltas, (group_id,), day, bucket_bits(busymap.from_bytes(slots)), sign)
+    apply(deltas)
+
+
+@transaction.atomic
+def rebuild(group_ids):
+    """Recompute the rows of ``group_ids`` from the stored busy bitmaps."""
+    group_ids = list(group_ids)
+    for offset in range(0, len(group_ids), REBUILD_BATCH):
+        chunk = group_ids[offset:offset + REBUILD_BATCH]
+        GroupHeatmapBucket.objects.filter(group_id__in=chunk).delete()
+        groups_of = defaultdict(list)
+        for user_id, group_id in GroupMembership.objects.filter(group_id__in=chunk).values_list('user_id', 'group_id'):
+            groups_of[user_id].append(group_id)
+        rows = UserBusyDay.objects.filter(
+            user_id__in=GroupMembership.objects.filter(group_id__in=chunk).values('user_id')
+        ).order_by().values_list('user_id', 'date', 'slots').iterator()
+        counts = bucket_counts(((user_id, day, busymap.from_bytes(slots)) for user_id, day, slots in rows), groups_of)
+        GroupHeatmapBucket.objects.bulk_create(
+            [GroupHeatmapBucket(group_id=group_id, date=day, bucket=bucket, busy=busy)
+             for (group_id, day, bucket), busy in counts.items()],
+            batch_size=5000,
+        )
+
+
+def read(group, start_date, end_date):
+    """Busy member counts per day of the window, ``BUCKETS_PER_DAY`` per day.
+
+    Stored rows cover UserEvents; recurring series are expanded here and only
+    count members who are not busy in that bucket already.
+    """
+    days = (end_date - start_date).days + 1
+    grid = [[0] * BUCKETS_PER_DAY for _ in range(days)]
+    rows = GroupHeatmapBucket.objects.filter(group=group, date__range=(start_date, end_date)).values_list(
+        'date', 'bucket', 'busy'
+    )
+    for day, bucket, busy in rows:
+        grid[(day - start_date).days][bucket] += busy
+
+    # group_id -> this group's members in it, for every group of its members.
+    shared = defaultdict(set)
+    memberships = GroupMembership.objects.filter(
+        user_id__in=GroupMembership.objects.filter(group=group).values('user_id')
+    ).values_list('group_id', 'user_id')
+    for group_id, user_id in memberships:
+        shared[group_id].add(user_id)
+    member_ids = shared[group.id]
+    series_list = RecurringEvent.objects.filter(
+        Q(type='solo', user_id__in=member_ids) | Q(type='group', group_id__in=list(shared))
+    ).overlapping(start_date, end_date)
+    extra = defaultdict(int)
+    for series in series_list:
+        owners = (series.user_id,) if series.type == 'solo' else shared[series.group_id]
+        span = bucket_bits(busymap.mask(series.start_time, series.end_time))
+        for day in series.occurrence_dates(start_date, end_date):
+            for user_id in owners:
+                extra[user_id, day] |= span
+    if extra:
+        stored = {(user_id, day): bucket_bits(busymap.from_bytes(slots))
+                  for user_id, day, slots in busymap.load({user_id for user_id, _ in extra}, start_date, end_date)}
+        for (user_id, day), bits in extra.items():
+            counts = grid[(day - start_date).days]
+            for first, stop in busymap.runs(bits & ~stored.get((user_id, day), 0)):
+                for bucket in range(first, stop):
+                    counts[bucket] += 1
+
+    return [
+        {"date": (start_date + timedelta(days=index)).isoformat(), "busy": counts}
+        for index, counts in enumerate(grid)
+    ]
@@ -0,0 +1,149 @@
+import zlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Max, Q
+
+from .google_calendar import EVENT_TIME_ZONE
+from .models import RecurringEvent, UserEvent
+
+PRODID = "-//Team Availability Calendar//EN"
+UID_DOMAIN = "team-availability-calendar"
+CHUNK_SIZE = 2000
+
+EVENT_FIELDS = ('id', 'description', 'location', 'date', 'start_time', 'end_time', 'updated_at', 'ical_uid')
+SERIES_FIELDS = ('id', 'description', 'location', 'start_date', 'start_time', 'end_time', 'updated_at',
+                 'frequency', 'interval', 'byweekday', 'until', 'count', 'exdates')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+def escape(value):
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """Split a content line into 75 octet pieces as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    pieces, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never cut a multi-byte character in half.
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(pieces) + "\r\n"
+
+
+def _local(day, moment):
+    return f"TZID={EVENT_TIME_ZONE}:{day:%Y%m%d}T{moment:%H%M%S}"
+
+
+def _end(day, start_time, end_time):
+    # An end at or before the start runs until midnight, i.e. 00:00 of the next day.
+    if end_time <= start_time:
+        return _local(day + timedelta(days=1), time(0))
+    return _local(day, end_time)
+
+
+def _stamp(moment):
+    return moment.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _vevent(uid, description, location, day, start_time, end_time, updated_at, extra=()):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_stamp(updated_at)}",
+        f"DTSTART;{_local(day, start_time)}",
+        f"DTEND;{_end(day, start_time, end_time)}",
+        f"SUMMARY:{escape(description)}",
+    ]
+    if location:
+        lines.append(f"LOCATION:{escape(location)}")
+    lines.extend(extra)
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
+
+
+def event_component(row):
+    event_id, description, location, day, start_time, end_time, updated_at, ical_uid = row
+    # Imported events keep their original UID so clients do not see duplicates.
+    uid = ical_uid or f"event-{event_id}@{UID_DOMAIN}"
+    return _vevent(uid, description, location, day, start_time, end_time, updated_at)
+
+
+def series_component(row):
+    (series_id, description, location, start_date, start_time, end_time, updated_at,
+     frequency, interval, byweekday, until, count, exdates) = row
+    rule = [f"FREQ={frequency.upper()}", f"INTERVAL={interval}"]
+    if frequency == 'weekly' and byweekday:
+        rule.append("BYDAY=" + ",".join(WEEKDAYS[int(day)] for day in byweekday.split(',')))
+    if count:
+        rule.append(f"COUNT={count}")
+    elif until:
+        rule.append(f"UNTIL={until:%Y%m%d}T235959Z")
+    extra = [f"RRULE:{';'.join(rule)}"]
+    extra.extend(f"EXDATE;{_local(datetime.strptime(day, '%Y-%m-%d').date(), start_time)}"
+                 for day in sorted(exdates or ()))
+    return _vevent(f"series-{series_id}@{UID_DOMAIN}", description, location, start_date, start_time, end_time,
+                   updated_at, extra)
+
+
+def feed_version(events, series, group_ids=()):
+    """(etag, last_modified) of a feed, from two aggregate queries.
+
+    The row counts are part of the tag because a deletion does not move the
+    latest updated_at. ``group_ids`` are the groups whose events the feed
+    shows: leaving one group and joining another can swap old events without
+    moving either, so the set is folded in as well.
+    """
+    parts = [f"{zlib.crc32(','.join(map(str, sorted(group_ids))).encode()):08x}"] if group_ids else []
+    last_modified = None
+    for queryset in (events, series):
+        stats = queryset.order_by().aggregate(latest=Max('updated_at'), total=Count('id'))
+        latest = stats['latest']
+        parts.append(f"{stats['total']}.{latest.timestamp() if latest else 0}")
+        if latest and (last_modified is None or latest > last_modified):
+            last_modified = latest
+    return '"' + "-".join(parts) + '"', last_modified
+
+
+def stream_calendar(name, events, series, chunk_size=CHUNK_SIZE):
+    """Yield an iCalendar document chunk by chunk.
+
+    Rows are read with a server-side cursor in ``chunk_size`` batches and
+    written as soon as each batch is formatted, so memory stays flat no
+    matter how much history the feed covers.
+    """
+    yield "".join(fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{escape(name)}",
+        f"X-WR-TIMEZONE:{EVENT_TIME_ZONE}",
+    ))
+    for queryset, fields, component in ((events, EVENT_FIELDS, event_component),
+                                        (series, SERIES_FIELDS, series_component)):
+        buffer = []
+        for row in queryset.order_by('id').values_list(*fields).iterator(chunk_size=chunk_size):
+            buffer.append(component(row))
+            if len(buffer) == chunk_size:
+                yield "".join(buffer)
+                buffer = []
+        if buffer:
+            yield "".join(buffer)
+    yield "END:VCALENDAR\r\n"
+
+
+def user_calendar(user_id, group_ids):
+    condition = Q(type='solo', user_id=user_id) | Q(type='group', group_id__in=group_ids)
+    return UserEvent.objects.filter(condition), RecurringEvent.objects.filter(condition)
+
+
+def group_calendar(group_id):
+    return (UserEvent.objects.filter(type='group', group_id=group_id),
+            RecurringEvent.objects.filter(type='group', group_id=group_id))
@@ -0,0 +1,242 @@
+import re
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import transaction
+
+from . import busymap, calendar_cache, heatmap, push
+from .google_calendar import EVENT_TIME_ZONE
+from .models import EventParticipation, GroupMembership, UserEvent
+
+DEFAULT_BATCH_SIZE = 500
+# Rows listed in a report; later errors are only counted in errors_truncated.
+MAX_REPORTED_ERRORS = 100
+DURATION_RE = re.compile(r'^\+?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+DESCRIPTION_MAX = UserEvent._meta.get_field('description').max_length
+LOCATION_MAX = UserEvent._meta.get_field('location').max_length
+UID_MAX = UserEvent._meta.get_field('ical_uid').max_length
+
+
+def unfold(lines):
+    """Yield (line_number, content_line) from an iterable of raw byte lines.
+
+    Continuation lines are joined before decoding, so producers that fold in
+    the middle of a multi-byte character are handled.
+    """
+    current, start = None, 0
+    for number, raw in enumerate(lines, 1):
+        raw = raw.rstrip(b'\r\n')
+        if raw[:1] in (b' ', b'\t') and current is not None:
+            current += raw[1:]
+            continue
+        if current:
+            yield start, current.decode('utf-8', errors='replace')
+        current, start = raw, number
+    if current:
+        yield start, current.decode('utf-8', errors='replace')
+
+
+def parse_line(line):
+    """Split a content line into (NAME, {PARAM: value}, value)."""
+    quoted = False
+    for index, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == ':' and not quoted:
+            break
+    else:
+        raise ValueError(f"Malformed line: {line[:80]}")
+    head, value = line[:index], line[index + 1:]
+    name, *params = head.split(';')
+    return name.upper(), dict(
+        (key.upper(), val.strip('"')) for key, _, val in (param.partition('=') for param in params)
+    ), value
+
+
+def unescape(value):
+    return re.sub(r'\\([\\;,nN])', lambda match: '\n' if match.group(1) in 'nN' else match.group(1), value)
+
+
+def iter_vevents(lines):
+    """Yield (line_number, {NAME: (params, value)}) for every VEVENT.
+
+    Only one event is held in memory at a time. Nested components such as
+    VALARM are skipped.
+    """
+    properties, start, depth = None, 0, 0
+    for number, line in unfold(lines):
+        upper = line.upper()
+        if upper == 'BEGIN:VEVENT':
+            properties, start, depth = {}, number, 0
+        elif properties is None:
+            continue
+        elif upper.startswith('BEGIN:'):
+            depth += 1
+        elif upper == 'END:VEVENT' and not depth:
+            yield start, properties
+            properties = None
+        elif upper.startswith('END:'):
+            depth -= 1
+        elif not depth:
+            try:
+                name, params, value = parse_line(line)
+            except ValueError:
+                continue
+            properties.setdefault(name, (params, value))
+
+
+def _parse_moment(params, value):
+    """A date for all-day values, otherwise a naive datetime in EVENT_TIME_ZONE."""
+    if params.get('VALUE') == 'DATE' or len(value) == 8:
+        return datetime.strptime(value, '%Y%m%d').date()
+    moment = datetime.strptime(value.rstrip('Zz'), '%Y%m%dT%H%M%S')
+    if value.endswith(('Z', 'z')):
+        source = dt_timezone.utc
+    else:
+        try:
+            source = ZoneInfo(params['TZID']) if 'TZID' in params else None
+        except (ZoneInfoNotFoundError, ValueError):
+            source = None
+    if source is None:
+        # Floating or unknown zones are taken as local time.
+        return moment
+    return moment.replace(tzinfo=source).astimezone(ZoneInfo(EVENT_TIME_ZONE)).replace(tzinfo=None)
+
+
+def _parse_duration(value):
+    match = DURATION_RE.match(value)
+    if not match:
+        raise ValueError(f"Unsupported DURATION {value}.")
+    weeks, days, hours, minutes, seconds = (int(part or 0) for part in match.groups())
+    return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def vevent_fields(properties):
+    """Map a parsed VEVENT to UserEvent field values, or raise ValueError."""
+    if 'RRULE' in properties or 'RECURRENCE-ID' in properties:
+        raise ValueError("Recurring events are not imported.")
+    if 'DTSTART' not in properties:
+        raise ValueError("DTSTART is missing.")
+    start = _parse_moment(*properties['DTSTART'])
+    if 'DTEND' in properties:
+        end = _parse_moment(*properties['DTEND'])
+    elif 'DURATION' in properties:
+        end = start + _parse_duration(properties['DURATION'][1])
+    else:
+        end = start + timedelta(days=1) if not isinstance(start, datetime) else start
+
+    if not isinstance(start, datetime):
+        if isinstance(end, datetime) or end - start > timedelta(days=1):
+            raise ValueError("Events spanning several days are not supported.")
+        # An end at or before the start runs until midnight.
+        day, start_time, end_time = start, dt_time(0, 0), dt_time(0, 0)
+    else:
+        if not isinstance(end, datetime) or end < start:
+            raise ValueError("DTEND is before DTSTART.")
+        if end.date() == start.date():
+            end_time = end.time()
+        elif end == datetime.combine(start.date() + timedelta(days=1), dt_time(0, 0)):
+            end_time = dt_time(0, 0)
+        else:
+            raise ValueError("Events spanning several days are not supported.")
+        day, start_time = start.date(), start.time()
+
+    uid = properties.get('UID', ({}, ''))[1].strip()
+    return {
+        'ical_uid': uid[:UID_MAX] or None,
+        'description': unescape(properties.get('SUMMARY', ({}, ''))[1])[:DESCRIPTION_MAX] or '(no title)',
+        'location': unescape(properties.get('LOCATION', ({}, ''))[1])[:LOCATION_MAX],
+        'date': day,
+        'start_time': start_time,
+        'end_time': end_time,
+    }
+
+
+class ICSImporter:
+    """Imports VEVENTs as solo events of ``user`` or as events of ``group``.
+
+    Events are written with bulk_create in one transaction per batch, so a
+    bad row never rolls back earlier batches. A UID already imported into the
+    same calendar, or repeated within the file, is counted as a duplicate.
+    """
+
+    def __init__(self, user, group=None, batch_size=DEFAULT_BATCH_SIZE, on_batch=None):
+        self.user = user
+        self.group = group
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        if group is None:
+            self.scope = UserEvent.objects.filter(type='solo', user=user)
+        else:
+            self.scope = UserEvent.objects.filter(type='group', group=group)
+        self.member_ids = None
+
+    def _event(self, fields):
+        if self.group is None:
+            return UserEvent(type='solo', user=self.user, **fields)
+        return UserEvent(type='group', group=self.group, **fields)
+
+    def _flush(self, batch, report):
+        uids = [event.ical_uid for event in batch if event.ical_uid]
+        with transaction.atomic():
+            existing = set(self.scope.filter(ical_uid__in=uids).values_list('ical_uid', flat=True)) if uids else set()
+            new = [event for event in batch if not event.ical_uid or event.ical_uid not in existing]
+            created = UserEvent.objects.bulk_create(new)
+            heatmap.busy_changed(busymap.events_created(created))
+            if self.group is not None and created:
+                if self.member_ids is None:
+                    self.member_ids = list(GroupMembership.objects.filter(group=self.group)
+                                           .values_list('user_id', flat=True))
+                EventParticipation.objects.bulk_create(
+                    [EventParticipation(user_id=user_id, event=event, response='maybe')
+                     for event in created for user_id in self.member_ids],
+                    batch_size=self.batch_size, ignore_conflicts=True,
+                )
+        report['created'] += len(created)
+        report['duplicates'] += len(batch) - len(created)
+
+    def run(self, lines):
+        """Import from an iterable of raw byte lines and return a report."""
+        report = {'rows': 0, 'created': 0, 'duplicates': 0, 'errors': [], 'errors_truncated': 0}
+        started = time.perf_counter()
+        seen_uids = set()
+        batch = []
+        for line_number, properties in iter_vevents(lines):
+            report['rows'] += 1
+            try:
+                fields = vevent_fields(properties)
+            except ValueError as error:
+                if len(report['errors']) >= MAX_REPORTED_ERRORS:
+                    report['errors_truncated'] += 1
+                    continue
+                report['errors'].append({
+                    'line': line_number,
+                    'uid': properties.get('UID', ({}, None))[1],
+                    'error': str(error),
+                })
+                continue
+            uid = fields['ical_uid']
+            if uid is not None:
+                if uid in seen_uids:
+                    report['duplicates'] += 1
+                    continue
+                seen_uids.add(uid)
+            batch.append(self._event(fields))
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report)
+                batch = []
+                if self.on_batch:
+                    self.on_batch(report, time.perf_counter() - started)
+        if batch:
+            self._flush(batch, report)
+
+        if report['created']:
+            owner = (self.user.id, None) if self.group is None else (None, self.group.id)
+            transaction.on_commit(lambda: calendar_cache.invalidate_event_owners([owner]))
+            transaction.on_commit(lambda: push.publish_resync(*owner))
+
+        elapsed = time.perf_counter() - started
+        report['seconds'] = round(elapsed, 3)
+        report['rows_per_second'] = round(report['rows'] / elapsed, 1) if elapsed else None
+        return report
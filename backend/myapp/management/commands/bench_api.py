@@ -0,0 +1,244 @@
+import json
+import logging
+import platform
+import re
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLResolver
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp import urls
+from myapp.models import EventParticipation, Group, GroupMembership, RecurringEvent, UserEvent
+
+from .seed_perf import PERF_PREFIX
+
+# Routes that call Google or Firebase; benchmarking them measures the network.
+EXTERNAL = {'google-login/', 'add-to-google-calendar/', 'add-to-google-calendar/bulk/', 'delete-google-calendar/'}
+
+# Router 'pk' placeholders by URL name.
+PK_OBJECTS = {
+    'user-event-detail': 'event',
+    'groupmembership-detail': 'membership',
+    'group-detail': 'other_group',
+    'recurring-event-detail': 'series',
+}
+
+# Routes whose group_id must be a group the user is not in.
+OTHER_GROUP_ROUTES = {'groups/<int:group_id>/join/'}
+
+
+def _route_patterns(patterns, prefix=''):
+    """(route, name) for every URL in myapp.urls, without format suffix variants."""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _route_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+            continue
+        route = prefix + str(pattern.pattern)
+        if 'format' in pattern.pattern.regex.groupindex:
+            continue
+        yield route.lstrip('^').rstrip('$'), pattern.name
+
+
+def _ics(count):
+    events = "".join(
+        f"BEGIN:VEVENT\r\nUID:bench-import-{index}\r\nDTSTART:20250602T{9 + index % 8:02d}0000\r\n"
+        f"DTEND:20250602T{10 + index % 8:02d}0000\r\nSUMMARY:Imported {index}\r\nEND:VEVENT\r\n"
+        for index in range(count)
+    )
+    return f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n{events}END:VCALENDAR\r\n".encode()
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(fraction * (len(ordered) - 1)))]
+
+
+class Command(BaseCommand):
+    help = ("Request every URL in myapp/urls.py through the test client and report p50/p95/p99 latency, "
+            "query counts and peak memory. Writes are rolled back. Seed data first with seed_perf.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', default=f"{PERF_PREFIX}-user-0", help="User the requests are made as.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed requests per URL.")
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--window-days', type=int, default=7, help="Date window of calendar reads.")
+        parser.add_argument('--only', help="Regex; benchmark only routes matching it.")
+        parser.add_argument('--json', dest='json_path', help="Write results as JSON to this file ('-' for stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} not found; run seed_perf first.")
+        context = self._context(user, options['window_days'])
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+
+        only = re.compile(options['only']) if options['only'] else None
+        # Expected 4xx/501 responses would otherwise be logged for every sample.
+        request_logger = logging.getLogger('django.request')
+        previous_level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            # The test client's host, which ALLOWED_HOSTS only lists under the test runner.
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                results = self._run(client, context, only, options)
+        finally:
+            request_logger.setLevel(previous_level)
+
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'user': user.username,
+            'repeat': options['repeat'],
+            'rows': {model.__name__: model.objects.count()
+                     for model in (User, Group, GroupMembership, UserEvent, EventParticipation, RecurringEvent)},
+            'results': results,
+        }
+        if options['json_path'] == '-':
+            self.stdout.write(json.dumps(report, indent=2))
+        elif options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Wrote {options['json_path']}")
+
+    def _run(self, client, context, only, options):
+        results = []
+        for route, name in _route_patterns(urls.urlpatterns):
+            if only and not only.search(route):
+                continue
+            if route in EXTERNAL:
+                results.append({'route': route, 'name': name, 'skipped': 'calls an external service'})
+                continue
+            method, path, kwargs = self._request(route, name, context)
+            results.append(self._measure(client, route, name, method, path, kwargs, options))
+            self._report_row(results[-1])
+        return results
+
+    def _context(self, user, window_days):
+        """Objects the URL placeholders and payloads are filled from."""
+        owned = Group.objects.filter(owner=user).order_by('-member_count').first()
+        if owned is None:
+            raise CommandError(f"{user.username} owns no group; pick a --user that does.")
+        member = GroupMembership.objects.filter(group=owned).exclude(user=user).select_related('user').first()
+        other_group = Group.objects.exclude(members__user=user).first()
+        event = UserEvent.objects.filter(type='group', group=owned).order_by('-date').first()
+        solo = UserEvent.objects.filter(type='solo', user=user).order_by('-date').first()
+        anchor = (event or solo).date if (event or solo) else timezone.localdate()
+        return {
+            'user': user,
+            'group': owned,
+            'member': member.user if member else user,
+            'membership': member or GroupMembership.objects.filter(user=user).first(),
+            'other_group': other_group or owned,
+            'event': event or solo,
+            'series': RecurringEvent.objects.filter(group=owned).first() or RecurringEvent.objects.first(),
+            'window': {'start_date': (anchor - timedelta(days=window_days - 1)).isoformat(),
+                       'end_date': anchor.isoformat()},
+        }
+
+    def _request(self, route, name, context):
+        """(method, path, client kwargs) for one route."""
+        group, member, event, window = context['group'], context['member'], context['event'], context['window']
+        group_id = context['other_group'].id if route in OTHER_GROUP_ROUTES else group.id
+        values = {'group_id': group_id, 'user_id': member.id, 'event_id': event.id}
+        if name in PK_OBJECTS:
+            values['pk'] = getattr(context[PK_OBJECTS[name]], 'id', 0)
+        path = '/api/' + re.sub(r'<(?:\w+:)?(\w+)>|\(\?P<(\w+)>[^)]*\)',
+                                lambda match: str(values[match.group(1) or match.group(2)]), route)
+
+        slot = {'date': window['end_date'], 'hour_start': '09:00', 'hour_end': '10:00'}
+        event_data = {'type': 'solo', 'description': 'Bench', 'date': window['end_date'],
+                      'start_time': '09:00', 'end_time': '10:00'}
+        cases = {
+            'availability/filter/': ('get', {'data': {'id': context['user'].id, **window}}),
+            'register/': ('post', {'data': {'username': 'bench-register', 'password': 'x' * 12,
+                                            'email': 'bench-register@example.com'}, 'format': 'json'}),
+            'groups/<int:group_id>/join/': ('post', {}),
+            'groups/<int:group_id>/leave/': ('post', {}),
+            'groups/<int:group_id>/delete/': ('delete', {}),
+            'groups/<int:group_id>/members/<int:user_id>/remove/': ('delete', {}),
+            'groups/<int:group_id>/members/<int:user_id>/role': ('put', {'data': {'role': 'admin'}, 'format': 'json'}),
+            'groups/<int:group_id>/freebusy/': ('get', {'data': window}),
+            'groups/<int:group_id>/suggest-slots/': ('get', {'data': window}),
+            'groups/<int:group_id>/heatmap/': ('get', {'data': window}),
+            'submit-events/': ('post', {'data': {'description': 'Bench', 'type': 'solo', 'slots': [slot] * 50},
+                                        'format': 'json'}),
+            'submit-event/': ('post', {'data': event_data, 'format': 'json'}),
+            'events/': ('get', {'data': window}),
+            'events/changes/': ('get', {'data': window}),
+            'events/import/': ('post', {'data': {'file': SimpleUploadedFile('bench.ics', _ics(100))},
+                                        'format': 'multipart'}),
+            'group-role/': ('get', {'data': {'group_id': group.id, 'user_id': member.id}}),
+            'events/<int:event_id>/respond/': ('post', {'data': {'response': 'yes'}, 'format': 'json'}),
+        }
+        method, kwargs = cases.get(route, ('get', {}))
+        return method, path, kwargs
+
+    def _call(self, client, method, path, kwargs):
+        upload = kwargs.get('data', {}).get('file') if isinstance(kwargs.get('data'), dict) else None
+        if upload is not None:
+            upload.seek(0)
+        response = getattr(client, method)(path, **kwargs)
+        if response.streaming:
+            b"".join(response.streaming_content)
+        return response
+
+    def _measure(self, client, route, name, method, path, kwargs, options):
+        timings = []
+        write = method != 'get'
+        for index in range(options['warmup'] + options['repeat']):
+            # Writes run in a rolled back transaction so every sample sees the same data.
+            with transaction.atomic():
+                started = time.perf_counter()
+                response = self._call(client, method, path, kwargs)
+                elapsed = time.perf_counter() - started
+                transaction.set_rollback(write)
+            if index >= options['warmup']:
+                timings.append(elapsed * 1000)
+
+        # One extra request for query counts and memory, which would skew the timings.
+        with transaction.atomic():
+            tracemalloc.start()
+            with CaptureQueriesContext(connection) as queries:
+                response = self._call(client, method, path, kwargs)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            transaction.set_rollback(write)
+
+        return {
+            'route': route,
+            'name': name,
+            'method': method.upper(),
+            'path': path,
+            'status': response.status_code,
+            'bytes': len(response.content) if not response.streaming else None,
+            'queries': len(queries),
+            'query_ms': round(sum(float(query['time']) for query in queries.captured_queries) * 1000, 2),
+            'peak_kb': round(peak / 1024, 1),
+            'p50_ms': round(_percentile(timings, 0.50), 2),
+            'p95_ms': round(_percentile(timings, 0.95), 2),
+            'p99_ms': round(_percentile(timings, 0.99), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+        }
+
+    def _report_row(self, row):
+        self.stdout.write(
+            f"{row['method']:<6} {row['route']:<55} {row['status']:>3} q={row['queries']:<4} "
+            f"p50={row['p50_ms']:>8.2f} p95={row['p95_ms']:>8.2f} p99={row['p99_ms']:>8.2f} ms "
+            f"peak={row['peak_kb']:>8.1f} KiB"
+        )
@@ -0,0 +1,148 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.models import GroupMembership
+
+HOST = 'localhost'
+
+
+def _percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+class Command(BaseCommand):
+    help = ("Compare throughput of the calendar read endpoints through the WSGI handler (one thread per "
+            "concurrent client) and the ASGI handler (async views on one event loop).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username whose calendar is read.")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per run.")
+        parser.add_argument('--concurrency', default='1,8,32', help="Comma separated client counts.")
+        parser.add_argument('--start-date', default='2025-01-06')
+        parser.add_argument('--end-date', default='2025-01-12')
+        parser.add_argument('--db-latency-ms', type=float, default=0.0,
+                            help="Sleep this long in every query to mimic a database across the network.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist as error:
+            raise CommandError(str(error))
+        token = f"Bearer {AccessToken.for_user(user)}"
+        window = {'start_date': options['start_date'], 'end_date': options['end_date']}
+        targets = [
+            ('/api/events/', urlencode(window)),
+            ('/api/availability/filter/', urlencode({'id': user.id, **window})),
+            ('/api/groups/my-groups/', ''),
+        ]
+        group_id = GroupMembership.objects.filter(user=user).values_list('group_id', flat=True).first()
+        if group_id:
+            targets.append((f'/api/groups/{group_id}/members/', ''))
+        plan = [targets[index % len(targets)] for index in range(options['requests'])]
+
+        if options['db_latency_ms']:
+            delay = options['db_latency_ms'] / 1000
+
+            def add_latency(execute, sql, params, many, context):
+                time.sleep(delay)
+                return execute(sql, params, many, context)
+
+            def install(sender, connection, **kwargs):
+                # Fires on every reconnect of the same wrapper object.
+                if add_latency not in connection.execute_wrappers:
+                    connection.execute_wrappers.append(add_latency)
+
+            connection_created.connect(install, weak=False)
+            connections.close_all()
+
+        wsgi, asgi = get_wsgi_application(), get_asgi_application()
+        self.stdout.write(f"{'mode':<5} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6}")
+        for concurrency in (int(value) for value in options['concurrency'].split(',')):
+            for mode, run in (('wsgi', self._run_wsgi), ('asgi', self._run_asgi)):
+                application = wsgi if mode == 'wsgi' else asgi
+                elapsed, results = run(application, plan, token, concurrency)
+                timings = sorted(duration for _, duration in results)
+                errors = sum(1 for status, _ in results if status != 200)
+                self.stdout.write(
+                    f"{mode:<5} {concurrency:>7} {len(results) / elapsed:>8.0f} "
+                    f"{_percentile(timings, 0.5) * 1000:>8.1f} {_percentile(timings, 0.95) * 1000:>8.1f} {errors:>6}"
+                )
+
+    @staticmethod
+    def _run_wsgi(application, plan, token, concurrency):
+        def call(target):
+            path, query = target
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+                'SERVER_NAME': HOST, 'SERVER_PORT': '80', 'HTTP_HOST': HOST, 'HTTP_AUTHORIZATION': token,
+                'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+                'wsgi.errors': io.StringIO(), 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+                'wsgi.run_once': False, 'wsgi.version': (1, 0),
+            }
+            status = []
+            started = time.perf_counter()
+            response = application(environ, lambda line, headers, exc_info=None: status.append(line))
+            try:
+                b"".join(response)
+            finally:
+                # Fires request_finished, which closes this thread's DB connection.
+                response.close()
+            return int(status[0].split()[0]), time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(call, plan))
+        return time.perf_counter() - started, results
+
+    @staticmethod
+    def _run_asgi(application, plan, token, concurrency):
+        async def call(target, gate):
+            path, query = target
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+                'root_path': '', 'client': ('127.0.0.1', 0), 'server': (HOST, 80),
+                'headers': [(b'host', HOST.encode()), (b'authorization', token.encode())],
+            }
+            finished = asyncio.Event()
+            body_sent = False
+            status = None
+
+            async def receive():
+                nonlocal body_sent
+                if not body_sent:
+                    body_sent = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await finished.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                nonlocal status
+                if message['type'] == 'http.response.start':
+                    status = message['status']
+                elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                    finished.set()
+
+            async with gate:
+                started = time.perf_counter()
+                await application(scope, receive, send)
+                return status, time.perf_counter() - started
+
+        async def run():
+            gate = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(call(target, gate) for target in plan))
+
+        started = time.perf_counter()
+        results = asyncio.run(run())
+        return time.perf_counter() - started, results
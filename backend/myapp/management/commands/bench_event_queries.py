@@ -0,0 +1,117 @@
+import random
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from myapp import busymap, heatmap
+from myapp.models import Group, GroupMembership, UserEvent
+
+BENCH_PREFIX = 'bench-events'
+
+
+class Command(BaseCommand):
+    help = ("Seed UserEvent rows and report query plans and latency of the event range queries. "
+            "All rows are rolled back afterwards unless --keep is given.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100_000, help="Number of UserEvent rows to seed.")
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query.")
+        parser.add_argument('--keep', action='store_true', help="Commit the seeded rows instead of rolling back.")
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{BENCH_PREFIX}-user-").exists():
+            self.stderr.write(f"Rows with prefix '{BENCH_PREFIX}' from a --keep run exist; delete them first.")
+            return
+        # One transaction: rolling it back removes the rows without running the
+        # per-row delete signals, and nothing is left behind in live tables.
+        with transaction.atomic():
+            rng = random.Random(42)
+            users, groups = self._seed_owners(options['users'], options['groups'])
+            self._seed_events(rng, users, groups, options['rows'], options['batch_size'])
+            with connection.cursor() as cursor:
+                # Fresh statistics so the plans match a settled table.
+                cursor.execute(f"ANALYZE {UserEvent._meta.db_table}")
+            self._measure(users, groups, options['repeat'])
+            if options['keep']:
+                # Bulk created past the signals; the heatmap is read off the busy bitmaps.
+                busymap.rebuild([user.id for user in users])
+                heatmap.rebuild([group.id for group in groups])
+            else:
+                transaction.set_rollback(True)
+
+    def _measure(self, users, groups, repeat):
+        user = users[0]
+        group_ids = list(GroupMembership.objects.filter(user=user).values_list('group_id', flat=True))
+        start_date = date(2025, 1, 6)
+        end_date = start_date + timedelta(days=6)
+
+        queries = {
+            "events/ (UserEventListView)": UserEvent.objects.filter(
+                Q(type='solo', user=user) | Q(type='group', group_id__in=group_ids)
+            ).filter(date__range=(start_date, end_date)),
+            "availability/filter/ (FilteredUserEventView)": UserEvent.objects.filter(
+                type='solo', user_id=user.id, date__range=[start_date, end_date]
+            ),
+            "group events in range": UserEvent.objects.filter(
+                group_id=groups[0].id, date__range=(start_date, end_date)
+            ),
+        }
+
+        for label, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(queryset.explain())
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                rows = len(list(queryset.all()))
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f"rows={rows} p50={timings[len(timings) // 2]:.2f}ms "
+                f"max={timings[-1]:.2f}ms over {len(timings)} runs\n"
+            )
+
+    def _seed_owners(self, user_count, group_count):
+        users = User.objects.bulk_create(
+            User(username=f"{BENCH_PREFIX}-user-{i}") for i in range(user_count)
+        )
+        # User i joins group i % group_count; the counts skip the membership signal.
+        groups = Group.objects.bulk_create(
+            Group(name=f"{BENCH_PREFIX}-group-{i}",
+                  member_count=user_count // group_count + (i < user_count % group_count))
+            for i in range(group_count)
+        )
+        if not users[0].pk:
+            users = list(User.objects.filter(username__startswith=BENCH_PREFIX).order_by('id'))
+            groups = list(Group.objects.filter(name__startswith=BENCH_PREFIX).order_by('id'))
+        GroupMembership.objects.bulk_create(
+            GroupMembership(user=user, group=groups[i % len(groups)])
+            for i, user in enumerate(users)
+        )
+        return users, groups
+
+    def _seed_events(self, rng, users, groups, rows, batch_size):
+        first_day = date(2024, 1, 1)
+        created = 0
+        while created < rows:
+            batch = []
+            for _ in range(min(batch_size, rows - created)):
+                hour = rng.randint(7, 18)
+                day = first_day + timedelta(days=rng.randint(0, 729))
+                if rng.random() < 0.8:
+                    batch.append(UserEvent(type='solo', user=rng.choice(users), description=BENCH_PREFIX,
+                                           date=day, start_time=dtime(hour), end_time=dtime(hour + 1)))
+                else:
+                    batch.append(UserEvent(type='group', group=rng.choice(groups), description=BENCH_PREFIX,
+                                           date=day, start_time=dtime(hour), end_time=dtime(hour + 1)))
+            UserEvent.objects.bulk_create(batch)
+            created += len(batch)
+            self.stdout.write(f"seeded {created}/{rows} events", ending='\r')
+        self.stdout.write('')
@@ -0,0 +1,63 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from myapp.views import EventSlotSubmissionView
+
+
+class Command(BaseCommand):
+    help = "Time submit-events/ with a large slot payload. All rows are rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--slots', type=int, default=1_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        slots = self._slots(options['slots'])
+        payload = {"description": "bench-slots", "type": "solo", "slots": slots}
+        factory = APIRequestFactory()
+        view = EventSlotSubmissionView.as_view()
+
+        timings = []
+        with transaction.atomic():
+            user = User.objects.create(username="bench-slots-user")
+            for _ in range(options['repeat']):
+                request = factory.post('/api/submit-events/', payload, format='json')
+                force_authenticate(request, user=user)
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = view(request)
+                    timings.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 201:
+                    self.stderr.write(f"Unexpected status {response.status_code}: {response.data}")
+                    break
+            transaction.set_rollback(True)
+
+        timings.sort()
+        self.stdout.write(
+            f"slots={len(slots)} queries={len(queries)} "
+            f"p50={timings[len(timings) // 2]:.1f}ms max={timings[-1]:.1f}ms over {len(timings)} runs"
+        )
+
+    @staticmethod
+    def _slots(count):
+        slots = []
+        day = date(2025, 1, 6)
+        minute = 0
+        for _ in range(count):
+            start = 8 * 60 + minute
+            slots.append({
+                "date": day.isoformat(),
+                "hour_start": f"{start // 60:02d}:{start % 60:02d}",
+                "hour_end": f"{(start + 15) // 60:02d}:{(start + 15) % 60:02d}",
+            })
+            minute += 15
+            if minute >= 10 * 60:
+                minute = 0
+                day += timedelta(days=1)
+        return slots
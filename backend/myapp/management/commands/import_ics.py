@@ -0,0 +1,37 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.ics_import import DEFAULT_BATCH_SIZE, ICSImporter
+from myapp.models import Group
+
+
+class Command(BaseCommand):
+    help = "Import an .ics file as solo events of a user, or as events of a group."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', required=True, help="Username that owns solo events.")
+        parser.add_argument('--group', type=int, help="Import as events of this group id instead.")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+            group = Group.objects.get(id=options['group']) if options['group'] else None
+        except (User.DoesNotExist, Group.DoesNotExist) as error:
+            raise CommandError(str(error))
+
+        def progress(report, elapsed):
+            self.stdout.write(f"rows={report['rows']} created={report['created']} "
+                              f"{report['rows'] / elapsed:.0f} rows/s")
+
+        importer = ICSImporter(user, group, batch_size=options['batch_size'], on_batch=progress)
+        with open(options['path'], 'rb') as source:
+            report = importer.run(source)
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']} uid={error['uid']}: {error['error']}")
+        self.stdout.write(
+            f"rows={report['rows']} created={report['created']} duplicates={report['duplicates']} "
+            f"errors={len(report['errors']) + report['errors_truncated']} in {report['seconds']}s ({report['rows_per_second']} rows/s)"
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from myapp.models import ChangeTombstone
+from myapp.views.sync_views import TOMBSTONE_RETENTION
+
+
+class Command(BaseCommand):
+    help = "Delete change-feed tombstones older than the sync token retention window."
+
+    def handle(self, *args, **options):
+        deleted, _ = ChangeTombstone.objects.filter(deleted_at__lt=timezone.now() - TOMBSTONE_RETENTION).delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)."))
@@ -0,0 +1,23 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from myapp import busymap
+
+
+class Command(BaseCommand):
+    help = ("Recompute the per-user busy bitmaps from events and memberships, e.g. after bulk loads "
+            "that bypass model signals.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help="User id to rebuild; repeat for several. Defaults to all users.")
+
+    def handle(self, *args, **options):
+        user_ids = options['users'] or list(User.objects.values_list('id', flat=True))
+        started = time.perf_counter()
+        busymap.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt the busy bitmaps of {len(user_ids)} user(s) in {time.perf_counter() - started:.1f}s."
+        ))
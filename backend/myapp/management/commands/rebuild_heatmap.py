@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp import heatmap
+from myapp.models import Group
+
+
+class Command(BaseCommand):
+    help = ("Recompute the group heatmap table from the busy bitmaps and memberships, e.g. after bulk "
+            "loads that bypass model signals. Run rebuild_busymap first if the bitmaps are stale too.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', dest='groups',
+                            help="Group id to rebuild; repeat for several. Defaults to all groups.")
+
+    def handle(self, *args, **options):
+        group_ids = options['groups'] or list(Group.objects.values_list('id', flat=True))
+        started = time.perf_counter()
+        heatmap.rebuild(group_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt the heatmap of {len(group_ids)} group(s) in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from myapp.models import Group, GroupMembership
+
+
+class Command(BaseCommand):
+    help = "Recompute Group.member_count from GroupMembership rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report groups with a wrong count.")
+
+    def handle(self, *args, **options):
+        counts = (GroupMembership.objects.filter(group=OuterRef('pk'))
+                  .order_by().values('group').annotate(total=Count('id')).values('total'))
+        drifted = (Group.objects.annotate(actual=Coalesce(Subquery(counts), Value(0)))
+                   .exclude(member_count=F('actual')))
+
+        for group in drifted.only('id', 'name', 'member_count'):
+            self.stdout.write(f"{group.id} {group.name}: stored {group.member_count}, actual {group.actual}")
+
+        if options['dry_run']:
+            return
+
+        fixed = Group.objects.filter(id__in=drifted.values('id')).update(
+            member_count=Coalesce(Subquery(counts), Value(0))
+        )
+        self.stdout.write(self.style.SUCCESS(f"Repaired member_count on {fixed} group(s)."))
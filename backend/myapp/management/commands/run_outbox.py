@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myapp.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Send queued notification emails from the outbox, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain what is due and exit.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when idle.")
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--max-attempts', type=int, default=5)
+        parser.add_argument('--backoff', type=int, default=60, help="Base retry delay in seconds.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                stats = drain_outbox(
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                    backoff=options['backoff'],
+                )
+                if any(stats.values()):
+                    self.stdout.write(
+                        f"sent={stats['sent']} retried={stats['retried']} failed={stats['failed']}"
+                    )
+                if options['once']:
+                    if not any(stats.values()):
+                        break
+                    continue
+                if not any(stats.values()):
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,184 @@
+import random
+import time
+from datetime import date, time as dtime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from myapp import busymap, heatmap
+from myapp.models import EventParticipation, Group, GroupMembership, RecurringEvent, UserEvent
+
+PERF_PREFIX = 'perf'
+PERF_PASSWORD = 'perf-pass'
+
+# Working-hours heavy start times, in minutes after midnight, and typical lengths.
+START_HOURS = [7, 8, 9, 9, 10, 10, 11, 12, 13, 14, 14, 15, 16, 17, 18, 19]
+DURATIONS = [15, 30, 30, 45, 60, 60, 60, 90, 120, 180]
+RESPONSES = ['yes'] * 6 + ['maybe'] * 3 + ['no']
+WEEKDAY_WEIGHT = [1.0, 1.0, 1.0, 1.0, 0.9, 0.25, 0.15]
+# Events deleted per query by --reset; keeps the id lists within SQLite's variable limit.
+RESET_BATCH = 10000
+
+
+class Command(BaseCommand):
+    help = ("Generate a reproducible synthetic data set for benchmarks: users, groups with long-tailed "
+            "sizes, memberships, solo and group events, participations and recurring series.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--max-group-size', type=int, default=250)
+        parser.add_argument('--events-per-user', type=float, default=50.0, help="Mean solo events per user.")
+        parser.add_argument('--events-per-group', type=float, default=100.0,
+                            help="Mean group events per group, scaled by group size.")
+        parser.add_argument('--series-per-user', type=float, default=0.2, help="Mean recurring series per user.")
+        parser.add_argument('--days', type=int, default=365, help="Length of the event date range.")
+        parser.add_argument('--start-date', type=date.fromisoformat,
+                            help="First event date; defaults to half of --days before today.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--prefix', default=PERF_PREFIX, help="Name prefix of generated users and groups.")
+        parser.add_argument('--reset', action='store_true', help="Delete a previous data set with this prefix first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        prefix = options['prefix']
+        days = options['days']
+        self.start_date = options['start_date'] or date.today() - timedelta(days=days // 2)
+        self.days = days
+
+        if options['reset']:
+            self._reset(prefix)
+        elif User.objects.filter(username__startswith=f"{prefix}-user-").exists():
+            self.stderr.write(f"Data with prefix '{prefix}' already exists; pass --reset to replace it.")
+            return
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            users = self._users(prefix, options['users'])
+            groups, members = self._groups(prefix, users, options['groups'], options['max_group_size'])
+            solo = self._solo_events(users, options['events_per_user'])
+            group_events = self._group_events(groups, members, options['events_per_group'])
+            participations = self._participations(group_events, members)
+            series = self._series(users, groups, options['series_per_user'])
+            # Everything above was bulk created, past the signals that keep the heatmap and busy bitmaps.
+            # The heatmap is read off the busy bitmaps, so they go first.
+            busymap.rebuild([user.id for user in users])
+            heatmap.rebuild([group.id for group in groups])
+
+        self.stdout.write(
+            f"users={len(users)} groups={len(groups)} memberships={sum(map(len, members.values()))} "
+            f"solo_events={solo} group_events={len(group_events)} participations={participations} "
+            f"series={series} in {time.perf_counter() - started:.1f}s"
+        )
+        self.stdout.write(f"Log in as {prefix}-user-0 / {PERF_PASSWORD}; it owns the largest group.")
+
+    def _reset(self, prefix):
+        users = User.objects.filter(username__startswith=f"{prefix}-user-")
+        with transaction.atomic():
+            # Groups first: their events then go in one cascade. Solo events go
+            # last, ownerless, so deleting them touches no heatmap or busy bitmap.
+            Group.objects.filter(name__startswith=f"{prefix}-group-").delete()
+            RecurringEvent.objects.filter(user__in=users).delete()
+            event_ids = list(UserEvent.objects.filter(user__in=users).values_list('id', flat=True))
+            users.delete()
+            for offset in range(0, len(event_ids), RESET_BATCH):
+                UserEvent.objects.filter(id__in=event_ids[offset:offset + RESET_BATCH]).delete()
+
+    def _users(self, prefix, count):
+        # One shared hash keeps seeding fast; every user can still log in.
+        password = make_password(PERF_PASSWORD)
+        return User.objects.bulk_create(
+            [User(username=f"{prefix}-user-{index}", email=f"{prefix}-user-{index}@example.com", password=password)
+             for index in range(count)],
+            batch_size=self.batch_size,
+        )
+
+    def _groups(self, prefix, users, count, max_size):
+        """Groups with Pareto distributed sizes: many small teams, a few large ones."""
+        cap = min(len(users), max_size)
+        sizes = sorted((min(cap, max(2, int(self.rng.paretovariate(1.2) * 3))) for _ in range(count)), reverse=True)
+        owners = [users[0]] + [self.rng.choice(users) for _ in range(count - 1)]
+        chosen = []
+        for owner, size in zip(owners, sizes):
+            others = [user for user in self.rng.sample(users, min(len(users), size + 1)) if user.id != owner.id]
+            chosen.append([owner] + others[:size - 1])
+        groups = Group.objects.bulk_create(
+            [Group(name=f"{prefix}-group-{index}", owner=owner, member_count=len(group_members))
+             for index, (owner, group_members) in enumerate(zip(owners, chosen))],
+            batch_size=self.batch_size,
+        )
+        members = {}
+        memberships = []
+        for group, group_members in zip(groups, chosen):
+            members[group.id] = [user.id for user in group_members]
+            for position, user in enumerate(group_members):
+                role = 'owner' if position == 0 else ('admin' if self.rng.random() < 0.05 else 'member')
+                memberships.append(GroupMembership(user=user, group=group, role=role))
+        GroupMembership.objects.bulk_create(memberships, batch_size=self.batch_size)
+        return groups, members
+
+    def _slot(self):
+        day = self.start_date + timedelta(days=self.rng.randrange(self.days))
+        while self.rng.random() > WEEKDAY_WEIGHT[day.weekday()]:
+            day = self.start_date + timedelta(days=self.rng.randrange(self.days))
+        start = self.rng.choice(START_HOURS) * 60 + self.rng.choice((0, 0, 15, 30, 45))
+        end = min(start + self.rng.choice(DURATIONS), 24 * 60 - 1)
+        return day, dtime(start // 60, start % 60), dtime(end // 60, end % 60)
+
+    def _count(self, mean):
+        # Log-normal counts: most users are light, a few are very busy.
+        return int(self.rng.lognormvariate(0, 0.8) * mean / 1.377) if mean else 0
+
+    def _bulk_events(self, events):
+        return UserEvent.objects.bulk_create(events, batch_size=self.batch_size)
+
+    def _solo_events(self, users, mean):
+        created, batch = 0, []
+        for user in users:
+            for _ in range(self._count(mean)):
+                day, start, end = self._slot()
+                batch.append(UserEvent(type='solo', user=user, description='Focus time', date=day,
+                                       start_time=start, end_time=end))
+            if len(batch) >= self.batch_size:
+                created += len(self._bulk_events(batch))
+                batch = []
+        return created + len(self._bulk_events(batch))
+
+    def _group_events(self, groups, members, mean):
+        events = []
+        for group in groups:
+            scale = min(3.0, 0.5 + len(members[group.id]) / 20)
+            for _ in range(self._count(mean * scale)):
+                day, start, end = self._slot()
+                events.append(UserEvent(type='group', group=group, description='Team meeting', date=day,
+                                        start_time=start, end_time=end, location='Room 1'))
+        return self._bulk_events(events)
+
+    def _participations(self, events, members):
+        created, batch = 0, []
+        for event in events:
+            for user_id in members[event.group_id]:
+                batch.append(EventParticipation(user_id=user_id, event_id=event.id,
+                                                response=self.rng.choice(RESPONSES)))
+            if len(batch) >= self.batch_size:
+                created += len(EventParticipation.objects.bulk_create(batch, batch_size=self.batch_size))
+                batch = []
+        return created + len(EventParticipation.objects.bulk_create(batch, batch_size=self.batch_size))
+
+    def _series(self, users, groups, mean):
+        series = []
+        for user in users:
+            if self.rng.random() < mean:
+                day, start, end = self._slot()
+                series.append(RecurringEvent(type='solo', user=user, description='Weekly 1:1', start_date=day,
+                                             start_time=start, end_time=end, frequency='weekly'))
+        for group in groups[:max(1, len(groups) // 5)]:
+            day, start, end = self._slot()
+            series.append(RecurringEvent(type='group', group=group, description='Standup', start_date=day,
+                                         start_time=start, end_time=end, frequency='weekly', byweekday='0,1,2,3,4'))
+        # last_date is derived in save(), which bulk_create skips; open-ended series keep it NULL.
+        return len(RecurringEvent.objects.bulk_create(series, batch_size=self.batch_size))
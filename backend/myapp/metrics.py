@@ -0,0 +1,191 @@
+"""In-process request metrics, exposed in the Prometheus text format.
+
+myapp.middleware.metrics_middleware records per route: latency, response
+size, and the number and time of database queries. The cache modules report
+lookups through cache_lookup(). Values live in the worker process, so each
+worker is scraped on its own. With METRICS_ENABLED off the middleware
+removes itself and nothing here is called on the request path.
+"""
+import contextvars
+import re
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'http_requests_total': ('counter', "Requests by route, method and status.", None),
+    'http_request_duration_seconds': ('histogram', "Time until the view returned a response.", LATENCY_BUCKETS),
+    'http_response_size_bytes': ('histogram', "Size of non-streaming response bodies.", SIZE_BUCKETS),
+    'http_request_db_queries': ('histogram', "Database queries per request.", QUERY_BUCKETS),
+    'db_query_duration_seconds_total': ('counter', "Time spent in database queries.", None),
+    'cache_requests_total': ('counter', "Cache lookups by cache and result.", None),
+}
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+def enabled():
+    return getattr(settings, 'METRICS_ENABLED', False)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Counters and histograms keyed by metric name and label values."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {name: {} for name in METRICS}
+
+    def inc(self, name, labels, amount=1):
+        with self._lock:
+            series = self._series[name]
+            series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, labels, value):
+        with self._lock:
+            series = self._series[name]
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._series = {name: {} for name in METRICS}
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, (kind, help_text, buckets) in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(self._series[name].items()):
+                    if kind == 'counter':
+                        lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), value.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(value.sum)}")
+                    lines.append(f"{name}_count{_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 9))
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+registry = Registry()
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+def start_request():
+    """Collect queries of the current context until finish_request()."""
+    return _request_stats.set(RequestStats())
+
+
+def finish_request(token):
+    stats = _request_stats.get()
+    _request_stats.reset(token)
+    return stats
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that counts queries made while a request is measured.
+
+    The stats live in a context variable, so queries the async views run in
+    sync_to_async threads are attributed to their request as well.
+    """
+    stats = _request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+
+
+def _install_query_wrapper(connection, **kwargs):
+    # connection_created fires on every reconnect of the same wrapper object.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_wrapper():
+    """Wrap connections of this thread now and every connection opened later."""
+    connection_created.connect(_install_query_wrapper, dispatch_uid='myapp.metrics.record_query')
+    for connection in connections.all(initialized_only=True):
+        _install_query_wrapper(connection)
+
+
+def route_of(request):
+    """URL pattern of the resolved view, e.g. ``api/groups/<pk>/``."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.route:
+        return UNMATCHED_ROUTE
+    return re.sub(r'\(\?P<(\w+)>[^)]*\)', r'<\1>', match.route).replace('^', '').replace('$', '')
+
+
+def record_request(request, response, seconds, stats):
+    route = route_of(request)
+    method = request.method
+    registry.inc('http_requests_total', (('route', route), ('method', method), ('status', response.status_code)))
+    labels = (('route', route), ('method', method))
+    registry.observe('http_request_duration_seconds', labels, seconds)
+    if not response.streaming:
+        registry.observe('http_response_size_bytes', labels, len(response.content))
+    if stats is not None:
+        registry.observe('http_request_db_queries', labels, stats.queries)
+        registry.inc('db_query_duration_seconds_total', labels, stats.query_seconds)
+
+
+def cache_lookup(cache_name, hit):
+    if enabled():
+        registry.inc('cache_requests_total', (('cache', cache_name), ('result', 'hit' if hit else 'miss')))
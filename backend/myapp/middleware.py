@@ -0,0 +1,81 @@
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIRequest
+from django.middleware.gzip import GZipMiddleware
+from django.utils.decorators import decorator_from_middleware, sync_and_async_middleware
+
+from . import metrics
+
+ASYNC_URLCONF = 'backend.asgi_urls'
+
+
+@sync_and_async_middleware
+def async_routes_middleware(get_response):
+    """Resolve ASGI requests against backend.asgi_urls (async views).
+
+    WSGI requests keep the synchronous DRF views, which would otherwise be
+    wrapped in async_to_sync per request.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            if isinstance(request, ASGIRequest):
+                request.urlconf = ASYNC_URLCONF
+            return await get_response(request)
+    else:
+        def middleware(request):
+            if isinstance(request, ASGIRequest):
+                request.urlconf = ASYNC_URLCONF
+            return get_response(request)
+    return middleware
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    """Record latency, response size and database queries per route.
+
+    With METRICS_ENABLED off the middleware is left out of the chain, so
+    disabled metrics cost nothing per request.
+    """
+    if not metrics.enabled():
+        raise MiddlewareNotUsed
+    metrics.install_query_wrapper()
+
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = metrics.start_request()
+            started = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                stats = metrics.finish_request(token)
+            metrics.record_request(request, response, time.perf_counter() - started, stats)
+            return response
+    else:
+        def middleware(request):
+            token = metrics.start_request()
+            started = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                stats = metrics.finish_request(token)
+            metrics.record_request(request, response, time.perf_counter() - started, stats)
+            return response
+    return middleware
+
+
+class LargeResponseGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware for responses of at least GZIP_MIN_BYTES.
+
+    Meant for big calendar windows; small responses are not worth the CPU.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < getattr(settings, 'GZIP_MIN_BYTES', 16384):
+            return response
+        return super().process_response(request, response)
+
+
+gzip_large_responses = decorator_from_middleware(LargeResponseGZipMiddleware)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_alter_userevent_group'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(fields=['user', 'type', 'date', 'start_time'], name='userevent_user_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(fields=['group', 'date', 'start_time'], name='userevent_group_date_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_member_count(apps, schema_editor):
+    Group = apps.get_model('myapp', 'Group')
+    GroupMembership = apps.get_model('myapp', 'GroupMembership')
+    counts = (GroupMembership.objects.filter(group=OuterRef('pk'))
+              .order_by().values('group').annotate(total=Count('id')).values('total'))
+    Group.objects.update(member_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_userevent_range_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_member_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0013_recurringevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userevent',
+            name='ical_uid',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(fields=['ical_uid'], name='userevent_ical_uid_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:29
+
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copies of the heatmap settings at the time of this migration.
+BUCKET_MINUTES = 30
+MINUTES_PER_DAY = 24 * 60
+
+
+def bucket_span(start_time, end_time):
+    """Buckets an event touches; an end at or before the start runs until midnight."""
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    if end <= start:
+        end = MINUTES_PER_DAY
+    return start // BUCKET_MINUTES, -(-end // BUCKET_MINUTES)
+
+
+def populate_heatmap(apps, schema_editor):
+    # Counted from the events directly: the busy bitmaps only come in 0016.
+    # A member counts once per bucket however many of their events touch it.
+    GroupMembership = apps.get_model('myapp', 'GroupMembership')
+    UserEvent = apps.get_model('myapp', 'UserEvent')
+    GroupHeatmapBucket = apps.get_model('myapp', 'GroupHeatmapBucket')
+    members, groups_of = defaultdict(list), defaultdict(list)
+    for user_id, group_id in GroupMembership.objects.values_list('user_id', 'group_id'):
+        members[group_id].append(user_id)
+        groups_of[user_id].append(group_id)
+    busy = defaultdict(set)
+    rows = UserEvent.objects.order_by().values_list(
+        'type', 'user_id', 'group_id', 'date', 'start_time', 'end_time'
+    ).iterator()
+    for event_type, user_id, group_id, day, start_time, end_time in rows:
+        first, stop = bucket_span(start_time, end_time)
+        for owner in ((user_id,) if event_type == 'solo' else members.get(group_id, ())):
+            busy[owner, day].update(range(first, stop))
+    counts = Counter()
+    for (user_id, day), buckets in busy.items():
+        for group_id in groups_of.get(user_id, ()):
+            for bucket in buckets:
+                counts[group_id, day, bucket] += 1
+    GroupHeatmapBucket.objects.bulk_create(
+        [GroupHeatmapBucket(group_id=group_id, date=day, bucket=bucket, busy=busy)
+         for (group_id, day, bucket), busy in counts.items()],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0014_userevent_ical_uid'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupHeatmapBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('busy', models.IntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='heatmap_buckets', to='myapp.group')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('group', 'date', 'bucket'), name='heatmap_group_date_bucket_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_heatmap, migrations.RunPython.noop),
+    ]
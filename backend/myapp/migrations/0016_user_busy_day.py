@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:52
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Frozen copies of the busy bitmap layout at the time of this migration:
+# bit i of a little-endian 12-byte value is the i-th 15-minute slot.
+SLOT_MINUTES = 15
+MINUTES_PER_DAY = 24 * 60
+BITMAP_BYTES = MINUTES_PER_DAY // SLOT_MINUTES // 8
+
+
+def mask(start_time, end_time):
+    """Bits of the slots an event touches; an end at or before the start runs until midnight."""
+    start = start_time.hour * 60 + start_time.minute
+    end = end_time.hour * 60 + end_time.minute
+    if end <= start:
+        end = MINUTES_PER_DAY
+    first, stop = start // SLOT_MINUTES, -(-end // SLOT_MINUTES)
+    return ((1 << (stop - first)) - 1) << first
+
+
+def populate_busy_days(apps, schema_editor):
+    GroupMembership = apps.get_model('myapp', 'GroupMembership')
+    UserEvent = apps.get_model('myapp', 'UserEvent')
+    UserBusyDay = apps.get_model('myapp', 'UserBusyDay')
+    members = defaultdict(list)
+    for user_id, group_id in GroupMembership.objects.values_list('user_id', 'group_id'):
+        members[group_id].append(user_id)
+    bits = defaultdict(int)
+    rows = UserEvent.objects.order_by().values_list(
+        'type', 'user_id', 'group_id', 'date', 'start_time', 'end_time'
+    ).iterator()
+    for event_type, user_id, group_id, day, start_time, end_time in rows:
+        span = mask(start_time, end_time)
+        for owner in ((user_id,) if event_type == 'solo' else members.get(group_id, ())):
+            bits[owner, day] |= span
+    UserBusyDay.objects.bulk_create(
+        [UserBusyDay(user_id=user_id, date=day, slots=value.to_bytes(BITMAP_BYTES, 'little'))
+         for (user_id, day), value in bits.items() if user_id is not None],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0015_group_heatmap_bucket'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserBusyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slots', models.BinaryField(max_length=12)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='busy_days', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='busyday_user_date_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_busy_days, migrations.RunPython.noop),
+    ]
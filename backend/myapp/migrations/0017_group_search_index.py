@@ -0,0 +1,69 @@
+from django.db import DatabaseError, migrations
+
+# PostgreSQL: a trigram index on the expression Django's icontains and
+# istartswith lookups compare, so name searches stop scanning the table.
+POSTGRES_CREATE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS group_name_trgm_idx "
+    "ON myapp_group USING gin ((UPPER(name::text)) gin_trgm_ops)",
+]
+POSTGRES_DROP = ["DROP INDEX CONCURRENTLY IF EXISTS group_name_trgm_idx"]
+
+# SQLite: an FTS5 trigram index over myapp_group, kept in sync by triggers.
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE myapp_group_search USING fts5("
+    "name, content='myapp_group', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER myapp_group_search_insert AFTER INSERT ON myapp_group BEGIN "
+    "INSERT INTO myapp_group_search(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER myapp_group_search_delete AFTER DELETE ON myapp_group BEGIN "
+    "INSERT INTO myapp_group_search(myapp_group_search, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER myapp_group_search_update AFTER UPDATE OF name ON myapp_group BEGIN "
+    "INSERT INTO myapp_group_search(myapp_group_search, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO myapp_group_search(rowid, name) VALUES (new.id, new.name); END",
+    "INSERT INTO myapp_group_search(myapp_group_search) VALUES ('rebuild')",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS myapp_group_search_insert",
+    "DROP TRIGGER IF EXISTS myapp_group_search_delete",
+    "DROP TRIGGER IF EXISTS myapp_group_search_update",
+    "DROP TABLE IF EXISTS myapp_group_search",
+]
+
+
+def _run(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_CREATE)
+    elif vendor == 'sqlite':
+        try:
+            _run(schema_editor, SQLITE_CREATE)
+        except DatabaseError:
+            # SQLite before 3.34 has no trigram tokenizer; searches scan instead.
+            _run(schema_editor, SQLITE_DROP)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_DROP)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_DROP)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('myapp', '0016_user_busy_day'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
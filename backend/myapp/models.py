@@ -1,13 +1,21 @@
+import secrets
+from itertools import islice
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .recurrence import MAX_OCCURRENCES_PER_SERIES, compute_last_date, occurrence_dates
 
 
 class Group(models.Model):
     name = models.CharField(max_length=100)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by the GroupMembership signals in myapp/signals.py.
+    member_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -24,6 +32,9 @@ class GroupMembership(models.Model):
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='member')
     joined_at = models.DateTimeField(auto_now_add=True)
 
+    EVENT_EDITOR_ROLES = ('admin', 'owner')
+    EVENT_DELETER_ROLES = ('owner',)
+
     class Meta:
         unique_together = ('user', 'group')
 
@@ -31,13 +42,13 @@ class GroupMembership(models.Model):
         return f"{self.user.username} in {self.group.name} as {self.get_role_display()}"
     
     def can_modify_events(self):
-        return self.role in ['admin', 'owner']
+        return self.role in self.EVENT_EDITOR_ROLES
     
     def can_create_events(self):
-        return self.role in ['admin', 'owner']
+        return self.role in self.EVENT_EDITOR_ROLES
 
     def can_delete_events(self):
-        return self.role == 'owner'
+        return self.role in self.EVENT_DELETER_ROLES
 
 class UserEvent(models.Model):
     TYPE_CHOICES = [
@@ -59,10 +70,19 @@ class UserEvent(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     google_event_id = models.CharField(max_length=256, blank=True, null=True)
+    # UID of the VEVENT this event was imported from, used to skip re-imports.
+    ical_uid = models.CharField(max_length=255, blank=True, null=True)
 
 
     class Meta:
         ordering = ['date', 'start_time']
+        indexes = [
+            # Solo lookups filter on user + type and a date range, then sort by date/start_time.
+            models.Index(fields=['user', 'type', 'date', 'start_time'], name='userevent_user_type_date_idx'),
+            models.Index(fields=['group', 'date', 'start_time'], name='userevent_group_date_idx'),
+            models.Index(fields=['updated_at'], name='userevent_updated_at_idx'),
+            models.Index(fields=['ical_uid'], name='userevent_ical_uid_idx'),
+        ]
         
     def clean(self):
         if self.type == 'solo' and not self.user:
@@ -80,12 +100,133 @@ class UserEvent(models.Model):
     
     def user_can_edit(self, user):
         if self.type == 'solo':
-            return self.user == user
-        if self.type == 'group' and self.group:
-            membership = GroupMembership.objects.filter(user=user, group=self.group).first()
-            return membership and membership.can_modify_events()
+            return self.user_id is not None and self.user_id == user.id
+        if self.type == 'group' and self.group_id:
+            from .roles import can_modify_events
+            return can_modify_events(user, self.group_id)
         return False
 
+class RecurringEventQuerySet(models.QuerySet):
+    def overlapping(self, start_date, end_date):
+        """Series that can have occurrences inside [start_date, end_date]."""
+        return self.filter(start_date__lte=end_date).filter(
+            models.Q(last_date__isnull=True) | models.Q(last_date__gte=start_date)
+        )
+
+    def occurrences(self, start_date, end_date):
+        """Expanded occurrences of all matching series, ordered like UserEvent."""
+        occurrences = []
+        for series in self.overlapping(start_date, end_date):
+            occurrences.extend(series.occurrences(start_date, end_date))
+        return _sort_occurrences(occurrences)
+
+    async def aoccurrences(self, start_date, end_date):
+        occurrences = []
+        async for series in self.overlapping(start_date, end_date):
+            occurrences.extend(series.occurrences(start_date, end_date))
+        return _sort_occurrences(occurrences)
+
+
+def _sort_occurrences(occurrences):
+    occurrences.sort(key=lambda occurrence: (occurrence['date'], occurrence['start_time'], occurrence['series']))
+    return occurrences
+
+
+class RecurringEvent(models.Model):
+    """A repeating event whose occurrences are expanded on read, never stored."""
+
+    FREQUENCY_CHOICES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    ]
+
+    type = models.CharField(max_length=20, choices=UserEvent.TYPE_CHOICES)
+    description = models.CharField(max_length=1000)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    location = models.CharField(max_length=200, blank=True)
+
+    user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL)
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, blank=True)
+
+    start_date = models.DateField()
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveSmallIntegerField(default=1)
+    # Comma separated weekdays (0 = Monday) for weekly series; defaults to start_date's weekday.
+    byweekday = models.CharField(max_length=13, blank=True)
+    until = models.DateField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True)
+    # ISO dates of cancelled occurrences.
+    exdates = models.JSONField(default=list, blank=True)
+    # Derived from until/count on save; NULL means open-ended.
+    last_date = models.DateField(null=True, blank=True, editable=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = RecurringEventQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'start_date', 'last_date'], name='recurring_user_bounds_idx'),
+            models.Index(fields=['group', 'start_date', 'last_date'], name='recurring_group_bounds_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_frequency_display()} {self.get_type_display()} from {self.start_date}"
+
+    def save(self, *args, **kwargs):
+        self.last_date = compute_last_date(self)
+        super().save(*args, **kwargs)
+
+    def occurrence_dates(self, start_date, end_date):
+        return occurrence_dates(self, start_date, end_date)
+
+    def occurrences(self, start_date, end_date):
+        """Event-shaped dicts for the first ``MAX_OCCURRENCES_PER_SERIES`` occurrences inside the window."""
+        return [
+            {
+                "series": self.id,
+                "type": self.type,
+                "description": self.description,
+                "date": day.isoformat(),
+                "start_time": self.start_time.isoformat(),
+                "end_time": self.end_time.isoformat(),
+                "location": self.location,
+                "user": self.user_id,
+                "group": self.group_id,
+            }
+            for day in islice(self.occurrence_dates(start_date, end_date), MAX_OCCURRENCES_PER_SERIES)
+        ]
+
+
+class EventParticipationManager(models.Manager):
+    def create_for_event(self, event, exclude_user=None):
+        """Create 'maybe' records for every member of a group event's group."""
+        if event.type != 'group' or not event.group_id:
+            return
+        user_ids = GroupMembership.objects.filter(group_id=event.group_id)
+        if exclude_user is not None:
+            user_ids = user_ids.exclude(user=exclude_user)
+        self.bulk_create(
+            [self.model(user_id=user_id, event=event, response='maybe')
+             for user_id in user_ids.values_list('user_id', flat=True)],
+            ignore_conflicts=True,
+        )
+
+    def create_for_membership(self, membership):
+        """Create 'maybe' records for a new member on the group's upcoming events."""
+        event_ids = UserEvent.objects.filter(
+            type='group', group_id=membership.group_id, date__gte=timezone.localdate()
+        ).order_by().values_list('id', flat=True)
+        self.bulk_create(
+            [self.model(user_id=membership.user_id, event_id=event_id, response='maybe')
+             for event_id in event_ids],
+            ignore_conflicts=True,
+        )
+
+
 class EventParticipation(models.Model):
     RESPONSE_CHOICES = [
         ('yes', 'Yes'),
@@ -98,8 +239,128 @@ class EventParticipation(models.Model):
     response = models.CharField(max_length=10, choices=RESPONSE_CHOICES, default='maybe')
     responded_at = models.DateTimeField(auto_now=True)
 
+    objects = EventParticipationManager()
+
     class Meta:
         unique_together = ('user', 'event')
+        indexes = [
+            models.Index(fields=['responded_at'], name='participation_responded_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event} → {self.get_response_display()}"
+
+
+class ChangeTombstone(models.Model):
+    """Remembers deleted rows so the change feed can report them.
+
+    ``object_id`` is the event id for 'event' and 'participation' rows and
+    the group id for 'membership' rows. Events moved to another owner, type
+    or group also get an 'event' row for their previous audience.
+    """
+
+    KIND_CHOICES = [
+        ('event', 'Event'),
+        ('participation', 'Participation'),
+        ('membership', 'Membership'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    user_id = models.BigIntegerField(null=True, blank=True)
+    group_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.object_id} deleted at {self.deleted_at}"
+
+
+class GroupHeatmapBucket(models.Model):
+    """Busy member count of a group in one 30-minute bucket of a day; see myapp.heatmap."""
+
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='heatmap_buckets')
+    date = models.DateField()
+    bucket = models.PositiveSmallIntegerField()
+    busy = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'date', 'bucket'], name='heatmap_group_date_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.group_id} {self.date} #{self.bucket}: {self.busy}"
+
+
+class UserBusyDay(models.Model):
+    """One user's busy 15-minute slots of a day, packed into bits; see myapp.busymap."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='busy_days')
+    date = models.DateField()
+    slots = models.BinaryField(max_length=12)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='busyday_user_date_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.date}: {bytes(self.slots).hex()}"
+
+
+class EmailOutboxManager(models.Manager):
+    def enqueue(self, subject, body, from_email, recipients):
+        """Queue one message per recipient; call inside the transaction of the change."""
+        return self.bulk_create([
+            self.model(subject=subject, body=body, from_email=from_email, recipient=recipient)
+            for recipient in recipients if recipient
+        ])
+
+
+class EmailOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipient = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = EmailOutboxManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject} ({self.get_status_display()})"
+
+
+class CalendarFeedTokenManager(models.Manager):
+    def rotate(self, user):
+        """Give ``user`` a new feed key; links with the old one stop working."""
+        token, _ = self.update_or_create(user=user, defaults={'key': secrets.token_urlsafe(32)})
+        return token
+
+
+class CalendarFeedToken(models.Model):
+    """Secret key in a user's ICS subscription links, for calendar apps that cannot send a JWT."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='feed_token')
+    key = models.CharField(max_length=64, unique=True)
+    rotated_at = models.DateTimeField(auto_now=True)
+
+    objects = CalendarFeedTokenManager()
+
+    def __str__(self):
+        return f"Feed key of {self.user_id}"
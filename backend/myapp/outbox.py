@@ -0,0 +1,84 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+
+def _build_message(rows):
+    """One email per recipient; several queued notifications become a digest."""
+    if len(rows) == 1:
+        subject, body = rows[0].subject, rows[0].body
+    else:
+        subject = f"{len(rows)} group event updates"
+        body = "\n\n----------\n\n".join(row.body for row in rows)
+    return EmailMessage(subject, body, rows[0].from_email, [rows[0].recipient])
+
+
+def drain_outbox(batch_size=100, max_attempts=5, backoff=60, connection=None):
+    """Send due outbox rows over a single SMTP connection.
+
+    Failed rows are retried with exponential backoff (backoff * 2 ** attempts
+    seconds) and marked failed after ``max_attempts``. Returns counts of
+    sent, retried and failed rows.
+    """
+    stats = {'sent': 0, 'retried': 0, 'failed': 0}
+    now = timezone.now()
+
+    with transaction.atomic():
+        rows = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if not rows:
+            return stats
+
+        by_recipient = defaultdict(list)
+        for row in rows:
+            by_recipient[row.recipient].append(row)
+
+        connection = connection or get_connection(fail_silently=False)
+        try:
+            connection.open()
+            opened = True
+            open_error = None
+        except Exception as exc:
+            opened = False
+            open_error = exc
+
+        try:
+            for recipient_rows in by_recipient.values():
+                error = open_error
+                if opened:
+                    try:
+                        connection.send_messages([_build_message(recipient_rows)])
+                    except Exception as exc:
+                        error = exc
+
+                for row in recipient_rows:
+                    row.attempts += 1
+                    if error is None:
+                        row.status = 'sent'
+                        row.sent_at = now
+                        row.last_error = ''
+                        stats['sent'] += 1
+                    elif row.attempts >= max_attempts:
+                        row.status = 'failed'
+                        row.last_error = str(error)
+                        stats['failed'] += 1
+                    else:
+                        row.next_attempt_at = now + timedelta(seconds=backoff * 2 ** (row.attempts - 1))
+                        row.last_error = str(error)
+                        stats['retried'] += 1
+        finally:
+            if opened:
+                connection.close()
+
+        EmailOutbox.objects.bulk_update(
+            rows, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+        )
+    return stats
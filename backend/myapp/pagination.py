@@ -0,0 +1,114 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_time
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _params(request):
+    # Async views get a plain Django request without DRF's query_params.
+    return getattr(request, 'query_params', request.GET)
+
+
+class EventKeysetPagination(BasePagination):
+    """Cursor pagination for UserEvent lists keyed on (date, start_time, id).
+
+    The cursor stores the key of the last row of the previous page, so every
+    page is a bounded index range scan no matter how deep the client goes.
+    """
+
+    page_size = 500
+    max_page_size = 2000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    ordering = ('date', 'start_time', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(_params(request)[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def encode_cursor(self, event):
+        # Pages are model instances or ``.values()`` dicts.
+        if isinstance(event, dict):
+            day, start_time, pk = event['date'], event['start_time'], event['id']
+        else:
+            day, start_time, pk = event.date, event.start_time, event.id
+        raw = f"{day.isoformat()}|{start_time.isoformat()}|{pk}"
+        return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = _params(request).get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode()
+            day, start_time, pk = raw.split('|')
+            position = parse_date(day), parse_time(start_time), int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in position:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def _page_rows(self, queryset, request):
+        """(queryset of page_size + 1 rows after the cursor, page_size)."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        position = self.decode_cursor(request)
+        if position:
+            day, start_time, pk = position
+            queryset = queryset.filter(date__gte=day).filter(
+                Q(date__gt=day) |
+                Q(date=day, start_time__gt=start_time) |
+                Q(date=day, start_time=start_time, id__gt=pk)
+            )
+
+        return queryset[:page_size + 1], page_size
+
+    def _cut(self, rows, page_size):
+        page = rows[:page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if len(rows) > page_size else None
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows, page_size = self._page_rows(queryset, request)
+        return self._cut(list(rows), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        rows, page_size = self._page_rows(queryset, request)
+        return self._cut([row async for row in rows], page_size)
+
+    def get_next_link(self):
+        return self.link(self.request, self.next_cursor)
+
+    @classmethod
+    def link(cls, request, cursor):
+        """URL of the page after ``cursor`` for ``request``, or None without a cursor."""
+        if cursor is None:
+            return None
+        return replace_query_param(request.build_absolute_uri(), cls.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = "myapp.push.InProcessBroker"
+DEFAULT_QUEUE_SIZE = 256
+
+EVENT_FIELDS = ('id', 'type', 'user_id', 'group_id', 'description', 'date', 'start_time', 'end_time', 'location')
+# Payloads use the API's field names.
+PAYLOAD_NAMES = {'user_id': 'user', 'group_id': 'group'}
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def group_channel(group_id):
+    return f"group:{group_id}"
+
+
+class Subscription:
+    """One stream's view of the broker: a bounded queue fed from any thread.
+
+    A subscriber that falls behind is not allowed to grow the queue; its
+    pending messages are dropped and it receives a single ``resync`` so the
+    client reloads through events/changes/ instead.
+    """
+
+    def __init__(self, broker, loop, maxsize):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.channels = set()
+        self.overflowed = False
+
+    def add(self, channel):
+        self.broker._attach(self, channel)
+
+    def discard(self, channel):
+        self.broker._detach(self, channel)
+
+    def close(self):
+        for channel in list(self.channels):
+            self.discard(channel)
+
+    def deliver(self, message):
+        """Queue a message; must run on the subscription's event loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(message_for("resync", {}))
+
+    async def get(self, timeout=None):
+        """Next (kind, data, frame) message, or None when ``timeout`` passes first."""
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.overflowed = False
+        return message
+
+
+class InProcessBroker:
+    """Fans messages out to subscriptions of this process only.
+
+    Enough for a single ASGI worker. With several workers set PUSH_BROKER to
+    a class with the same ``subscribe``/``publish`` methods that relays
+    ``publish`` through a shared bus (e.g. Redis pub/sub) and hands incoming
+    messages to ``deliver_local``.
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or getattr(settings, "PUSH_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, loop=None):
+        subscription = Subscription(self, loop or asyncio.get_running_loop(), self.queue_size)
+        for channel in channels:
+            subscription.add(channel)
+        return subscription
+
+    def _attach(self, subscription, channel):
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+            subscription.channels.add(channel)
+
+    def _detach(self, subscription, channel):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+            subscription.channels.discard(channel)
+
+    def has_subscribers(self, channel):
+        return channel in self._subscribers
+
+    def deliver_local(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The stream's loop is gone without closing the subscription.
+                subscription.close()
+
+    def publish(self, channel, message):
+        """Send a message to every subscriber of ``channel``; thread safe."""
+        self.deliver_local(channel, message)
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, "PUSH_BROKER", DEFAULT_BROKER))()
+    return _broker
+
+
+def encode(kind, data):
+    """Server-sent event frame for one message."""
+    return f"event: {kind}\ndata: {json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))}\n\n"
+
+
+def message_for(kind, data):
+    """(kind, data, frame); the frame is encoded once and shared by every subscriber."""
+    return kind, data, encode(kind, data)
+
+
+def publish(channels, kind, data):
+    message = message_for(kind, data)
+    broker = get_broker()
+    for channel in channels:
+        broker.publish(channel, message)
+
+
+def event_channel(user_id, group_id):
+    return group_channel(group_id) if group_id else user_channel(user_id)
+
+
+def event_diff(values, previous=None):
+    """Compact upsert payload: the full row for new events, changed fields otherwise."""
+    changed = [key for key in EVENT_FIELDS if previous is None or key == 'id' or values[key] != previous.get(key)]
+    return {PAYLOAD_NAMES.get(key, key): values[key] for key in changed}
+
+
+def publish_resync(user_id, group_id):
+    """Tell subscribers to reload after bulk writes, which skip model signals."""
+    publish([event_channel(user_id, group_id)], "resync", {})
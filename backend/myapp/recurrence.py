@@ -0,0 +1,97 @@
+from calendar import monthrange
+from datetime import date, timedelta
+
+# Accepted by the API; larger values add nothing a calendar can show.
+MAX_INTERVAL = 99
+MAX_COUNT = 1000
+# Occurrences one series contributes to an event list response.
+MAX_OCCURRENCES_PER_SERIES = 366
+
+
+def parse_weekdays(value, default):
+    if not value:
+        return (default,)
+    return tuple(sorted({int(day) for day in value.split(',')}))
+
+
+def _daily(series, lo, hi):
+    step = series.interval
+    offset = (lo - series.start_date).days
+    day = series.start_date + timedelta(days=-(-offset // step) * step)
+    while day <= hi:
+        yield day
+        day += timedelta(days=step)
+
+
+def _weekly(series, lo, hi):
+    weekdays = parse_weekdays(series.byweekday, series.start_date.weekday())
+    first_week = series.start_date - timedelta(days=series.start_date.weekday())
+    week = lo - timedelta(days=lo.weekday())
+    skip = ((week - first_week).days // 7) % series.interval
+    if skip:
+        week += timedelta(weeks=series.interval - skip)
+    while week <= hi:
+        for weekday in weekdays:
+            day = week + timedelta(days=weekday)
+            if lo <= day <= hi:
+                yield day
+        week += timedelta(weeks=series.interval)
+
+
+def _monthly(series, lo, hi):
+    start = series.start_date
+    months = (lo.year - start.year) * 12 + lo.month - start.month
+    months += -months % series.interval
+    while True:
+        year, month = divmod(start.month - 1 + months, 12)
+        year += start.year
+        month += 1
+        if date(year, month, 1) > hi:
+            return
+        if start.day <= monthrange(year, month)[1]:
+            day = date(year, month, start.day)
+            if lo <= day <= hi:
+                yield day
+        months += series.interval
+
+
+EXPANDERS = {
+    'daily': _daily,
+    'weekly': _weekly,
+    'monthly': _monthly,
+}
+
+
+def occurrence_dates(series, window_start, window_end, skip_exdates=True):
+    """Dates of ``series`` inside [window_start, window_end].
+
+    Only the window is walked, so the cost does not depend on how long the
+    series has been running.
+    """
+    lo = max(window_start, series.start_date)
+    hi = window_end if series.last_date is None else min(window_end, series.last_date)
+    if lo > hi:
+        return
+    exdates = set(series.exdates or ()) if skip_exdates else set()
+    for day in EXPANDERS[series.frequency](series, lo, hi):
+        if day.isoformat() not in exdates:
+            yield day
+
+
+def compute_last_date(series):
+    """Last possible occurrence date, or None for an open-ended series."""
+    last = series.until
+    if series.count:
+        # Exceptions remove occurrences but do not extend the series.
+        days = min(366 * series.interval * series.count, (date.max - series.start_date).days)
+        horizon = last or series.start_date + timedelta(days=days)
+        seen = 0
+        try:
+            for day in EXPANDERS[series.frequency](series, series.start_date, horizon):
+                seen += 1
+                if seen == series.count:
+                    return day
+        except (OverflowError, ValueError):
+            # Runs past the last representable date: as good as open-ended.
+            pass
+    return last
@@ -0,0 +1,46 @@
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import columnar
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is installed.
+
+    The bytes match JSONRenderer's compact UTF-8 output, including its
+    escaping of U+2028/U+2029. Indented (browsable) output and installs
+    without orjson use JSONRenderer itself.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        content = orjson.dumps(data, default=JSONEncoder().default)
+        if b'\xe2\x80' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class ColumnarEventRenderer(BaseRenderer):
+    """Event lists as parallel arrays (see myapp.columnar), for ``?format=columnar``.
+
+    Responses without a ``results`` list, such as errors, are plain JSON.
+    """
+
+    media_type = 'application/vnd.team-calendar.columnar+json'
+    format = 'columnar'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and isinstance(data.get('results'), list):
+            data = columnar.encode(data)
+        return FastJSONRenderer().render(data)
+
+
+# Renderers of the event list endpoints.
+EVENT_LIST_RENDERERS = [FastJSONRenderer, ColumnarEventRenderer, BrowsableAPIRenderer]
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+from .models import GroupMembership
+
+ROLES_KEY = "roles:{user_id}"
+REQUEST_ATTR = "_group_roles"
+
+
+def _timeout():
+    return getattr(settings, "ROLE_CACHE_TIMEOUT", 600)
+
+
+def get_roles(user_id, request=None):
+    """Map of group_id -> role for every group the user belongs to.
+
+    The map is loaded with one query, kept in the cache until the user's
+    memberships change, and memoised on ``request`` when one is given so a
+    request resolves it at most once.
+    """
+    memo = _memo(request)
+    if memo is not None and user_id in memo:
+        return memo[user_id]
+
+    key = ROLES_KEY.format(user_id=user_id)
+    roles = cache.get(key)
+    metrics.cache_lookup('roles', roles is not None)
+    if roles is None:
+        roles = dict(GroupMembership.objects.filter(user_id=user_id).values_list('group_id', 'role'))
+        cache.set(key, roles, _timeout())
+    return _remember(request, user_id, roles)
+
+
+async def aget_roles(user_id, request=None):
+    """Async variant of get_roles for async views."""
+    memo = _memo(request)
+    if memo is not None and user_id in memo:
+        return memo[user_id]
+
+    key = ROLES_KEY.format(user_id=user_id)
+    roles = await cache.aget(key)
+    metrics.cache_lookup('roles', roles is not None)
+    if roles is None:
+        roles = {group_id: role async for group_id, role in
+                 GroupMembership.objects.filter(user_id=user_id).values_list('group_id', 'role')}
+        await cache.aset(key, roles, _timeout())
+    return _remember(request, user_id, roles)
+
+
+def _memo(request):
+    return getattr(request, REQUEST_ATTR, None) if request is not None else None
+
+
+def _remember(request, user_id, roles):
+    if request is not None:
+        memo = _memo(request)
+        if memo is None:
+            memo = {}
+            setattr(request, REQUEST_ATTR, memo)
+        memo[user_id] = roles
+    return roles
+
+
+def get_role(user, group_id, request=None):
+    if not getattr(user, 'is_authenticated', False) or not group_id:
+        return None
+    return get_roles(user.id, request).get(group_id)
+
+
+def is_member(user, group_id, request=None):
+    return get_role(user, group_id, request) is not None
+
+
+def can_create_events(user, group_id, request=None):
+    return get_role(user, group_id, request) in GroupMembership.EVENT_EDITOR_ROLES
+
+
+def can_modify_events(user, group_id, request=None):
+    return get_role(user, group_id, request) in GroupMembership.EVENT_EDITOR_ROLES
+
+
+def can_delete_events(user, group_id, request=None):
+    return get_role(user, group_id, request) in GroupMembership.EVENT_DELETER_ROLES
+
+
+def invalidate(user_id):
+    cache.delete(ROLES_KEY.format(user_id=user_id))
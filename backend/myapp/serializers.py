@@ -1,6 +1,14 @@
+import functools
+
 from rest_framework import serializers
-from .models import UserEvent, Group, GroupMembership, EventParticipation
+from .models import UserEvent, Group, GroupMembership, EventParticipation, RecurringEvent
+from . import busymap, calendar_cache, conflicts, heatmap, push
+from .recurrence import MAX_COUNT, MAX_INTERVAL
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
 from rest_framework import serializers
 
 class UserSerializer(serializers.ModelSerializer):
@@ -56,50 +64,180 @@ class UserEventSerializer(serializers.ModelSerializer):
         return instance
 
 
-class GroupSerializer(serializers.ModelSerializer):
-    member_count = serializers.SerializerMethodField()
+def _iso(value):
+    return None if value is None else value.isoformat()
+
+
+def _iso_datetime(zone):
+    """DateTimeField.to_representation for ``zone``: local time, UTC spelled 'Z'."""
+    def convert(value):
+        if value is None:
+            return None
+        if zone is not None and value.tzinfo is not None:
+            value = value.astimezone(zone)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+class UserEventRowSerializer:
+    """UserEventSerializer's read output, built from ``.values()`` rows.
+
+    Event lists with thousands of rows spend most of their time in the
+    ModelSerializer's per-field machinery; this only formats the date and
+    time columns of plain dicts. Use ``values()`` to select the rows.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @staticmethod
+    @functools.cache
+    def fields():
+        """(name, kind) pairs in UserEventSerializer's output order."""
+        kinds = []
+        for name, field in UserEventSerializer().fields.items():
+            if isinstance(field, serializers.DateTimeField):
+                kinds.append((name, 'datetime'))
+            elif isinstance(field, (serializers.DateField, serializers.TimeField)):
+                kinds.append((name, 'iso'))
+            else:
+                kinds.append((name, None))
+        return tuple(kinds)
 
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values(*(name for name, _ in cls.fields()))
+
+    @property
+    def data(self):
+        # Resolve the current time zone once per page, not once per value.
+        iso_datetime = _iso_datetime(timezone.get_current_timezone() if settings.USE_TZ else None)
+        converters = [(name, iso_datetime if kind == 'datetime' else _iso)
+                      for name, kind in self.fields() if kind is not None]
+        for row in self.rows:
+            for name, convert in converters:
+                row[name] = convert(row[name])
+        return self.rows
+
+class GroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = ['id', 'name', 'owner', 'created_at', 'member_count']
-
-    def get_member_count(self, obj):
-        return obj.members.count()
+        read_only_fields = ['member_count']
 
 class GroupMembershipSerializer(serializers.ModelSerializer):
     class Meta:
         model = GroupMembership
         fields = ['id', 'user', 'group', 'joined_at']
 
+    def validate(self, attrs):
+        # Member counts, participations and cached roles follow creates and
+        # deletes only, so a membership never moves to another group or user.
+        if self.instance is not None:
+            for field in ('user', 'group'):
+                if field in attrs and attrs[field] != getattr(self.instance, field):
+                    raise serializers.ValidationError(
+                        {field: "A membership cannot be moved; delete it and create a new one."}
+                    )
+        return attrs
+
+class SlotListSerializer(serializers.ListSerializer):
+    """Validates slot lists without running the full field machinery per row.
+
+    Rows that parse cleanly take the fast path; anything else is handed to
+    SlotSerializer so the client still gets DRF's usual error messages.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            return super().to_internal_value(data)
+
+        slots = []
+        for item in data:
+            slot = self._parse_fast(item)
+            if slot is None:
+                return super().to_internal_value(data)
+            slots.append(slot)
+        if not self.allow_empty and not slots:
+            return super().to_internal_value(data)
+        return slots
+
+    @staticmethod
+    def _parse_fast(item):
+        if not isinstance(item, dict):
+            return None
+        try:
+            slot = {
+                'date': parse_date(item['date']),
+                'hour_start': parse_time(item['hour_start']),
+                'hour_end': parse_time(item['hour_end']),
+            }
+        except (KeyError, TypeError, ValueError):
+            return None
+        return None if None in slot.values() else slot
+
+
 class SlotSerializer(serializers.Serializer):
     date = serializers.DateField()
     hour_start = serializers.TimeField() 
     hour_end = serializers.TimeField() 
 
+    class Meta:
+        list_serializer_class = SlotListSerializer
+
 class EventSubmissionSerializer(serializers.Serializer):
     description = serializers.CharField()
     type = serializers.ChoiceField(choices=UserEvent.TYPE_CHOICES)
     slots = SlotSerializer(many=True)
     groupId = serializers.IntegerField(required=False, allow_null=True)
 
+    batch_size = 500
+    # Conflicts of the slots left out in SKIP mode.
+    skipped = ()
+
+    def _check_conflicts(self, slots, event_type, user, group_id):
+        """The slots to create under the ``conflicts`` mode in the context."""
+        mode = self.context.get('conflicts', conflicts.ALLOW)
+        if mode == conflicts.ALLOW:
+            return slots
+        keep, found = conflicts.batch_conflicts(
+            event_type, user.id, group_id,
+            [(slot['date'], slot['hour_start'], slot['hour_end']) for slot in slots], mode,
+        )
+        if found and mode == conflicts.REJECT:
+            raise conflicts.EventConflictError(found)
+        self.skipped = found
+        return [slots[index] for index in keep]
+
     def create(self, validated_data):
         user = self.context['request'].user
         slots = validated_data.pop('slots')
         group_id = validated_data.pop('groupId', None)
-        created_events = []
-
-        for slot in slots:
-            event = UserEvent.objects.create(
-                user=user if validated_data['type'] == 'solo' else None,
-                group_id=group_id if validated_data['type'] == 'group' else None,
-                description=validated_data['description'],
-                type=validated_data['type'],
-                date=slot['date'],
-                start_time=slot['hour_start'],
-                end_time=slot['hour_end'],
-            )
-            created_events.append(event)
-        return created_events
+        is_solo = validated_data['type'] == 'solo'
+
+        with transaction.atomic():
+            slots = self._check_conflicts(slots, validated_data['type'], user, group_id)
+            events = [
+                UserEvent(
+                    user=user if is_solo else None,
+                    group_id=group_id if not is_solo else None,
+                    description=validated_data['description'],
+                    type=validated_data['type'],
+                    date=slot['date'],
+                    start_time=slot['hour_start'],
+                    end_time=slot['hour_end'],
+                )
+                for slot in slots
+            ]
+            created = UserEvent.objects.bulk_create(events, batch_size=self.batch_size)
+            # bulk_create skips model signals, so update the heatmap and busy bitmaps and invalidate
+            # cached calendars here.
+            heatmap.busy_changed(busymap.events_created(created))
+            owner = (user.id if is_solo else None, group_id if not is_solo else None)
+            transaction.on_commit(lambda: calendar_cache.invalidate_event_owners([owner]))
+            transaction.on_commit(lambda: push.publish_resync(*owner))
+        return created
 
 
 class EventParticipationSerializer(serializers.ModelSerializer):
@@ -107,3 +245,48 @@ class EventParticipationSerializer(serializers.ModelSerializer):
         model = EventParticipation
         fields = ['user', 'event', 'response', 'responded_at']
         read_only_fields = ['responded_at']
+
+
+class RecurringEventSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringEvent
+        fields = '__all__'
+        read_only_fields = ['user', 'last_date', 'created_at', 'updated_at']
+
+    def validate_interval(self, value):
+        if not 1 <= value <= MAX_INTERVAL:
+            raise serializers.ValidationError(f"Interval must be between 1 and {MAX_INTERVAL}.")
+        return value
+
+    def validate_count(self, value):
+        if value is not None and not 1 <= value <= MAX_COUNT:
+            raise serializers.ValidationError(f"Count must be between 1 and {MAX_COUNT}.")
+        return value
+
+    def validate_byweekday(self, value):
+        if not value:
+            return ''
+        try:
+            days = sorted({int(day) for day in value.split(',')})
+        except ValueError:
+            raise serializers.ValidationError("Use comma separated weekday numbers, 0 = Monday.")
+        if any(day < 0 or day > 6 for day in days):
+            raise serializers.ValidationError("Weekdays must be between 0 and 6.")
+        return ','.join(str(day) for day in days)
+
+    def validate_exdates(self, value):
+        if not isinstance(value, list):
+            raise serializers.ValidationError("Expected a list of dates.")
+        try:
+            return sorted({parse_date(day).isoformat() for day in value})
+        except (AttributeError, TypeError, ValueError):
+            raise serializers.ValidationError("Exceptions must be ISO dates (YYYY-MM-DD).")
+
+    def validate(self, attrs):
+        event_type = attrs.get('type', getattr(self.instance, 'type', None))
+        group = attrs.get('group', getattr(self.instance, 'group', None))
+        if event_type == 'group' and group is None:
+            raise serializers.ValidationError({"group": "Group series must be associated with a group."})
+        if event_type == 'solo':
+            attrs['group'] = None
+        return attrs
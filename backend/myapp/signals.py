@@ -0,0 +1,236 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import busymap, calendar_cache, heatmap, push, roles
+from .models import ChangeTombstone, EventParticipation, Group, GroupMembership, RecurringEvent, UserEvent
+
+
+@receiver(post_save, sender=GroupMembership)
+def increment_member_count(sender, instance, created, **kwargs):
+    if created:
+        Group.objects.filter(id=instance.group_id).update(member_count=F('member_count') + 1)
+        EventParticipation.objects.create_for_membership(instance)
+
+
+@receiver(post_delete, sender=GroupMembership)
+def decrement_member_count(sender, instance, **kwargs):
+    Group.objects.filter(id=instance.group_id, member_count__gt=0).update(member_count=F('member_count') - 1)
+
+
+@receiver(post_delete, sender=UserEvent)
+def record_event_tombstone(sender, instance, **kwargs):
+    ChangeTombstone.objects.create(
+        kind='event', object_id=instance.id, user_id=instance.user_id, group_id=instance.group_id,
+    )
+
+
+def _deleted_with(origin, *models):
+    """Whether a delete cascaded from an instance or queryset of one of ``models``."""
+    return isinstance(origin, models) or getattr(origin, 'model', None) in models
+
+
+def _deleted_ids(origin):
+    """Primary keys of the objects a delete started from; read once per queryset delete."""
+    if not isinstance(origin, QuerySet):
+        return {origin.pk} if origin is not None else set()
+    if not hasattr(origin, '_deleted_ids'):
+        origin._deleted_ids = set(origin.values_list('pk', flat=True))
+    return origin._deleted_ids
+
+
+@receiver(post_save, sender=UserEvent)
+def record_moved_event_tombstone(sender, instance, **kwargs):
+    # A new owner, type or group can take the event out of its old audience's
+    # view; they see it as deleted. The feed drops it for callers who still see it.
+    previous = instance._previous_values
+    if not previous:
+        return
+    if (previous['type'], previous['user_id'], previous['group_id']) != (
+            instance.type, instance.user_id, instance.group_id):
+        ChangeTombstone.objects.create(
+            kind='event', object_id=instance.id, user_id=previous['user_id'], group_id=previous['group_id'],
+        )
+
+
+@receiver(post_delete, sender=EventParticipation)
+def record_participation_tombstone(sender, instance, origin=None, **kwargs):
+    # Participations removed together with their event or group are covered by
+    # the event and membership tombstones.
+    if _deleted_with(origin, UserEvent, Group):
+        return
+    ChangeTombstone.objects.create(
+        kind='participation', object_id=instance.event_id, user_id=instance.user_id,
+    )
+
+
+@receiver(post_delete, sender=GroupMembership)
+def record_membership_tombstone(sender, instance, **kwargs):
+    ChangeTombstone.objects.create(
+        kind='membership', object_id=instance.group_id, user_id=instance.user_id, group_id=instance.group_id,
+    )
+
+
+@receiver(pre_save, sender=UserEvent)
+@receiver(pre_save, sender=RecurringEvent)
+def remember_previous_event(sender, instance, **kwargs):
+    instance._previous_owner = None
+    instance._previous_values = None
+    if instance.pk:
+        # UserEvent keeps the old row to push only the changed fields.
+        fields = push.EVENT_FIELDS if sender is UserEvent else ('user_id', 'group_id')
+        previous = sender.objects.filter(pk=instance.pk).values(*fields).first()
+        if previous:
+            instance._previous_values = previous
+            instance._previous_owner = (previous['user_id'], previous['group_id'])
+
+
+@receiver(post_save, sender=UserEvent)
+@receiver(post_save, sender=RecurringEvent)
+def invalidate_calendar_on_event_save(sender, instance, **kwargs):
+    owners = [(instance.user_id, instance.group_id)]
+    if getattr(instance, '_previous_owner', None):
+        owners.append(instance._previous_owner)
+    transaction.on_commit(lambda: calendar_cache.invalidate_event_owners(owners))
+
+
+@receiver(post_delete, sender=UserEvent)
+@receiver(post_delete, sender=RecurringEvent)
+def invalidate_calendar_on_event_delete(sender, instance, origin=None, **kwargs):
+    # When a whole group is deleted its membership deletes invalidate the members.
+    owners = [(instance.user_id, None if isinstance(origin, Group) else instance.group_id)]
+    transaction.on_commit(lambda: calendar_cache.invalidate_event_owners(owners))
+
+
+@receiver(post_save, sender=GroupMembership)
+@receiver(post_delete, sender=GroupMembership)
+def invalidate_calendar_on_membership_change(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: calendar_cache.invalidate_users([user_id]))
+
+
+@receiver(post_save, sender=GroupMembership)
+@receiver(post_delete, sender=GroupMembership)
+def invalidate_roles_on_membership_change(sender, instance, **kwargs):
+    # Drop the cached roles right away for this transaction's own reads, and
+    # again on commit in case another request re-cached the old roles meanwhile.
+    user_id = instance.user_id
+    roles.invalidate(user_id)
+    transaction.on_commit(lambda: roles.invalidate(user_id))
+
+
+@receiver(post_save, sender=UserEvent)
+def push_event_save(sender, instance, **kwargs):
+    values = {field: getattr(instance, field) for field in push.EVENT_FIELDS}
+    previous = instance._previous_values
+    channel = push.event_channel(values['user_id'], values['group_id'])
+    if previous:
+        old_channel = push.event_channel(previous['user_id'], previous['group_id'])
+        if old_channel != channel:
+            # Moved to another calendar: gone for the old audience, new for the other.
+            transaction.on_commit(lambda: push.publish([old_channel], 'event.delete', {'id': values['id']}))
+            previous = None
+    diff = push.event_diff(values, previous)
+    if len(diff) > 1:
+        transaction.on_commit(lambda: push.publish([channel], 'event', diff))
+
+
+@receiver(post_delete, sender=UserEvent)
+def push_event_delete(sender, instance, **kwargs):
+    channel = push.event_channel(instance.user_id, instance.group_id)
+    event_id = instance.id
+    transaction.on_commit(lambda: push.publish([channel], 'event.delete', {'id': event_id}))
+
+
+@receiver(post_save, sender=EventParticipation)
+@receiver(post_delete, sender=EventParticipation)
+def push_participation_change(sender, instance, origin=None, **kwargs):
+    if _deleted_with(origin, UserEvent, Group):
+        return
+    if EventParticipation.event.is_cached(instance):
+        group_id = instance.event.group_id
+    else:
+        group_id = UserEvent.objects.filter(id=instance.event_id).values_list('group_id', flat=True).first()
+    if not group_id:
+        return
+    kind = 'participation' if kwargs.get('signal') is post_save else 'participation.delete'
+    data = {'event': instance.event_id, 'user': instance.user_id, 'response': instance.response}
+    transaction.on_commit(lambda: push.publish([push.group_channel(group_id)], kind, data))
+
+
+@receiver(post_save, sender=GroupMembership)
+@receiver(post_delete, sender=GroupMembership)
+def push_membership_change(sender, instance, **kwargs):
+    kind = 'membership' if kwargs.get('signal') is post_save else 'membership.delete'
+    data = {'group': instance.group_id, 'user': instance.user_id, 'role': instance.role}
+    channels = [push.group_channel(instance.group_id), push.user_channel(instance.user_id)]
+    transaction.on_commit(lambda: push.publish(channels, kind, data))
+
+
+@receiver(post_save, sender=User)
+def reset_caches_for_new_user(sender, instance, created, **kwargs):
+    # SQLite may hand out the id of a deleted user again; never inherit its cache entries.
+    if created:
+        roles.invalidate(instance.id)
+        calendar_cache.invalidate_users([instance.id])
+
+
+@receiver(pre_delete, sender=User)
+def rebuild_heatmap_on_user_delete(sender, instance, **kwargs):
+    # A user delete cascades to memberships, owned groups and their events at
+    # once; recompute the groups it touches instead of chasing each step.
+    affected = set(GroupMembership.objects.filter(
+        user_id__in=GroupMembership.objects.filter(
+            Q(user=instance) | Q(group__owner=instance)
+        ).values('user_id')
+    ).values_list('group_id', flat=True))
+    transaction.on_commit(lambda: heatmap.rebuild(
+        list(Group.objects.filter(id__in=affected).values_list('id', flat=True))
+    ))
+
+
+# The busy bitmaps follow events and memberships; the heatmap follows the
+# bitmaps that changed.
+@receiver(post_save, sender=UserEvent)
+def update_busymap_on_event_save(sender, instance, **kwargs):
+    heatmap.busy_changed(busymap.event_saved(instance, instance._previous_values))
+
+
+@receiver(post_delete, sender=UserEvent)
+def update_busymap_on_event_delete(sender, instance, origin=None, **kwargs):
+    # A user delete keeps solo events (ownerless) and reaches group events only
+    # through owned groups, whose delete refreshes their members at once.
+    if _deleted_with(origin, Group, User):
+        return
+    heatmap.busy_changed(busymap.refresh(busymap.keys_of([busymap.event_row(instance)])))
+
+
+@receiver(post_save, sender=GroupMembership)
+def update_busymap_on_membership_add(sender, instance, created, **kwargs):
+    if created:
+        heatmap.member_changed(instance.user_id, instance.group_id, 1)
+        heatmap.busy_changed(busymap.membership_changed(instance.user_id, instance.group_id))
+
+
+@receiver(post_delete, sender=GroupMembership)
+def update_busymap_on_membership_delete(sender, instance, origin=None, **kwargs):
+    # Covered by the group delete, or the rows go with the user.
+    if _deleted_with(origin, Group, User):
+        return
+    heatmap.member_changed(instance.user_id, instance.group_id, -1)
+    heatmap.busy_changed(busymap.membership_changed(instance.user_id, instance.group_id))
+
+
+@receiver(pre_delete, sender=Group)
+def collect_busymap_days_on_group_delete(sender, instance, origin=None, **kwargs):
+    # Refreshed once the cascade removed the events, skipping users being deleted.
+    gone = _deleted_ids(origin) if _deleted_with(origin, User) else set()
+    instance._busymap_keys = {key for key in busymap.group_keys(instance.id) if key[0] not in gone}
+
+
+@receiver(post_delete, sender=Group)
+def update_busymap_on_group_delete(sender, instance, **kwargs):
+    # The group's heatmap rows went with it; its members' other groups follow their bitmaps.
+    heatmap.busy_changed(busymap.refresh(getattr(instance, '_busymap_keys', ())))
@@ -0,0 +1,77 @@
+from datetime import date, time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp.models import Group, GroupMembership, RecurringEvent, UserEvent
+
+
+class AsyncViewParityTests(TestCase):
+    """The ASGI routes must answer exactly like the DRF views they replace."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='bob', password='pass')
+        owner = User.objects.create_user(username='alice', password='pass')
+        self.group = Group.objects.create(name='Team', owner=owner)
+        GroupMembership.objects.create(user=owner, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.user, group=self.group)
+        for day in range(1, 6):
+            UserEvent.objects.create(type='solo', user=self.user, description=f'Solo {day}', date=date(2025, 6, day),
+                                     start_time=time(9, 0), end_time=time(10, 0))
+            UserEvent.objects.create(type='group', group=self.group, description='Team sync',
+                                     date=date(2025, 6, day), start_time=time(11, 0), end_time=time(12, 0))
+        RecurringEvent.objects.create(type='solo', user=self.user, description='Gym', start_date=date(2025, 6, 2),
+                                      start_time=time(7, 0), end_time=time(8, 0), frequency='weekly')
+        self.token = f'Bearer {AccessToken.for_user(self.user)}'
+
+    async def _both(self, url, params=None):
+        await cache.aclear()
+        asgi = await self.async_client.get(url, params, headers={'Authorization': self.token})
+        await cache.aclear()
+        wsgi = await sync_to_async(self.client.get)(url, params, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(asgi.status_code, wsgi.status_code)
+        self.assertEqual(asgi.content, wsgi.content)
+        return asgi
+
+    async def test_event_lists_match(self):
+        response = await self._both('/api/events/', {'start_date': '2025-06-01', 'end_date': '2025-06-30',
+                                                     'page_size': 4})
+        data = response.json()
+        self.assertEqual(len(data['results']), 4)
+        self.assertEqual(len(data['occurrences']), 5)
+        await self._both('/api/events/', {'start_date': '2025-06-01', 'end_date': '2025-06-30',
+                                          'cursor': data['next'].split('cursor=')[1].split('&')[0]})
+        await self._both('/api/availability/filter/', {'id': self.user.id, 'start_date': '2025-06-01',
+                                                       'end_date': '2025-06-30', 'page_size': 2})
+        await self._both('/api/availability/filter/', {'id': self.user.id})
+        await self._both('/api/events/', {'start_date': '2025-06-01', 'end_date': '2025-06-30',
+                                          'format': 'columnar'})
+
+    async def test_cached_pages_link_in_the_requested_format(self):
+        params = {'start_date': '2025-06-01', 'end_date': '2025-06-30', 'page_size': 4}
+        await cache.aclear()
+        packed = await self.async_client.get('/api/events/', {**params, 'format': 'columnar'},
+                                             headers={'Authorization': self.token})
+        plain = await self.async_client.get('/api/events/', params, headers={'Authorization': self.token})
+        self.assertIn('format=columnar', packed.json()['next'])
+        self.assertNotIn('format=columnar', plain.json()['next'])
+
+    async def test_group_reads_match(self):
+        await self._both('/api/groups/my-groups/')
+        response = await self._both(f'/api/groups/{self.group.id}/members/')
+        self.assertEqual(len(response.json()), 2)
+        await self._both('/api/groups/999/members/')
+
+    async def test_requires_a_valid_token(self):
+        response = await self.async_client.get('/api/groups/my-groups/')
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get('/api/groups/my-groups/', headers={'Authorization': 'Bearer nope'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_asgi_requests_use_the_async_views(self):
+        response = await self.async_client.get('/api/groups/my-groups/', headers={'Authorization': self.token})
+        self.assertEqual(response.resolver_match.func.__module__, 'myapp.views.async_views')
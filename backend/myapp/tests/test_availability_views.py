@@ -0,0 +1,124 @@
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from rest_framework.test import APITestCase
+
+from myapp.freebusy import FreeBusyWindow, merge_intervals
+from myapp.models import Group, GroupMembership, RecurringEvent, UserEvent
+
+
+class MergeIntervalsTests(APITestCase):
+    def test_overlapping_and_touching_intervals_are_merged(self):
+        self.assertEqual(list(merge_intervals([60, 120, 0, 30, 30, 45, 100, 150])), [0, 45, 60, 150])
+
+    def test_granularity_rounds_outwards(self):
+        window = FreeBusyWindow(date(2025, 6, 2), date(2025, 6, 2), granularity=30)
+        window.add_event(1, date(2025, 6, 2), time(9, 10), time(9, 40))
+        self.assertEqual(window.to_slots(window.member_busy(1)),
+                         [{"date": "2025-06-02", "start_time": "09:00", "end_time": "10:00"}])
+
+
+class GroupFreeBusyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.other_user = User.objects.create_user(username='alice', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.user)
+        self.other_group = Group.objects.create(name='Other', owner=self.other_user)
+        GroupMembership.objects.create(user=self.user, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.other_user, group=self.group)
+        GroupMembership.objects.create(user=self.other_user, group=self.other_group, role='owner')
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/api/groups/{self.group.id}/freebusy/'
+
+    def _event(self, **kwargs):
+        defaults = {"description": "Busy", "date": date(2025, 6, 2)}
+        defaults.update(kwargs)
+        return UserEvent.objects.create(**defaults)
+
+    def test_merges_solo_and_group_events_of_members(self):
+        self._event(type='solo', user=self.user, start_time=time(9, 0), end_time=time(10, 0))
+        self._event(type='solo', user=self.other_user, start_time=time(9, 30), end_time=time(11, 0))
+        self._event(type='group', group=self.other_group, start_time=time(14, 0), end_time=time(15, 0))
+
+        # group, the viewer's roles, memberships, busy bitmaps, recurring series
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url, {'start_date': '2025-06-01', 'end_date': '2025-06-07'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['busy'], [
+            {"date": "2025-06-02", "start_time": "09:00", "end_time": "11:00"},
+            {"date": "2025-06-02", "start_time": "14:00", "end_time": "15:00"},
+        ])
+        members = {member['user']: member['busy'] for member in response.data['members']}
+        self.assertEqual(len(members[self.user.id]), 1)
+        self.assertEqual(len(members[self.other_user.id]), 2)
+
+    def test_recurring_series_are_expanded_into_the_window(self):
+        RecurringEvent.objects.create(type='solo', user=self.other_user, description='Gym', start_date=date(2025, 5, 1),
+                                      start_time=time(7, 0), end_time=time(8, 0), frequency='weekly', byweekday='0,2')
+        response = self.client.get(self.url, {'start_date': '2025-06-01', 'end_date': '2025-06-07'})
+        self.assertEqual(response.data['busy'], [
+            {"date": "2025-06-02", "start_time": "07:00", "end_time": "08:00"},
+            {"date": "2025-06-04", "start_time": "07:00", "end_time": "08:00"},
+        ])
+
+    def test_non_member_is_forbidden(self):
+        self.client.force_authenticate(user=User.objects.create_user(username='eve', password='pass'))
+        with self.assertNumQueries(2):  # group, roles; no member's busy time is read
+            response = self.client.get(self.url, {'start_date': '2025-06-01', 'end_date': '2025-06-07'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_invalid_parameters(self):
+        response = self.client.get(self.url, {'start_date': '2025-06-01'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'start_date': '2025-06-01', 'end_date': '2025-06-07', 'granularity': 7})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'start_date': '2025-01-01', 'end_date': '2025-12-31'})
+        self.assertEqual(response.status_code, 400)
+
+
+class SuggestSlotsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.other_user = User.objects.create_user(username='alice', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.other_user, group=self.group)
+        self.client.force_authenticate(user=self.user)
+        self.url = f'/api/groups/{self.group.id}/suggest-slots/'
+        # Monday 2025-06-02: bob busy 9-12, alice busy 13-17.
+        UserEvent.objects.create(type='solo', user=self.user, description='Busy', date=date(2025, 6, 2),
+                                 start_time=time(9, 0), end_time=time(12, 0))
+        UserEvent.objects.create(type='solo', user=self.other_user, description='Busy', date=date(2025, 6, 2),
+                                 start_time=time(13, 0), end_time=time(17, 0))
+
+    def test_returns_slots_where_everyone_is_free_first(self):
+        response = self.client.get(self.url, {
+            'start_date': '2025-06-02', 'end_date': '2025-06-02', 'duration': 60, 'quorum': 2, 'limit': 3,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['slots'], [
+            {"date": "2025-06-02", "start_time": "12:00", "end_time": "13:00",
+             "available": 2, "available_members": [self.user.id, self.other_user.id]},
+        ])
+
+    def test_quorum_allows_partial_attendance(self):
+        response = self.client.get(self.url, {
+            'start_date': '2025-06-02', 'end_date': '2025-06-02', 'duration': 120, 'quorum': 1, 'limit': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([slot['start_time'] for slot in response.data['slots']], ['09:00', '09:15'])
+        self.assertEqual(response.data['slots'][0]['available'], 1)
+
+    def test_window_and_membership_are_checked_first(self):
+        response = self.client.get(self.url, {'start_date': '2025-06-01', 'end_date': '2025-09-01'})
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(user=User.objects.create_user(username='eve', password='pass'))
+        with self.assertNumQueries(2):  # group, roles
+            response = self.client.get(self.url, {'start_date': '2025-06-02', 'end_date': '2025-06-06'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_weekend_is_excluded_by_default(self):
+        response = self.client.get(self.url, {'start_date': '2025-06-07', 'end_date': '2025-06-08'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['slots'], [])
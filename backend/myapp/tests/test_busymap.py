@@ -0,0 +1,150 @@
+from datetime import date, time
+from importlib import import_module
+from unittest import mock, skipUnless
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from myapp import busymap
+from myapp.models import Group, GroupMembership, UserBusyDay, UserEvent
+
+DAY = date(2025, 6, 2)
+
+
+def stored():
+    return {(row.user_id, row.date): busymap.from_bytes(row.slots) for row in UserBusyDay.objects.all()}
+
+
+class BitmapTests(SimpleTestCase):
+    def test_mask_and_runs(self):
+        bits = busymap.mask(time(9, 0), time(10, 10)) | busymap.mask(time(23, 50), time(0, 0))
+        self.assertEqual(list(busymap.runs(bits)), [(36, 41), (95, 96)])
+        self.assertEqual(busymap.from_bytes(busymap.to_bytes(bits)), bits)
+        self.assertEqual(len(busymap.to_bytes(bits)), busymap.BITMAP_BYTES)
+
+    @skipUnless(busymap.numpy, "NumPy is not installed")
+    def test_numpy_decoding_matches(self):
+        bitmaps = [busymap.to_bytes(busymap.mask(time(hour % 24, 15), time((hour + 2) % 24, 0)) | 1 << 95)
+                   for hour in range(100)] + [bytes(busymap.BITMAP_BYTES)]
+        with mock.patch.object(busymap, 'numpy', None):
+            expected = busymap.all_runs(bitmaps)
+        self.assertEqual(busymap.all_runs(bitmaps), expected)
+
+
+class BusymapMaintenanceTests(TestCase):
+    """Every change must leave the table equal to a rebuild from scratch."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass')
+        self.bob = User.objects.create_user(username='bob', password='pass')
+        self.carol = User.objects.create_user(username='carol', password='pass')
+        self.team = Group.objects.create(name='Team', owner=self.alice)
+        self.club = Group.objects.create(name='Club', owner=self.bob)
+        for user, group in ((self.alice, self.team), (self.bob, self.team), (self.bob, self.club),
+                            (self.carol, self.club)):
+            GroupMembership.objects.create(user=user, group=group)
+
+    def event(self, start, end, day=DAY, **owner):
+        event_type = 'group' if 'group' in owner else 'solo'
+        return UserEvent.objects.create(type=event_type, description='x', date=day, start_time=start,
+                                        end_time=end, **owner)
+
+    def assert_consistent(self):
+        incremental = stored()
+        busymap.rebuild(User.objects.values_list('id', flat=True))
+        self.assertEqual(incremental, stored())
+
+    def test_events_mark_their_owners(self):
+        self.event(time(9, 0), time(10, 0), user=self.bob)
+        self.event(time(9, 30), time(10, 15), group=self.club)
+        club_event = busymap.mask(time(9, 30), time(10, 15))
+        self.assertEqual(stored(), {
+            (self.bob.id, DAY): busymap.mask(time(9, 0), time(10, 0)) | club_event,
+            (self.carol.id, DAY): club_event,
+        })
+        self.assertEqual(busymap.busy_users([self.alice.id, self.bob.id, self.carol.id], DAY,
+                                            time(9, 0), time(9, 15)), {self.bob.id})
+
+    def test_moves_deletes_and_membership_changes(self):
+        solo = self.event(time(9, 0), time(10, 0), user=self.bob)
+        team_event = self.event(time(13, 0), time(14, 0), group=self.team)
+        self.event(time(22, 0), time(0, 0), group=self.club)
+
+        solo.start_time, solo.date = time(11, 0), date(2025, 6, 3)
+        solo.save()
+        team_event.type, team_event.group, team_event.user = 'solo', None, self.alice
+        team_event.save()
+        self.assert_consistent()
+
+        GroupMembership.objects.create(user=self.alice, group=self.club)
+        GroupMembership.objects.get(user=self.bob, group=self.club).delete()
+        self.assert_consistent()
+
+        solo.delete()
+        team_event.delete()
+        UserEvent.objects.filter(group=self.club).delete()
+        self.assertFalse(UserBusyDay.objects.exists())
+
+    def test_bulk_paths_and_cascades(self):
+        client = APIClient()
+        client.force_authenticate(self.bob)
+        response = client.post('/api/submit-events/', {
+            'description': 'Workshop', 'type': 'group', 'group_id': self.club.id,
+            'slots': [{'date': '2025-06-02', 'hour_start': '08:00', 'hour_end': '09:00'},
+                      {'date': '2025-06-03', 'hour_start': '08:00', 'hour_end': '09:00'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.event(time(9, 0), time(10, 0), group=self.team)
+        self.event(time(11, 0), time(12, 0), user=self.bob)
+        self.assert_consistent()
+
+        Group.objects.filter(id__in=[self.club.id]).delete()
+        self.assert_consistent()
+
+        self.alice.delete()
+        self.assert_consistent()
+        self.assertEqual(set(stored()), {(self.bob.id, DAY)})
+
+    def test_migration_fills_the_table_from_existing_events(self):
+        self.event(time(9, 0), time(10, 0), user=self.bob)
+        self.event(time(22, 0), time(0, 0), group=self.club)
+        expected = stored()
+        UserBusyDay.objects.all().delete()
+        import_module('myapp.migrations.0016_user_busy_day').populate_busy_days(apps, None)
+        self.assertEqual(stored(), expected)
+
+    def test_rebuild_command(self):
+        self.event(time(9, 0), time(10, 0), group=self.club)
+        expected = stored()
+        UserBusyDay.objects.all().delete()
+        call_command('rebuild_busymap', stdout=open('/dev/null', 'w'))
+        self.assertEqual(stored(), expected)
+
+
+class FreeBusyFromBitmapsTests(TestCase):
+    def test_bitmaps_and_event_scan_agree(self):
+        alice = User.objects.create_user(username='alice', password='pass')
+        bob = User.objects.create_user(username='bob', password='pass')
+        team = Group.objects.create(name='Team', owner=alice)
+        GroupMembership.objects.create(user=alice, group=team)
+        GroupMembership.objects.create(user=bob, group=team)
+        for start, end, owner in ((time(9, 0), time(10, 30), {'user': alice}),
+                                  (time(10, 0), time(11, 0), {'group': team}),
+                                  (time(23, 0), time(0, 0), {'user': bob})):
+            UserEvent.objects.create(type='group' if 'group' in owner else 'solo', description='x', date=DAY,
+                                     start_time=start, end_time=end, **owner)
+        client = APIClient()
+        client.force_authenticate(alice)
+        window = {'start_date': '2025-06-01', 'end_date': '2025-06-03'}
+
+        from_bitmaps = client.get(f'/api/groups/{team.id}/freebusy/', {**window, 'granularity': 15}).json()
+        from_events = client.get(f'/api/groups/{team.id}/freebusy/', {**window, 'granularity': 5}).json()
+        self.assertEqual(from_bitmaps['busy'], from_events['busy'])
+        self.assertEqual(from_bitmaps['members'], from_events['members'])
+        self.assertEqual(from_bitmaps['busy'], [
+            {'date': '2025-06-02', 'start_time': '09:00', 'end_time': '11:00'},
+            {'date': '2025-06-02', 'start_time': '23:00', 'end_time': '00:00'},
+        ])
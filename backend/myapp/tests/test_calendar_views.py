@@ -0,0 +1,120 @@
+import json
+import threading
+from datetime import date, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from myapp.google_calendar import build_event_data
+from myapp.models import Group, GroupMembership, UserEvent
+
+
+class FakeCalendarHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def _reply(self, status, payload=None):
+        body = json.dumps(payload or {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append(("POST", self.path, data))
+        if data['summary'] == 'not-json':
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+            return
+        self._reply(200, {"id": f"g-{data['summary']}"})
+
+    def do_PATCH(self):
+        data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests_seen.append(("PATCH", self.path, data))
+        self._reply(200, {"id": self.path.rsplit("/", 1)[-1]})
+
+    def log_message(self, *args):
+        pass
+
+
+class GoogleCalendarSyncTests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCalendarHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings_override = override_settings(
+            GOOGLE_CALENDAR_API_BASE=f"http://127.0.0.1:{cls.server.server_port}"
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        FakeCalendarHandler.requests_seen = []
+        self.user = User.objects.create_user(username='bob', password='pass', email='bob@example.com')
+        self.group = Group.objects.create(name='Team', owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=self.group, role='owner')
+        self.client.force_authenticate(user=self.user)
+
+    def _event(self, description, **kwargs):
+        return UserEvent.objects.create(description=description, date=date(2025, 6, 2),
+                                        start_time=time(9, 0), end_time=time(10, 0), **kwargs)
+
+    def test_bulk_push_inserts_and_patches(self):
+        solo = self._event('solo', type='solo', user=self.user)
+        group_event = self._event('team', type='group', group=self.group)
+        synced = self._event('synced', type='group', group=self.group, google_event_id='existing')
+        stranger = self._event('hidden', type='solo', user=User.objects.create_user(username='eve'))
+
+        response = self.client.post('/api/add-to-google-calendar/bulk/', {
+            "token": "t", "event_ids": [solo.id, group_event.id, synced.id, stranger.id],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['not_found'], [stranger.id])
+        self.assertEqual(sorted(method for method, _, _ in FakeCalendarHandler.requests_seen),
+                         ['PATCH', 'POST', 'POST'])
+        group_body = next(data for _, _, data in FakeCalendarHandler.requests_seen if data['summary'] == 'team')
+        self.assertEqual(group_body['attendees'], [{"email": "bob@example.com"}])
+        self.assertEqual(group_body['start']['dateTime'], '2025-06-02T09:00:00')
+
+        solo.refresh_from_db()
+        synced.refresh_from_db()
+        self.assertEqual(solo.google_event_id, 'g-solo')
+        self.assertEqual(synced.google_event_id, 'existing')
+
+    def test_bulk_push_rejects_non_integer_ids(self):
+        for event_ids in (['abc'], [1, None], [True], [{'id': 1}]):
+            response = self.client.post('/api/add-to-google-calendar/bulk/', {
+                "token": "t", "event_ids": event_ids,
+            }, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(FakeCalendarHandler.requests_seen, [])
+
+    def test_bulk_push_survives_a_non_json_reply(self):
+        odd = self._event('not-json', type='solo', user=self.user)
+        solo = self._event('solo', type='solo', user=self.user)
+        response = self.client.post('/api/add-to-google-calendar/bulk/', {
+            "token": "t", "event_ids": [odd.id, solo.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['id']: (row['status'], row['google_event_id']) for row in response.data['results']},
+                         {odd.id: (200, None), solo.id: (200, 'g-solo')})
+
+    def test_midnight_end_is_sent_as_the_next_day(self):
+        late = UserEvent(type='solo', user=self.user, description='Late', date=date(2025, 6, 2),
+                         start_time=time(22, 0), end_time=time(0, 0))
+        data = build_event_data(late)
+        self.assertEqual((data['start']['dateTime'], data['end']['dateTime']),
+                         ('2025-06-02T22:00:00', '2025-06-03T00:00:00'))
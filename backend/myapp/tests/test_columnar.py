@@ -0,0 +1,104 @@
+import gzip
+import json
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from myapp import columnar
+from myapp.models import Group, GroupMembership, RecurringEvent, UserEvent
+from myapp.renderers import ColumnarEventRenderer
+
+WINDOW = {'start_date': '2025-06-01', 'end_date': '2025-06-30'}
+
+
+class ColumnarEventListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='alice', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=self.group, role='owner')
+        for day in range(1, 29):
+            UserEvent.objects.create(type='solo', user=self.user, description=f'Focus {day % 3}',
+                                     date=date(2025, 6, day), start_time=time(9, 30), end_time=time(11, 0))
+            UserEvent.objects.create(type='group', group=self.group, description='Standup', location='Room 1',
+                                     date=date(2025, 6, day), start_time=time(10, 0, 0, 250000),
+                                     end_time=time(10, 15))
+        RecurringEvent.objects.create(type='solo', user=self.user, description='Gym', start_date=date(2025, 6, 2),
+                                      start_time=time(7, 0), end_time=time(8, 0), frequency='weekly')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def both(self, url, params):
+        plain = self.client.get(url, params)
+        cache.clear()
+        packed = self.client.get(url, dict(params, format='columnar'))
+        self.assertEqual(packed.status_code, 200)
+        self.assertEqual(packed['Content-Type'], ColumnarEventRenderer.media_type)
+        return plain.json(), json.loads(packed.content)
+
+    def test_round_trips_to_the_json_rows(self):
+        plain, packed = self.both('/api/events/', WINDOW)
+        self.assertEqual(packed['count'], 56)
+        self.assertEqual(packed['results']['encoding']['date'], 'delta_days')
+        self.assertEqual(packed['results']['columns']['description']['values'],
+                         ['Focus 1', 'Standup', 'Focus 2', 'Focus 0'])
+        self.assertEqual(columnar.decode(packed), {'results': plain['results'], 'occurrences': plain['occurrences']})
+        self.assertLess(len(json.dumps(packed)), len(json.dumps(plain)) / 2)
+
+        plain, packed = self.both('/api/availability/filter/', dict(WINDOW, id=self.user.id, page_size=5))
+        # The next link keeps asking for the columnar form.
+        self.assertEqual(packed['next'].replace('format=columnar&', ''), plain['next'])
+        self.assertEqual(columnar.decode(packed)['results'], plain['results'])
+
+    def test_cached_pages_link_in_the_requested_format(self):
+        params = dict(WINDOW, page_size=5)
+        packed = json.loads(self.client.get('/api/events/', dict(params, format='columnar')).content)
+        self.assertIn('format=columnar', packed['next'])
+        # The same page, now from the cache.
+        plain = self.client.get('/api/events/', params).json()
+        self.assertNotIn('format=columnar', plain['next'])
+        self.assertEqual(packed['next'].replace('format=columnar&', ''), plain['next'])
+
+    def test_accept_header_selects_columnar(self):
+        response = self.client.get('/api/events/', WINDOW, HTTP_ACCEPT=ColumnarEventRenderer.media_type)
+        self.assertEqual(json.loads(response.content)['format'], columnar.FORMAT)
+
+    def test_errors_stay_plain(self):
+        response = self.client.get('/api/availability/filter/', {'format': 'columnar'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content), {"error": "Missing required parameters"})
+
+    def test_empty_window(self):
+        packed = json.loads(self.client.get('/api/events/', {'start_date': '2024-01-01', 'end_date': '2024-01-02',
+                                                             'format': 'columnar'}).content)
+        self.assertEqual(packed['results'], {'count': 0, 'encoding': {}, 'columns': {}})
+        self.assertEqual(columnar.decode(packed), {'results': [], 'occurrences': []})
+
+    def test_large_responses_are_gzipped(self):
+        with override_settings(GZIP_MIN_BYTES=1024):
+            response = self.client.get('/api/events/', WINDOW, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(json.loads(gzip.decompress(response.content))['results'][0]['description'], 'Focus 1')
+        with override_settings(GZIP_MIN_BYTES=10 ** 6):
+            response = self.client.get('/api/events/', WINDOW, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+
+class ColumnarEncodingTests(TestCase):
+    def test_dates_and_times(self):
+        rows = [
+            {'id': 1, 'date': '2025-06-30', 'start_time': '23:00:00', 'end_time': '23:59:00',
+             'updated_at': '2025-06-01T10:00:00.123456Z'},
+            {'id': 2, 'date': '2025-07-02', 'start_time': '08:00:00.500000', 'end_time': '07:00:00',
+             'updated_at': None},
+        ]
+        columns, _ = columnar.encode_rows(rows)
+        self.assertEqual(columns['date'], {'start': '2025-06-30', 'delta': [0, 2]})
+        self.assertEqual(columns['start_time'], [82800, 28800.5])
+        self.assertEqual(columns['end_time'], [3540, -3600.5])
+        decoded = columnar.decode(columnar.encode({'next': None, 'results': rows}))
+        self.assertEqual(decoded['results'], rows)
+        self.assertEqual(timedelta(microseconds=columns['updated_at'][0]).days, 20240)
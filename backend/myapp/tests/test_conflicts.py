@@ -0,0 +1,116 @@
+import random
+from datetime import date, time
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from myapp.conflicts import IntervalTree
+from myapp.models import Group, GroupMembership, UserEvent
+
+DAY = date(2025, 6, 2)
+
+
+class IntervalTreeTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        intervals = []
+        for index in range(300):
+            start = rng.randrange(0, 1000)
+            intervals.append((start, start + rng.randrange(1, 60), index))
+        tree = IntervalTree(intervals)
+        for _ in range(200):
+            start = rng.randrange(0, 1000)
+            end = start + rng.randrange(1, 60)
+            expected = sorted(item for lo, hi, item in intervals if lo < end and hi > start)
+            self.assertEqual(sorted(tree.overlapping(start, end)), expected)
+
+    def test_touching_intervals_do_not_overlap(self):
+        tree = IntervalTree([(0, 10, 'a'), (10, 20, 'b')])
+        self.assertEqual(tree.overlapping(10, 20), ['b'])
+        self.assertEqual(IntervalTree([]).overlapping(0, 10), [])
+
+
+class SlotSubmissionConflictTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='kim', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.existing = UserEvent.objects.create(type='solo', user=self.user, description='Busy', date=DAY,
+                                                 start_time=time(9, 0), end_time=time(10, 0))
+
+    def submit(self, slots, mode=None):
+        url = reverse('submit-events') + (f'?conflicts={mode}' if mode else '')
+        payload = {'description': 'Free', 'type': 'solo',
+                   'slots': [{'date': '2025-06-02', 'hour_start': start, 'hour_end': end} for start, end in slots]}
+        return self.client.post(url, payload, format='json')
+
+    def test_allow_keeps_creating_overlaps(self):
+        response = self.submit([('09:30', '10:30'), ('09:30', '10:30')])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(UserEvent.objects.count(), 3)
+
+    def test_reject_reports_every_conflict_and_creates_nothing(self):
+        slots = [('08:00', '09:00'), ('09:45', '10:15'), ('10:00', '11:00'), ('08:00', '09:00')]
+        with self.assertNumQueries(4):  # savepoint, owner's events on the batch dates, rollback, release
+            response = self.submit(slots, 'reject')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['conflicts'], [
+            {'slot': 1, 'event': self.existing.id},
+            {'slot': 2, 'other_slot': 1},
+            {'slot': 3, 'other_slot': 0},
+        ])
+        self.assertEqual(UserEvent.objects.count(), 1)
+
+    def test_skip_creates_the_slots_that_fit(self):
+        response = self.submit([('09:45', '10:15'), ('10:00', '11:00'), ('10:30', '11:30'), ('23:00', '00:00')],
+                               'skip')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['skipped'], [{'slot': 0, 'event': self.existing.id},
+                                                    {'slot': 2, 'other_slot': 1}])
+        self.assertEqual(
+            sorted(UserEvent.objects.exclude(id=self.existing.id).values_list('start_time', flat=True)),
+            [time(10, 0), time(23, 0)],
+        )
+
+    def test_other_owners_do_not_conflict(self):
+        other = User.objects.create_user(username='lee', password='pass')
+        UserEvent.objects.create(type='solo', user=other, description='x', date=DAY,
+                                 start_time=time(11, 0), end_time=time(12, 0))
+        self.assertEqual(self.submit([('11:00', '12:00')], 'reject').status_code, status.HTTP_201_CREATED)
+
+    def test_unknown_mode(self):
+        self.assertEqual(self.submit([('11:00', '12:00')], 'maybe').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EventSubmissionConflictTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='max', password='pass')
+        self.group = Group.objects.create(name='Crew', owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.late = UserEvent.objects.create(type='group', group=self.group, description='Late shift', date=DAY,
+                                             start_time=time(22, 0), end_time=time(0, 0))
+
+    def post(self, start, end, mode='reject'):
+        payload = {'type': 'group', 'group': self.group.id, 'date': '2025-06-02', 'start_time': start,
+                   'end_time': end, 'description': 'New'}
+        return self.client.post(reverse('submit-event') + f'?conflicts={mode}', payload, format='json')
+
+    def test_overlap_with_an_event_running_until_midnight(self):
+        response = self.post('23:00', '23:30')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual([conflict['event'] for conflict in response.data['conflicts']], [self.late.id])
+        self.assertEqual(self.post('23:30', '00:00').status_code, status.HTTP_409_CONFLICT)
+
+    def test_adjacent_and_solo_events_are_free(self):
+        UserEvent.objects.create(type='solo', user=self.owner, description='Gym', date=DAY,
+                                 start_time=time(21, 0), end_time=time(22, 0))
+        self.assertEqual(self.post('21:00', '22:00').status_code, status.HTTP_201_CREATED)
+
+    def test_allow_and_unknown_modes(self):
+        self.assertEqual(self.post('22:00', '23:00', 'allow').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.post('22:00', '23:00', 'skip').status_code, status.HTTP_400_BAD_REQUEST)
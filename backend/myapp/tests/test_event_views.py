@@ -1,11 +1,18 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from unittest.mock import patch
-from datetime import date, time
-from myapp.models import UserEvent, Group, GroupMembership
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from datetime import date, time, timedelta
+from rest_framework.renderers import JSONRenderer
+from myapp import calendar_cache
+from myapp.renderers import FastJSONRenderer
+from myapp.serializers import UserEventSerializer
+from myapp.models import UserEvent, Group, GroupMembership, EventParticipation, EmailOutbox
+from myapp.recurrence import MAX_COUNT, MAX_INTERVAL
 
 User = get_user_model()
 
@@ -40,7 +47,7 @@ class FilteredUserEventTests(TestCase):
         })
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
 
 class GroupEventSubmissionTests(TestCase):
@@ -52,8 +59,7 @@ class GroupEventSubmissionTests(TestCase):
         )
         self.client = authenticated_client(self.user)
 
-    @patch('myapp.views.event_views.send_mass_mail')
-    def test_create_group_event_success(self, mock_send):
+    def test_create_group_event_success(self):
         additional_user = create_user("alice", email="alice@example.com")
         GroupMembership.objects.create(user=additional_user, group=self.group, role='member')
 
@@ -69,7 +75,10 @@ class GroupEventSubmissionTests(TestCase):
         response = self.client.post(url, data=payload, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(UserEvent.objects.filter(group=self.group).exists())
-        mock_send.assert_called()
+        self.assertEqual(
+            list(EmailOutbox.objects.filter(status='pending').values_list('recipient', flat=True)),
+            ["alice@example.com"],
+        )
 
     def test_create_group_event_no_permission(self):
         other_user = create_user("hacker")
@@ -124,3 +133,267 @@ class GroupEventSubmissionTests(TestCase):
         response = client.delete(url, {"id": event.id}, format='json')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
+
+
+class UserEventPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("carol")
+        self.client = authenticated_client(self.user)
+        for day, hour in [(3, 9), (1, 9), (1, 9), (2, 14), (1, 8)]:
+            UserEvent.objects.create(
+                user=self.user, type='solo', description="Slot",
+                date=date(2025, 6, day), start_time=time(hour, 0), end_time=time(hour + 1, 0),
+            )
+
+    def test_cursor_walks_all_events_in_stable_order(self):
+        params = {'start_date': '2025-06-01', 'end_date': '2025-06-30', 'page_size': 2}
+        seen = []
+        response = self.client.get('/api/events/', params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend((event['date'], event['start_time'], event['id']) for event in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/events/', {
+            'start_date': '2025-06-01', 'end_date': '2025-06-30', 'cursor': 'garbage',
+        })
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class EventSlotSubmissionTests(TestCase):
+    def setUp(self):
+        self.user = create_user("dave")
+        self.client = authenticated_client(self.user)
+
+    def test_bulk_submission_returns_created_ids(self):
+        payload = {
+            "description": "Available",
+            "type": "solo",
+            "slots": [
+                {"date": "2025-06-02", "hour_start": f"{hour:02d}:00", "hour_end": f"{hour:02d}:15"}
+                for hour in range(8, 18)
+            ],
+        }
+        with self.assertNumQueries(8):  # savepoint, INSERT, 4 busy bitmap queries, heatmap group lookup, release
+            response = self.client.post(reverse('submit-events'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['ids']), 10)
+        self.assertEqual(
+            set(UserEvent.objects.filter(user=self.user).values_list('id', flat=True)),
+            set(response.data['ids']),
+        )
+
+    def test_invalid_slot_reports_field_errors(self):
+        payload = {
+            "description": "Available",
+            "type": "solo",
+            "slots": [
+                {"date": "2025-06-02", "hour_start": "08:00", "hour_end": "08:15"},
+                {"date": "not-a-date", "hour_start": "09:00", "hour_end": "09:15"},
+            ],
+        }
+        response = self.client.post(reverse('submit-events'), payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('date', response.data['slots'][1])
+        self.assertFalse(UserEvent.objects.exists())
+
+
+class ParticipationRecordTests(TestCase):
+    def setUp(self):
+        self.owner = create_user("erin", email="erin@example.com")
+        self.group = Group.objects.create(name="Big Group", owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        for i in range(20):
+            GroupMembership.objects.create(user=create_user(f"member{i}", email=f"m{i}@example.com"), group=self.group)
+        self.client = authenticated_client(self.owner)
+
+    def test_group_event_creates_records_for_all_other_members(self):
+        payload = {
+            "type": "group", "group": self.group.id, "date": str(date.today()),
+            "start_time": "10:00:00", "end_time": "11:00:00", "description": "All hands",
+        }
+        response = self.client.post(reverse('submit-event'), data=payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        participations = EventParticipation.objects.filter(event_id=response.data['id'])
+        self.assertEqual(participations.count(), 20)
+        self.assertFalse(participations.filter(user=self.owner).exists())
+
+    def test_new_member_gets_records_for_upcoming_events_only(self):
+        upcoming = UserEvent.objects.create(type='group', group=self.group, description="Next week",
+                                            date=date.today() + timedelta(days=7),
+                                            start_time=time(10, 0), end_time=time(11, 0))
+        UserEvent.objects.create(type='group', group=self.group, description="Last week",
+                                 date=date.today() - timedelta(days=7),
+                                 start_time=time(10, 0), end_time=time(11, 0))
+        newcomer = create_user("frank", email="frank@example.com")
+        authenticated_client(newcomer).post(f'/api/groups/{self.group.id}/join/')
+        self.assertEqual(
+            list(EventParticipation.objects.filter(user=newcomer).values_list('event_id', flat=True)),
+            [upcoming.id],
+        )
+
+
+class UserEventCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("gina")
+        self.owner = create_user("hank", email="hank@example.com")
+        self.group = Group.objects.create(name="Cached", owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.user, group=self.group)
+        self.client = authenticated_client(self.user)
+        self.params = {'start_date': '2025-06-01', 'end_date': '2025-06-07'}
+
+    def _get(self):
+        return self.client.get('/api/events/', self.params)
+
+    def test_second_load_is_served_from_cache(self):
+        self._get()
+        with self.assertNumQueries(0):
+            response = self._get()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(calendar_cache.stats()['hits'], 1)
+
+    def test_group_event_write_invalidates_member_calendars(self):
+        self.assertEqual(self._get().data['results'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            UserEvent.objects.create(type='group', group=self.group, description="Planning",
+                                     date=date(2025, 6, 3), start_time=time(9, 0), end_time=time(10, 0))
+        self.assertEqual(len(self._get().data['results']), 1)
+
+    def test_leaving_group_invalidates_calendar(self):
+        UserEvent.objects.create(type='group', group=self.group, description="Planning",
+                                 date=date(2025, 6, 3), start_time=time(9, 0), end_time=time(10, 0))
+        self.assertEqual(len(self._get().data['results']), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/groups/{self.group.id}/leave/')
+        self.assertEqual(self._get().data['results'], [])
+
+    def test_slot_submission_invalidates_calendar(self):
+        self._get()
+        payload = {"description": "Free", "type": "solo",
+                   "slots": [{"date": "2025-06-02", "hour_start": "08:00", "hour_end": "08:15"}]}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('submit-events'), payload, format='json')
+        self.assertEqual(len(self._get().data['results']), 1)
+
+
+class RoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = create_user("ivan", email="ivan@example.com")
+        self.member = create_user("jane", email="jane@example.com")
+        self.group = Group.objects.create(name="Roles", owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.member, group=self.group, role='member')
+        self.event = UserEvent.objects.create(type='group', group=self.group, description="Review",
+                                              date=date(2025, 6, 2), start_time=time(9, 0), end_time=time(10, 0))
+
+    def test_cached_roles_skip_membership_queries(self):
+        client = authenticated_client(self.member)
+        url = reverse('respond-to-event', args=[self.event.id])
+        client.post(url, {"response": "yes"}, format='json')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url, {"response": "no"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in queries.captured_queries if 'myapp_groupmembership' in q['sql']])
+
+    def test_role_change_is_visible_to_next_permission_check(self):
+        client = authenticated_client(self.member)
+        payload = {"id": self.event.id, "type": "group", "group": self.group.id, "date": "2025-06-02",
+                   "start_time": "09:00:00", "end_time": "10:00:00", "description": "Renamed"}
+        self.assertEqual(client.put(reverse('submit-event'), payload, format='json').status_code,
+                         status.HTTP_403_FORBIDDEN)
+
+        authenticated_client(self.owner).put(
+            f'/api/groups/{self.group.id}/members/{self.member.id}/role', {'role': 'admin'}, format='json'
+        )
+        self.assertEqual(client.put(reverse('submit-event'), payload, format='json').status_code,
+                         status.HTTP_200_OK)
+
+
+class RecurringEventViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = create_user("kate", email="kate@example.com")
+        self.member = create_user("liam", email="liam@example.com")
+        self.group = Group.objects.create(name="Weekly", owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.member, group=self.group)
+        self.payload = {"type": "group", "group": self.group.id, "description": "Sync",
+                        "start_date": "2025-06-03", "start_time": "09:00", "end_time": "10:00",
+                        "frequency": "weekly", "byweekday": "1"}
+
+    def test_members_cannot_create_group_series(self):
+        response = authenticated_client(self.member).post('/api/recurring-events/', self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_count_and_interval_are_bounded(self):
+        client = authenticated_client(self.owner)
+        for field, value in (('count', MAX_COUNT + 1), ('interval', MAX_INTERVAL + 1), ('interval', 0)):
+            response = client.post('/api/recurring-events/', dict(self.payload, **{field: value}), format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(field, response.data)
+        response = client.post('/api/recurring-events/', dict(self.payload, count=MAX_COUNT, interval=MAX_INTERVAL),
+                               format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_series_is_expanded_in_event_list(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = authenticated_client(self.owner).post('/api/recurring-events/', self.payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(UserEvent.objects.exists())
+
+        response = authenticated_client(self.member).get('/api/events/', {
+            'start_date': '2025-06-01', 'end_date': '2025-06-30',
+        })
+        self.assertEqual([occurrence['date'] for occurrence in response.data['occurrences']],
+                         ['2025-06-03', '2025-06-10', '2025-06-17', '2025-06-24'])
+
+
+class FastEventSerializationTests(TestCase):
+    """The event list read paths must render exactly what UserEventSerializer did."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(username="alice")
+        self.group = Group.objects.create(name="Team", owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=self.group, role='owner')
+        descriptions = ['Plain', 'Ünnepi "ebéd" \\ \n\t\x01   😀', '']
+        for day in range(1, 4):
+            UserEvent.objects.create(user=self.user, type='solo', description=descriptions[day - 1],
+                                     date=date(2025, 6, day), start_time=time(9, 0, 0, 1500), end_time=time(10, 0),
+                                     location='Budapest', ical_uid=f'uid-{day}')
+            UserEvent.objects.create(group=self.group, type='group', description='Sync', date=date(2025, 6, day),
+                                     start_time=time(11, 0), end_time=time(12, 0), google_event_id='g1')
+        self.client = authenticated_client(self.user)
+
+    def assert_same_as_model_serializer(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        ids = [row['id'] for row in response.json()['results']]
+        events = sorted(UserEvent.objects.filter(id__in=ids), key=lambda event: ids.index(event.id))
+        expected = dict(response.data, results=UserEventSerializer(events, many=True).data)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+        return response
+
+    @override_settings(TIME_ZONE='Europe/Budapest')
+    def test_event_lists_match_model_serializer(self):
+        window = {'start_date': '2025-06-01', 'end_date': '2025-06-30'}
+        response = self.assert_same_as_model_serializer('/api/events/', dict(window, page_size=4))
+        self.assertEqual(len(response.json()['results']), 4)
+        cursor = response.json()['next'].split('cursor=')[1].split('&')[0]
+        self.assert_same_as_model_serializer('/api/events/', dict(window, cursor=cursor))
+        self.assert_same_as_model_serializer('/api/availability/filter/', dict(window, id=self.user.id))
+        self.assert_same_as_model_serializer('/api/availability/', {})
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {'text': 'Ünnepi "ebéd" \\ \n\t\x01\x1f\x7f    😀', 'items': [1, None, True, 2 ** 40],
+                'nested': {'empty': [], 'float': 0.1}}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
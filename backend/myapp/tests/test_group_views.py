@@ -1,4 +1,7 @@
+from io import StringIO
+
 from django.contrib.auth.models import User
+from django.core.management import call_command
 from rest_framework.test import APITestCase
 from myapp.models import Group, GroupMembership
 
@@ -75,3 +78,94 @@ class GroupViewTests(APITestCase):
         url = f'/api/groups/{self.group.id}/delete/'
         response = self.client.delete(url)
         self.assertEqual(response.status_code, 403)
+
+
+class GroupMemberCountTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.other_user = User.objects.create_user(username='alice', password='pass')
+        self.client.force_authenticate(user=self.user)
+
+    def test_member_count_follows_membership_changes(self):
+        response = self.client.post('/api/groups/', {'name': 'Team'})
+        self.assertEqual(response.data['member_count'], 1)
+        group = Group.objects.get(id=response.data['id'])
+        self.assertEqual(group.member_count, 1)
+
+        self.client.force_authenticate(user=self.other_user)
+        self.client.post(f'/api/groups/{group.id}/join/')
+        group.refresh_from_db()
+        self.assertEqual(group.member_count, 2)
+
+        self.client.post(f'/api/groups/{group.id}/leave/')
+        group.refresh_from_db()
+        self.assertEqual(group.member_count, 1)
+
+    def test_membership_cannot_move_to_another_group(self):
+        team = Group.objects.create(name='Team', owner=self.other_user)
+        club = Group.objects.create(name='Club', owner=self.other_user)
+        membership = GroupMembership.objects.create(user=self.user, group=team)
+        url = f'/api/group-memberships/{membership.id}/'
+
+        response = self.client.patch(url, {'group': club.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('group', response.data)
+        response = self.client.put(url, {'user': self.user.id, 'group': team.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Group.objects.order_by('name').values_list('member_count', flat=True)), [0, 1])
+
+    def test_group_listing_is_a_single_query(self):
+        for i in range(5):
+            group = Group.objects.create(name=f'Group {i}', owner=self.other_user)
+            GroupMembership.objects.create(user=self.other_user, group=group, role='owner')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/groups/')
+        self.assertEqual([group['member_count'] for group in response.data], [1] * 5)
+
+    def test_repair_command_fixes_drift(self):
+        group = Group.objects.create(name='Drifted', owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=group, role='owner')
+        Group.objects.filter(id=group.id).update(member_count=7)
+        call_command('repair_member_counts', stdout=StringIO())
+        group.refresh_from_db()
+        self.assertEqual(group.member_count, 1)
+
+
+class GroupSearchTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.owner = User.objects.create_user(username='alice', password='pass')
+        self.client.force_authenticate(user=self.user)
+        for name, members in (('Chess Club', 3), ('Chess', 1), ('Speed Chess', 2), ('Kitchess', 9), ('Hiking', 4)):
+            Group.objects.create(name=name, owner=self.owner, member_count=members)
+
+    def names(self, **params):
+        response = self.client.get('/api/groups/', params)
+        self.assertEqual(response.status_code, 200)
+        return [group['name'] for group in response.data]
+
+    def test_ranked_matches(self):
+        self.assertEqual(self.names(search='chess'), ['Chess', 'Chess Club', 'Speed Chess', 'Kitchess'])
+        self.assertEqual(self.names(search='ch'), ['Chess Club', 'Chess', 'Speed Chess', 'Kitchess'])
+
+    def test_prefix_mode_and_limit(self):
+        self.assertEqual(self.names(search='che', mode='prefix'), ['Chess Club', 'Chess', 'Speed Chess'])
+        self.assertEqual(self.names(search='chess', limit=2), ['Chess', 'Chess Club'])
+
+    def test_groups_of_the_user_are_excluded(self):
+        group = Group.objects.get(name='Chess')
+        GroupMembership.objects.create(user=self.user, group=group)
+        self.assertNotIn('Chess', self.names(search='chess'))
+        self.assertNotIn('Chess', self.names())
+
+    def test_index_follows_renames_and_deletes(self):
+        Group.objects.filter(name='Hiking').update(name='Chessboxing')
+        Group.objects.get(name='Kitchess').delete()
+        self.assertEqual(self.names(search='chess', mode='prefix'), ['Chess', 'Chessboxing', 'Chess Club',
+                                                                      'Speed Chess'])
+        self.assertEqual(self.names(search='hiking'), [])
+
+    def test_invalid_parameters(self):
+        for params in ({'mode': 'fuzzy'}, {'limit': 0}, {'limit': 'ten'}, {'limit': 101}):
+            response = self.client.get('/api/groups/', {'search': 'chess', **params})
+            self.assertEqual(response.status_code, 400)
@@ -0,0 +1,162 @@
+from datetime import date, time
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from myapp import heatmap
+from myapp.models import Group, GroupHeatmapBucket, GroupMembership, RecurringEvent, UserEvent
+
+DAY = date(2025, 6, 2)
+
+
+def stored():
+    return {(row.group_id, row.date, row.bucket): row.busy
+            for row in GroupHeatmapBucket.objects.exclude(busy=0)}
+
+
+class HeatmapMaintenanceTests(TestCase):
+    """Every change must leave the table equal to a rebuild from scratch."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass')
+        self.bob = User.objects.create_user(username='bob', password='pass')
+        self.carol = User.objects.create_user(username='carol', password='pass')
+        self.team = Group.objects.create(name='Team', owner=self.alice)
+        self.club = Group.objects.create(name='Club', owner=self.bob)
+        for user, group in ((self.alice, self.team), (self.bob, self.team), (self.bob, self.club),
+                            (self.carol, self.club)):
+            GroupMembership.objects.create(user=user, group=group)
+
+    def event(self, start, end, **owner):
+        event_type = 'group' if 'group' in owner else 'solo'
+        return UserEvent.objects.create(type=event_type, description='x', date=DAY, start_time=start,
+                                        end_time=end, **owner)
+
+    def assert_consistent(self):
+        incremental = stored()
+        heatmap.rebuild(list(Group.objects.values_list('id', flat=True)))
+        self.assertEqual(incremental, stored())
+
+    def test_events_count_for_every_group_of_their_members(self):
+        self.event(time(9, 0), time(10, 0), user=self.bob)
+        self.event(time(9, 30), time(10, 15), group=self.club)
+        self.assertEqual(stored(), {
+            (self.team.id, DAY, 18): 1, (self.team.id, DAY, 19): 1, (self.team.id, DAY, 20): 1,
+            (self.club.id, DAY, 18): 1, (self.club.id, DAY, 19): 2, (self.club.id, DAY, 20): 2,
+        })
+        self.assert_consistent()
+
+    def test_a_member_counts_once_per_bucket(self):
+        # Adjacent 15-minute slots as the grid submits them, plus an overlapping event.
+        first = self.event(time(9, 0), time(9, 15), user=self.alice)
+        self.event(time(9, 15), time(9, 30), user=self.alice)
+        self.event(time(9, 0), time(9, 30), group=self.team)
+        self.assertEqual(stored(), {(self.team.id, DAY, 18): 2, (self.club.id, DAY, 18): 1})
+        first.delete()
+        self.assertEqual(stored(), {(self.team.id, DAY, 18): 2, (self.club.id, DAY, 18): 1})
+        self.assert_consistent()
+
+    def test_moves_deletes_and_membership_changes(self):
+        solo = self.event(time(9, 0), time(10, 0), user=self.bob)
+        team_event = self.event(time(13, 0), time(14, 0), group=self.team)
+        self.event(time(22, 0), time(0, 0), group=self.club)
+
+        solo.start_time, solo.end_time, solo.date = time(11, 0), time(11, 30), date(2025, 6, 3)
+        solo.save()
+        team_event.type, team_event.group, team_event.user = 'solo', None, self.alice
+        team_event.save()
+        self.assert_consistent()
+
+        GroupMembership.objects.create(user=self.carol, group=self.team)
+        GroupMembership.objects.create(user=self.alice, group=self.club)
+        self.assert_consistent()
+
+        GroupMembership.objects.get(user=self.bob, group=self.team).delete()
+        solo.delete()
+        self.assert_consistent()
+
+    def test_bulk_paths_and_cascades(self):
+        client = APIClient()
+        client.force_authenticate(self.bob)
+        response = client.post('/api/submit-events/', {
+            'description': 'Workshop', 'type': 'group', 'group_id': self.club.id,
+            'slots': [{'date': '2025-06-02', 'hour_start': '08:00', 'hour_end': '09:00'},
+                      {'date': '2025-06-03', 'hour_start': '08:00', 'hour_end': '09:00'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.event(time(9, 0), time(10, 0), group=self.team)
+        self.assert_consistent()
+
+        self.club.delete()
+        self.assert_consistent()
+        self.assertFalse(GroupHeatmapBucket.objects.filter(group_id=self.club.id).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alice.delete()
+        self.assert_consistent()
+
+    def test_queryset_delete_of_overlapping_groups(self):
+        lab = Group.objects.create(name='Lab', owner=self.carol)
+        GroupMembership.objects.create(user=self.carol, group=lab)
+        for group in (self.team, self.club, lab):
+            self.event(time(9, 0), time(10, 0), group=group)
+        Group.objects.filter(id__in=[self.club.id, lab.id]).delete()
+        self.assert_consistent()
+
+    def test_migration_fills_the_table_from_existing_events(self):
+        self.event(time(9, 0), time(9, 15), user=self.bob)
+        self.event(time(9, 15), time(10, 0), group=self.club)
+        self.event(time(23, 0), time(0, 0), group=self.team)
+        expected = stored()
+        GroupHeatmapBucket.objects.all().delete()
+        import_module('myapp.migrations.0015_group_heatmap_bucket').populate_heatmap(apps, None)
+        self.assertEqual(stored(), expected)
+
+
+class GroupHeatmapViewTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', password='pass')
+        self.bob = User.objects.create_user(username='bob', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.alice)
+        GroupMembership.objects.create(user=self.alice, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.bob, group=self.group)
+        UserEvent.objects.create(type='group', group=self.group, description='Sync', date=DAY,
+                                 start_time=time(9, 0), end_time=time(10, 0))
+        UserEvent.objects.create(type='solo', user=self.bob, description='Dentist', date=DAY,
+                                 start_time=time(9, 30), end_time=time(11, 0))
+        RecurringEvent.objects.create(type='solo', user=self.alice, description='Gym', start_date=DAY,
+                                      start_time=time(7, 0), end_time=time(7, 30), frequency='daily')
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def test_heatmap(self):
+        response = self.client.get(f'/api/groups/{self.group.id}/heatmap/',
+                                   {'start_date': '2025-06-02', 'end_date': '2025-06-03'})
+        self.assertEqual(response.status_code, 200)
+        days = response.data['days']
+        self.assertEqual([day['date'] for day in days], ['2025-06-02', '2025-06-03'])
+        self.assertEqual(len(days[0]['busy']), 48)
+        # Gym 07:00, Sync for both at 09:00, Bob double-booked at 09:30 counted once, Dentist until 11:00.
+        self.assertEqual(days[0]['busy'][14:22], [1, 0, 0, 0, 2, 2, 1, 1])
+        self.assertEqual(sum(days[1]['busy']), 1)
+
+    def test_reads_do_not_touch_events(self):
+        with self.assertNumQueries(6):  # group, roles, buckets, memberships, series, bitmaps under the series
+            self.client.get(f'/api/groups/{self.group.id}/heatmap/',
+                            {'start_date': '2025-06-01', 'end_date': '2025-08-31'})
+
+    def test_validation(self):
+        url = f'/api/groups/{self.group.id}/heatmap/'
+        self.assertEqual(self.client.get(url, {'start_date': '2025-01-01', 'end_date': '2025-12-31'}).status_code, 400)
+        outsider = User.objects.create_user(username='eve', password='pass')
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(url, {'start_date': '2025-06-01', 'end_date': '2025-06-07'}).status_code, 403)
+
+    def test_rebuild_command(self):
+        GroupHeatmapBucket.objects.all().delete()
+        call_command('rebuild_heatmap', stdout=open('/dev/null', 'w'))
+        self.assertEqual(GroupHeatmapBucket.objects.get(group=self.group, date=DAY, bucket=19).busy, 2)
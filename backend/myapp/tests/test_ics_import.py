@@ -0,0 +1,132 @@
+import tempfile
+from datetime import date, time
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from myapp.ics_import import ICSImporter
+from myapp.models import EventParticipation, Group, GroupMembership, UserEvent
+
+
+def calendar(*events):
+    body = "".join(f"BEGIN:VEVENT\r\n{event}END:VEVENT\r\n" for event in events)
+    return f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n{body}END:VCALENDAR\r\n".encode()
+
+
+MEETING = (
+    "UID:meeting-1@example.com\r\n"
+    "DTSTART;TZID=Europe/Budapest:20250602T090000\r\n"
+    "DTEND;TZID=Europe/Budapest:20250602T100000\r\n"
+    "SUMMARY:Kick-off\\, room 2\r\n"
+    "LOCATION:HQ\r\n"
+    "BEGIN:VALARM\r\nTRIGGER:-PT15M\r\nDESCRIPTION:Ignored\r\nEND:VALARM\r\n"
+)
+
+
+class ICSImporterTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+
+    def _run(self, data, **kwargs):
+        return ICSImporter(self.user, **kwargs).run(BytesIO(data))
+
+    def test_maps_vevents_to_solo_events(self):
+        report = self._run(calendar(
+            MEETING,
+            "UID:utc\r\nDTSTART:20250603T070000Z\r\nDURATION:PT1H30M\r\nSUMMARY:Folded s\r\n ummary\r\n",
+            "UID:all-day\r\nDTSTART;VALUE=DATE:20250604\r\nDTEND;VALUE=DATE:20250605\r\nSUMMARY:Offsite\r\n",
+        ))
+        self.assertEqual((report['rows'], report['created'], report['errors']), (3, 3, []))
+        events = {event.ical_uid: event for event in UserEvent.objects.filter(user=self.user, type='solo')}
+        meeting = events['meeting-1@example.com']
+        self.assertEqual((meeting.description, meeting.location), ('Kick-off, room 2', 'HQ'))
+        self.assertEqual((meeting.date, meeting.start_time, meeting.end_time), (date(2025, 6, 2), time(9), time(10)))
+        # 07:00 UTC is 09:00 in Budapest during summer time.
+        self.assertEqual((events['utc'].start_time, events['utc'].end_time), (time(9), time(10, 30)))
+        self.assertEqual(events['utc'].description, 'Folded summary')
+        self.assertEqual((events['all-day'].start_time, events['all-day'].end_time), (time(0), time(0)))
+
+    def test_midnight_end_survives_a_round_trip(self):
+        late = ("UID:late\r\nDTSTART;TZID=Europe/Budapest:20250602T220000\r\n"
+                "DTEND;TZID=Europe/Budapest:20250603T000000\r\n")
+        self._run(calendar(late))
+        self.assertEqual(UserEvent.objects.get(ical_uid='late').end_time, time(0))
+
+        self.client.force_authenticate(user=self.user)
+        feed = b"".join(self.client.get('/api/events/calendar.ics').streaming_content).decode()
+        self.assertIn("DTEND;TZID=Europe/Budapest:20250603T000000", feed)
+
+    def test_duplicates_within_file_and_across_imports_are_skipped(self):
+        self.assertEqual(self._run(calendar(MEETING, MEETING))['duplicates'], 1)
+        report = self._run(calendar(MEETING), batch_size=1)
+        self.assertEqual((report['created'], report['duplicates']), (0, 1))
+        self.assertEqual(UserEvent.objects.count(), 1)
+
+    def test_bad_rows_are_reported_and_others_imported(self):
+        report = self._run(calendar(
+            "UID:broken\r\nDTSTART:not-a-date\r\n",
+            "UID:weekly\r\nDTSTART:20250602T090000\r\nRRULE:FREQ=WEEKLY\r\n",
+            "UID:long\r\nDTSTART:20250602T220000\r\nDTEND:20250603T020000\r\n",
+            MEETING,
+        ), batch_size=1)
+        self.assertEqual(report['created'], 1)
+        self.assertEqual([(error['line'], error['uid']) for error in report['errors']],
+                         [(3, 'broken'), (7, 'weekly'), (12, 'long')])
+
+    def test_reported_errors_are_capped(self):
+        broken = [f"UID:broken-{index}\r\nDTSTART:not-a-date\r\n" for index in range(5)]
+        with patch('myapp.ics_import.MAX_REPORTED_ERRORS', 2):
+            report = self._run(calendar(*broken, MEETING))
+        self.assertEqual([error['uid'] for error in report['errors']], ['broken-0', 'broken-1'])
+        self.assertEqual((report['errors_truncated'], report['created']), (3, 1))
+
+    def test_group_import_creates_participations(self):
+        owner = User.objects.create_user(username='alice', password='pass')
+        group = Group.objects.create(name='Team', owner=owner)
+        GroupMembership.objects.create(user=owner, group=group, role='owner')
+        GroupMembership.objects.create(user=self.user, group=group)
+        ICSImporter(owner, group).run(BytesIO(calendar(MEETING)))
+        event = UserEvent.objects.get(type='group', group=group)
+        self.assertEqual(EventParticipation.objects.filter(event=event).count(), 2)
+
+
+class ImportCalendarViewTests(APITestCase):
+    url = '/api/events/import/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.client.force_authenticate(user=self.user)
+
+    def _upload(self, **data):
+        return self.client.post(self.url, {'file': SimpleUploadedFile('team.ics', calendar(MEETING)), **data},
+                                format='multipart')
+
+    def test_upload_reports_counts(self):
+        response = self._upload()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['error_count']), (1, 0))
+        self.assertEqual(self._upload().status_code, 200)
+
+    def test_group_import_requires_editor_role(self):
+        group = Group.objects.create(name='Team', owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=group)
+        self.assertEqual(self._upload(group=group.id).status_code, 403)
+
+    def test_non_integer_group_is_rejected(self):
+        response = self._upload(group='abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(UserEvent.objects.exists())
+        # The feed route only matches integer ids.
+        self.assertEqual(self.client.get('/api/groups/abc/calendar.ics').status_code, 404)
+
+    def test_management_command(self):
+        out = StringIO()
+        with tempfile.NamedTemporaryFile(suffix='.ics') as source:
+            source.write(calendar(MEETING))
+            source.flush()
+            call_command('import_ics', source.name, user='bob', stdout=out)
+        self.assertIn('created=1', out.getvalue())
@@ -0,0 +1,145 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from myapp.ics import fold, stream_calendar
+from myapp.models import Group, GroupMembership, RecurringEvent, UserEvent
+
+
+class CalendarFeedTests(APITestCase):
+    url = '/api/events/calendar.ics'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.owner = User.objects.create_user(username='alice', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.user, group=self.group)
+        self.client.force_authenticate(user=self.user)
+        self.solo = UserEvent.objects.create(type='solo', user=self.user, description='Dentist, Main St; 2nd floor',
+                                             date=date(2025, 6, 2), start_time=time(9, 0), end_time=time(10, 0))
+        self.group_event = UserEvent.objects.create(type='group', group=self.group, description='Planning',
+                                                    date=date(2025, 6, 3), start_time=time(14, 0), end_time=time(15, 0))
+        RecurringEvent.objects.create(type='group', group=self.group, description='Standup', start_date=date(2025, 6, 2),
+                                      start_time=time(9, 30), end_time=time(9, 45), frequency='weekly',
+                                      byweekday='0,2', until=date(2025, 12, 31), exdates=['2025-06-04'])
+
+    def _body(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_user_feed_streams_solo_group_and_series(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = self._body(response)
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(body.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 3)
+        self.assertIn("SUMMARY:Dentist\\, Main St\; 2nd floor\r\n", body)
+        self.assertIn("DTSTART;TZID=Europe/Budapest:20250603T140000\r\n", body)
+        self.assertIn("RRULE:FREQ=WEEKLY;INTERVAL=1;BYDAY=MO,WE;UNTIL=20251231T235959Z\r\n", body)
+        self.assertIn("EXDATE;TZID=Europe/Budapest:20250604T093000\r\n", body)
+
+    def test_events_until_midnight_end_on_the_next_day(self):
+        self.solo.start_time, self.solo.end_time = time(22, 0), time(0, 0)
+        self.solo.save()
+        body = self._body(self.client.get(self.url))
+        self.assertIn("DTSTART;TZID=Europe/Budapest:20250602T220000\r\n"
+                      "DTEND;TZID=Europe/Budapest:20250603T000000\r\n", body)
+
+    def test_unchanged_feed_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(2):  # roles are cached; one aggregate per table
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_edits_and_deletions_change_the_etag(self):
+        UserEvent.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        first = self.client.get(self.url)['ETag']
+        self.solo.save()
+        second = self.client.get(self.url)['ETag']
+        self.assertNotEqual(first, second)
+        self.group_event.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=second)
+        self.assertEqual(response.status_code, 200)
+
+    def test_switching_groups_changes_the_etag(self):
+        other = Group.objects.create(name='Other', owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=other, role='owner')
+        UserEvent.objects.create(type='group', group=other, description='Review', date=date(2025, 6, 3),
+                                 start_time=time(14, 0), end_time=time(15, 0))
+        RecurringEvent.objects.create(type='group', group=other, description='Retro', start_date=date(2025, 6, 2),
+                                      start_time=time(16, 0), end_time=time(17, 0), frequency='weekly')
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        UserEvent.objects.update(updated_at=an_hour_ago)
+        RecurringEvent.objects.update(updated_at=an_hour_ago)
+        etag = self.client.get(self.url)['ETag']
+
+        # Same counts and latest updated_at, other events.
+        GroupMembership.objects.get(user=self.user, group=self.group).delete()
+        GroupMembership.objects.create(user=self.user, group=other)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("SUMMARY:Review", self._body(response))
+
+    def test_group_feed_is_members_only(self):
+        url = f'/api/groups/{self.group.id}/calendar.ics'
+        body = self._body(self.client.get(url))
+        self.assertEqual(body.count("BEGIN:VEVENT"), 2)
+        self.assertNotIn("Dentist", body)
+
+        self.client.force_authenticate(user=User.objects.create_user(username='eve', password='pass'))
+        response = self.client.get(url, HTTP_ACCEPT='text/calendar')
+        self.assertEqual(response.status_code, 403)
+
+    def test_long_lines_are_folded_without_splitting_characters(self):
+        folded = fold("SUMMARY:" + "é" * 80)
+        lines = folded.split("\r\n")[:-1]
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertEqual("".join(line[1:] if index else line for index, line in enumerate(lines)),
+                         "SUMMARY:" + "é" * 80)
+
+    def test_rows_are_written_in_chunks(self):
+        chunks = list(stream_calendar('Test', UserEvent.objects.all(), RecurringEvent.objects.none(), chunk_size=1))
+        self.assertEqual(len(chunks), 4)  # header, two events, footer
+
+
+class CalendarFeedKeyTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=self.group, role='owner')
+        UserEvent.objects.create(type='solo', user=self.user, description='Dentist', date=date(2025, 6, 2),
+                                 start_time=time(9, 0), end_time=time(10, 0))
+
+    def key(self, method='get'):
+        self.client.force_authenticate(user=self.user)
+        response = getattr(self.client, method)('/api/events/calendar-key/')
+        self.client.force_authenticate(user=None)
+        return response
+
+    def test_subscribed_calendars_poll_with_the_key(self):
+        data = self.key().json()
+        self.assertEqual(self.key().json()['key'], data['key'])
+        self.assertTrue(data['feed_url'].endswith(f"/api/events/calendar.ics?key={data['key']}"))
+
+        response = self.client.get('/api/events/calendar.ics', {'key': data['key']})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("SUMMARY:Dentist", b"".join(response.streaming_content).decode())
+        response = self.client.get(f'/api/groups/{self.group.id}/calendar.ics', {'key': data['key']})
+        self.assertEqual(response.status_code, 200)
+        # The key opens the feeds only.
+        self.assertEqual(self.client.get('/api/events/', {'key': data['key']}).status_code, 401)
+
+    def test_rotating_and_revoking(self):
+        old = self.key().json()['key']
+        new = self.key('post').json()['key']
+        self.assertNotEqual(old, new)
+        self.assertEqual(self.client.get('/api/events/calendar.ics', {'key': old}).status_code, 401)
+        self.assertEqual(self.key('delete').status_code, 204)
+        self.assertEqual(self.client.get('/api/events/calendar.ics', {'key': new}).status_code, 401)
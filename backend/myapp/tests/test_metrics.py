@@ -0,0 +1,96 @@
+import re
+from datetime import date, time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp import metrics
+from myapp.models import EventParticipation, Group, GroupMembership, UserEvent
+
+
+def sample(text, name, **labels):
+    """Value of one series in Prometheus text, or None."""
+    for line in text.splitlines():
+        match = re.match(r'(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if match and match.group(1) == name:
+            found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ''))
+            if found == {key: str(value) for key, value in labels.items()}:
+                return float(match.group(3))
+    return None
+
+
+@override_settings(METRICS_ENABLED=True)
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.user)
+        GroupMembership.objects.create(user=self.user, group=self.group, role='owner')
+        self.event = UserEvent.objects.create(type='group', group=self.group, description='Sync',
+                                              date=date(2025, 6, 2), start_time=time(9, 0), end_time=time(10, 0))
+        EventParticipation.objects.create(user=self.user, event=self.event)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def scrape(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return response.content.decode()
+
+    def test_router_and_function_views_are_recorded(self):
+        self.client.get('/api/groups/')
+        self.client.get(f'/api/groups/{self.group.id}/')
+        self.client.post(f'/api/events/{self.event.id}/respond/', {'response': 'yes'}, format='json')
+        text = self.scrape()
+
+        self.assertEqual(sample(text, 'http_requests_total', route='api/groups/', method='GET', status=200), 1)
+        self.assertEqual(sample(text, 'http_request_duration_seconds_count', route='api/groups/<pk>/',
+                                method='GET'), 1)
+        respond = {'route': 'api/events/<int:event_id>/respond/', 'method': 'POST'}
+        self.assertEqual(sample(text, 'http_request_duration_seconds_bucket', le='+Inf', **respond), 1)
+        self.assertGreater(sample(text, 'http_request_db_queries_sum', **respond), 0)
+        self.assertGreater(sample(text, 'db_query_duration_seconds_total', **respond), 0)
+        self.assertGreater(sample(text, 'http_response_size_bytes_sum', **respond), 0)
+
+    def test_cache_hits_and_misses(self):
+        params = {'start_date': '2025-06-01', 'end_date': '2025-06-30'}
+        self.client.get('/api/events/', params)
+        self.client.get('/api/events/', params)
+        text = self.scrape()
+        self.assertEqual(sample(text, 'cache_requests_total', cache='calendar', result='miss'), 1)
+        self.assertEqual(sample(text, 'cache_requests_total', cache='calendar', result='hit'), 1)
+
+    async def test_async_view_queries_are_attributed(self):
+        # The test database connection predates the async client's handler; a
+        # sync request wraps it, as connection_created would for a new one.
+        await sync_to_async(self.client.get)('/metrics')
+        await self.async_client.get('/api/groups/my-groups/',
+                                    headers={'Authorization': f'Bearer {AccessToken.for_user(self.user)}'})
+        text = metrics.registry.render()
+        self.assertEqual(sample(text, 'http_request_db_queries_sum', route='api/groups/my-groups/', method='GET'), 2)
+
+    def test_unmatched_paths_share_one_route(self):
+        self.client.get('/api/nope/1/')
+        self.client.get('/api/nope/2/')
+        self.assertEqual(sample(self.scrape(), 'http_requests_total', route='<unmatched>', method='GET',
+                                status=404), 2)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class MetricsDisabledTests(TestCase):
+    def test_nothing_is_recorded(self):
+        metrics.registry.reset()
+        self.client.get('/api/nope/')
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.assertIsNone(sample(metrics.registry.render(), 'http_requests_total', route='<unmatched>',
+                                 method='GET', status=404))
@@ -1,8 +1,10 @@
 from django.test import TestCase
 from django.contrib.auth.models import User
-from ..models import Group, GroupMembership, UserEvent, EventParticipation
+from ..models import Group, GroupMembership, UserEvent, EventParticipation, RecurringEvent
+from ..recurrence import MAX_OCCURRENCES_PER_SERIES
 from django.utils.timezone import now, timedelta
 from django.core.exceptions import ValidationError
+from datetime import date, time
 
 
 class ModelTests(TestCase):
@@ -102,3 +104,52 @@ class ModelTests(TestCase):
         participation = EventParticipation.objects.create(user=self.user1, event=event, response='maybe')
         expected = f"{self.user1.username} - {str(event)} → Maybe"
         self.assertEqual(str(participation), expected)
+
+
+class RecurringEventTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='user1', password='pass')
+
+    def _series(self, **kwargs):
+        defaults = dict(type='solo', user=self.user, description='Standup', start_date=date(2025, 6, 3),
+                        start_time=time(9, 0), end_time=time(10, 0), frequency='weekly')
+        defaults.update(kwargs)
+        return RecurringEvent.objects.create(**defaults)
+
+    def test_weekly_series_with_interval_and_weekdays(self):
+        series = self._series(interval=2, byweekday='1,3')  # Tue/Thu every other week from Tue 3 June
+        self.assertEqual(list(series.occurrence_dates(date(2025, 6, 1), date(2025, 6, 30))),
+                         [date(2025, 6, 3), date(2025, 6, 5), date(2025, 6, 17), date(2025, 6, 19)])
+
+    def test_count_sets_last_date_and_exdates_are_skipped(self):
+        series = self._series(frequency='daily', count=5, exdates=['2025-06-05'])
+        self.assertEqual(series.last_date, date(2025, 6, 7))
+        self.assertEqual(list(series.occurrence_dates(date(2025, 1, 1), date(2025, 12, 31))),
+                         [date(2025, 6, 3), date(2025, 6, 4), date(2025, 6, 6), date(2025, 6, 7)])
+
+    def test_monthly_series_skips_short_months(self):
+        series = self._series(frequency='monthly', start_date=date(2025, 1, 31))
+        self.assertEqual(list(series.occurrence_dates(date(2025, 1, 1), date(2025, 5, 31))),
+                         [date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31)])
+
+    def test_overlapping_uses_series_bounds(self):
+        ended = self._series(until=date(2025, 6, 30))
+        open_ended = self._series()
+        window = RecurringEvent.objects.overlapping(date(2025, 7, 1), date(2025, 7, 31))
+        self.assertEqual(list(window), [open_ended])
+        self.assertNotIn(ended, window)
+
+    def test_count_past_the_last_date_is_open_ended(self):
+        series = self._series(frequency='monthly', interval=99, count=1000)
+        self.assertIsNone(series.last_date)
+
+    def test_occurrences_are_capped_per_series(self):
+        series = self._series(frequency='daily', start_date=date(2000, 1, 1))
+        occurrences = series.occurrences(date(2020, 1, 1), date(2025, 12, 31))
+        self.assertEqual(len(occurrences), MAX_OCCURRENCES_PER_SERIES)
+        self.assertEqual(occurrences[0]['date'], '2020-01-01')
+
+    def test_expansion_cost_follows_the_window(self):
+        series = self._series(frequency='daily', start_date=date(2000, 1, 1))
+        self.assertEqual(len(list(series.occurrence_dates(date(2025, 6, 1), date(2025, 6, 7)))), 7)
@@ -0,0 +1,44 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from myapp.models import EmailOutbox
+from myapp.outbox import drain_outbox
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        EmailOutbox.objects.enqueue("Group Event Created: Standup", "First", "app@example.com",
+                                    ["alice@example.com", "bob@example.com", ""])
+        EmailOutbox.objects.enqueue("Group Event Updated: Standup", "Second", "app@example.com",
+                                    ["alice@example.com"])
+
+    def test_enqueue_skips_empty_recipients(self):
+        self.assertEqual(EmailOutbox.objects.count(), 3)
+
+    def test_run_outbox_batches_per_recipient(self):
+        call_command('run_outbox', '--once', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 2)
+        by_recipient = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(by_recipient["alice@example.com"].subject, "2 group event updates")
+        self.assertIn("Second", by_recipient["alice@example.com"].body)
+        self.assertEqual(by_recipient["bob@example.com"].subject, "Group Event Created: Standup")
+        self.assertFalse(EmailOutbox.objects.exclude(status='sent').exists())
+
+    def test_failures_are_retried_with_backoff_then_marked_failed(self):
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   side_effect=ConnectionError("smtp down")):
+            stats = drain_outbox(max_attempts=2, backoff=60)
+            self.assertEqual(stats, {'sent': 0, 'retried': 3, 'failed': 0})
+            self.assertEqual(drain_outbox(max_attempts=2)['retried'], 0)  # not due yet
+
+            EmailOutbox.objects.update(next_attempt_at=EmailOutbox.objects.first().created_at)
+            stats = drain_outbox(max_attempts=2, backoff=60)
+
+        self.assertEqual(stats['failed'], 3)
+        self.assertEqual(set(EmailOutbox.objects.values_list('last_error', flat=True)), {"smtp down"})
+        self.assertEqual(len(mail.outbox), 0)
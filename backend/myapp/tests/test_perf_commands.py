@@ -0,0 +1,42 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from myapp.models import ChangeTombstone, Group, GroupMembership, UserEvent
+
+
+class PerfCommandTests(TestCase):
+    def setUp(self):
+        call_command('seed_perf', users=12, groups=3, events_per_user=4, events_per_group=3, days=14,
+                     stdout=io.StringIO())
+
+    def test_seed_is_consistent(self):
+        for group in Group.objects.all():
+            self.assertEqual(group.member_count, GroupMembership.objects.filter(group=group).count())
+        self.assertTrue(UserEvent.objects.filter(type='group').exists())
+        owner = Group.objects.order_by('-member_count').first().owner
+        self.assertEqual(owner.username, 'perf-user-0')
+
+    def test_bench_reports_every_selected_route(self):
+        out = io.StringIO()
+        call_command('bench_api', repeat=2, warmup=0, only=r'^(events/|groups/<int:group_id>/(join|delete)/)$',
+                     json_path='-', stdout=out)
+        report = json.loads(out.getvalue()[out.getvalue().index('{'):])
+        rows = {row['route']: row for row in report['results']}
+        self.assertEqual(rows['events/']['status'], 200)
+        self.assertEqual(rows['groups/<int:group_id>/join/']['status'], 201)
+        self.assertEqual(rows['groups/<int:group_id>/delete/']['status'], 204)
+        # Writes are rolled back.
+        self.assertEqual(Group.objects.count(), 3)
+
+    def test_event_query_bench_rolls_back(self):
+        events = UserEvent.objects.count()
+        call_command('bench_event_queries', rows=200, users=10, groups=2, repeat=1, stdout=io.StringIO())
+        self.assertEqual((UserEvent.objects.count(), Group.objects.count()), (events, 3))
+        self.assertFalse(ChangeTombstone.objects.exists())
+
+        call_command('bench_event_queries', rows=200, users=10, groups=2, repeat=1, keep=True, stdout=io.StringIO())
+        kept = Group.objects.filter(name__startswith='bench-events')
+        self.assertEqual(list(kept.values_list('member_count', flat=True)), [5, 5])
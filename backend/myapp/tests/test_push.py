@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from datetime import date, time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from myapp import push
+from myapp.models import EventParticipation, Group, GroupMembership, UserEvent
+
+
+class BrokerTests(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+
+    def _drain(self, subscription):
+        messages = []
+        while (message := self.loop.run_until_complete(subscription.get(0.01))) is not None:
+            messages.append(message[:2])
+        return messages
+
+    def test_messages_from_other_threads_reach_subscribed_channels_only(self):
+        broker = push.InProcessBroker()
+        subscription = broker.subscribe(['user:1', 'group:2'], loop=self.loop)
+        thread = threading.Thread(target=lambda: [
+            broker.publish(channel, push.message_for('event', {'id': index}))
+            for index, channel in enumerate(['user:1', 'group:3', 'group:2'])
+        ])
+        thread.start()
+        thread.join()
+        self.assertEqual(self._drain(subscription), [('event', {'id': 0}), ('event', {'id': 2})])
+
+        subscription.close()
+        self.assertFalse(broker.has_subscribers('user:1'))
+
+    def test_slow_subscriber_gets_a_single_resync(self):
+        broker = push.InProcessBroker(queue_size=2)
+        subscription = broker.subscribe(['user:1'], loop=self.loop)
+        for index in range(5):
+            broker.publish('user:1', push.message_for('event', {'id': index}))
+        self.assertEqual(self._drain(subscription), [('resync', {})])
+
+
+class PushSignalTests(TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.owner = User.objects.create_user(username='alice', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        self.subscription = push.get_broker().subscribe(
+            [push.user_channel(self.user.id), push.group_channel(self.group.id)], loop=self.loop)
+        self.addCleanup(self.subscription.close)
+
+    def _drain(self):
+        messages = []
+        while (message := self.loop.run_until_complete(self.subscription.get(0.01))) is not None:
+            messages.append(message[:2])
+        return messages
+
+    def test_event_changes_are_pushed_as_compact_diffs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            event = UserEvent.objects.create(type='solo', user=self.user, description='Gym', date=date(2025, 6, 2),
+                                             start_time=time(7, 0), end_time=time(8, 0))
+        self.assertEqual(self._drain(), [('event', {
+            'id': event.id, 'type': 'solo', 'user': self.user.id, 'group': None, 'description': 'Gym',
+            'date': date(2025, 6, 2), 'start_time': time(7, 0), 'end_time': time(8, 0), 'location': '',
+        })])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.end_time = time(9, 0)
+            event.save()
+        self.assertEqual(self._drain(), [('event', {'id': event.id, 'end_time': time(9, 0)})])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            event.type, event.user, event.group = 'group', None, self.group
+            event.save()
+        kinds = [kind for kind, _ in self._drain()]
+        self.assertEqual(kinds, ['event.delete', 'event'])
+
+        event_id = event.id
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        self.assertEqual(self._drain(), [('event.delete', {'id': event_id})])
+
+    def test_nothing_is_pushed_for_rolled_back_writes(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            UserEvent.objects.create(type='solo', user=self.user, description='Gym', date=date(2025, 6, 2),
+                                     start_time=time(7, 0), end_time=time(8, 0))
+        self.assertEqual(self._drain(), [])
+
+    def test_membership_and_participation_changes(self):
+        event = UserEvent.objects.create(type='group', group=self.group, description='Planning',
+                                         date=date(2025, 6, 2), start_time=time(9, 0), end_time=time(10, 0))
+        self._drain()
+        with self.captureOnCommitCallbacks(execute=True):
+            GroupMembership.objects.create(user=self.user, group=self.group)
+            EventParticipation.objects.update_or_create(user=self.user, event=event, defaults={'response': 'yes'})
+        messages = self._drain()
+        self.assertIn(('membership', {'group': self.group.id, 'user': self.user.id, 'role': 'member'}), messages)
+        self.assertIn(('participation', {'event': event.id, 'user': self.user.id, 'response': 'yes'}), messages)
+
+
+class EventStreamTests(TestCase):
+    url = '/api/events/stream/'
+
+    def test_requires_asgi(self):
+        self.assertEqual(self.client.get(self.url).status_code, 501)
+
+    async def test_streams_ready_and_published_frames(self):
+        user = await sync_to_async(User.objects.create_user)(username='bob', password='pass')
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 401)
+
+        response = await self.async_client.get(self.url, {'token': str(AccessToken.for_user(user))})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = aiter(response.streaming_content)
+        self.assertTrue((await anext(frames)).startswith(b'event: ready\n'))
+
+        push.publish([push.user_channel(user.id)], 'event.delete', {'id': 7})
+        self.assertEqual(await anext(frames), b'event: event.delete\ndata: {"id":7}\n\n')
+        await frames.aclose()
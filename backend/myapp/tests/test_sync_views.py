@@ -0,0 +1,99 @@
+from datetime import date, time, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from myapp.models import Group, GroupMembership, UserEvent
+from myapp.views.sync_views import encode_sync_token
+
+
+class EventChangesTests(APITestCase):
+    url = '/api/events/changes/'
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='pass')
+        self.owner = User.objects.create_user(username='alice', password='pass')
+        self.group = Group.objects.create(name='Team', owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=self.group, role='owner')
+        GroupMembership.objects.create(user=self.user, group=self.group)
+        self.client.force_authenticate(user=self.user)
+        self.solo = self._event(type='solo', user=self.user)
+        self.group_event = self._event(type='group', group=self.group)
+        self._backdate()
+
+    def _backdate(self):
+        # Push fixtures outside the feed's overlap window.
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        UserEvent.objects.update(updated_at=an_hour_ago)
+        GroupMembership.objects.update(joined_at=an_hour_ago)
+
+    def _event(self, **kwargs):
+        return UserEvent.objects.create(description='Event', date=date(2025, 6, 2),
+                                        start_time=time(9, 0), end_time=time(10, 0), **kwargs)
+
+    def _initial_token(self):
+        response = self.client.get(self.url, {'start_date': '2025-06-01', 'end_date': '2025-06-30'})
+        self.assertEqual(len(response.data['events']), 2)
+        return response.data['sync_token']
+
+    def _later(self, minutes=10):
+        return patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(minutes=minutes))
+
+    def test_in_sync_client_gets_empty_feed(self):
+        token = self._initial_token()
+        with self._later():
+            response = self.client.get(self.url, {'sync_token': token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['events'], [])
+        self.assertEqual(response.data['deleted_events'], [])
+
+    def test_reports_updates_deletes_and_participations(self):
+        token = self._initial_token()
+        deleted_id = self.group_event.id
+        with self._later():
+            self.solo.description = 'Changed'
+            self.solo.save()
+            self.group_event.delete()
+            response = self.client.get(self.url, {'sync_token': token})
+        self.assertEqual([event['description'] for event in response.data['events']], ['Changed'])
+        self.assertEqual(response.data['deleted_events'], [deleted_id])
+
+    def test_event_moved_out_of_view_is_reported_deleted(self):
+        other_group = Group.objects.create(name='Other', owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=other_group, role='owner')
+        token = self._initial_token()
+        with self._later():
+            self.group_event.group = other_group
+            self.group_event.save()
+            self.solo.type, self.solo.user, self.solo.group = 'group', None, self.group
+            self.solo.save()
+            response = self.client.get(self.url, {'sync_token': token})
+        # The solo event moved into a group the caller is in, so it is only changed.
+        self.assertEqual([event['id'] for event in response.data['events']], [self.solo.id])
+        self.assertEqual(response.data['deleted_events'], [self.group_event.id])
+
+        self.client.force_authenticate(user=self.owner)
+        with self._later():
+            response = self.client.get(self.url, {'sync_token': token})
+        self.assertEqual({event['id'] for event in response.data['events']}, {self.solo.id, self.group_event.id})
+        self.assertEqual(response.data['deleted_events'], [])
+
+    def test_leaving_and_joining_groups(self):
+        other_group = Group.objects.create(name='Other', owner=self.owner)
+        GroupMembership.objects.create(user=self.owner, group=other_group, role='owner')
+        other_event = self._event(type='group', group=other_group)
+        self._backdate()
+        token = self._initial_token()
+        with self._later():
+            GroupMembership.objects.get(user=self.user, group=self.group).delete()
+            GroupMembership.objects.create(user=self.user, group=other_group)
+            response = self.client.get(self.url, {'sync_token': token})
+        self.assertEqual(response.data['removed_groups'], [self.group.id])
+        self.assertEqual([event['id'] for event in response.data['events']], [other_event.id])
+
+    def test_expired_and_invalid_tokens(self):
+        old = encode_sync_token(timezone.now() - timedelta(days=60))
+        self.assertEqual(self.client.get(self.url, {'sync_token': old}).status_code, 410)
+        self.assertEqual(self.client.get(self.url, {'sync_token': 'nope'}).status_code, 400)
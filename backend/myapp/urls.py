@@ -5,6 +5,7 @@ from . import views
 router = DefaultRouter()
 router.register(r'group-memberships', views.GroupMembershipViewSet)
 router.register(r'groups', views.GroupViewSet, basename='group')
+router.register(r'recurring-events', views.RecurringEventViewSet, basename='recurring-event')
 
 urlpatterns = [
     path('availability/', views.UserEventListCreateView.as_view(), name='user-event-list'),
@@ -17,13 +18,24 @@ urlpatterns = [
     path('groups/<int:group_id>/members/', views.get_group_members, name='get_group_members'),
     path('groups/<int:group_id>/members/<int:user_id>/remove/', views.remove_user_from_group, name='remove_user_from_group'),
     path('groups/<int:group_id>/members/<int:user_id>/role', views.update_user_role_in_group, name='update_user_role_in_group'),
+    path('groups/<int:group_id>/freebusy/', views.group_freebusy, name='group-freebusy'),
+    path('groups/<int:group_id>/suggest-slots/', views.suggest_group_slots, name='group-suggest-slots'),
+    path('groups/<int:group_id>/heatmap/', views.group_heatmap, name='group-heatmap'),
+    path('groups/<int:group_id>/calendar.ics', views.group_calendar_feed, name='group-calendar-feed'),
     path('user-data/', views.UserDataView.as_view(), name='user-data'),
     path('groups/my-groups/', views.my_groups, name='my-groups'),
     path('submit-events/', views.EventSlotSubmissionView.as_view(), name='submit-events'),
     path('submit-event/', views.EventSubmissionView.as_view(), name='submit-event'),
     path('events/', views.UserEventListView.as_view(), name='user-event-list'),
+    path('events/changes/', views.event_changes, name='event-changes'),
+    path('events/calendar.ics', views.user_calendar_feed, name='user-calendar-feed'),
+    path('events/calendar-key/', views.calendar_feed_key, name='calendar-feed-key'),
+    path('events/import/', views.import_calendar, name='import-calendar'),
+    path('events/stream/', views.event_stream, name='event-stream'),
+    path('events/cache-stats/', views.calendar_cache_stats, name='calendar-cache-stats'),
     path('google-login/', views.GoogleLoginView.as_view(), name='google-login'),
     path('add-to-google-calendar/', views.add_to_google_calendar, name='google-calendar'),
+    path('add-to-google-calendar/bulk/', views.bulk_add_to_google_calendar, name='google-calendar-bulk'),
     path('delete-google-calendar/', views.delete_from_google_calendar, name='google-calendar-delete'),
     path('group-role/', views.get_user_group_role, name='get_user_group_role'),
     path('events/<int:event_id>/respond/', views.respond_to_event, name='respond-to-event'),
@@ -4,3 +4,9 @@ from .group_views import *
 from .event_views import *
 from .calendar_views import *
 from .participate_view import *
+from .availability_views import *
+from .sync_views import *
+from .recurring_views import *
+from .ics_views import *
+from .stream_views import *
+from .metrics_views import *
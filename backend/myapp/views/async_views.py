@@ -0,0 +1,161 @@
+"""Async twins of the read-heavy endpoints, routed in by backend.asgi_urls.
+
+Under ASGI each of these awaits its queries instead of holding a worker
+thread, so one worker can serve many concurrent calendar reads. Responses are
+byte-for-byte the same as the DRF views they mirror.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.http import HttpResponse
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .. import calendar_cache, roles
+from ..models import Group, GroupMembership, RecurringEvent, UserEvent
+from ..pagination import EventKeysetPagination
+from ..middleware import gzip_large_responses
+from ..renderers import ColumnarEventRenderer, FastJSONRenderer
+from ..serializers import GroupSerializer, UserEventRowSerializer
+
+NOT_AUTHENTICATED = "Authentication credentials were not provided."
+INVALID_TOKEN = "Given token not valid for any token type"
+
+
+def json_response(data, status=200):
+    # Same bytes as the DRF views' renderer.
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type='application/json')
+
+
+async def aauthenticate(request, allow_query_token=False):
+    """(user, error_response) for a JWT in the Authorization header.
+
+    ``allow_query_token`` also accepts ``?token=``, for EventSource clients
+    that cannot send headers.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None and allow_query_token:
+        raw_token = request.GET.get('token', '').encode() or None
+    if raw_token is None:
+        return None, json_response({"detail": NOT_AUTHENTICATED}, status=401)
+    try:
+        user_id = authentication.get_validated_token(raw_token)[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None, json_response({"detail": INVALID_TOKEN}, status=401)
+    user = await get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+    if user is None or not user.is_active:
+        return None, json_response({"detail": INVALID_TOKEN}, status=401)
+    return user, None
+
+
+def _event_list_response(request, data):
+    # ?format=columnar or its media type, as DRF's content negotiation allows.
+    renderer = ColumnarEventRenderer
+    if request.GET.get('format') == renderer.format or renderer.media_type in request.headers.get('Accept', ''):
+        return HttpResponse(renderer().render(data), content_type=renderer.media_type)
+    return json_response(data)
+
+
+async def _paginated(request, events):
+    paginator = EventKeysetPagination()
+    try:
+        page = await paginator.apaginate_queryset(UserEventRowSerializer.values(events), request)
+    except NotFound as error:
+        return None, None, json_response({"detail": str(error.detail)}, status=404)
+    data = {'next': paginator.get_next_link(), 'results': UserEventRowSerializer(page).data}
+    return data, paginator.next_cursor, None
+
+
+@require_GET
+@gzip_large_responses
+async def user_event_list(request):
+    """Async UserEventListView.get."""
+    user, error = await aauthenticate(request)
+    if error:
+        return error
+    start_date = parse_date(request.GET.get('start_date'))
+    end_date = parse_date(request.GET.get('end_date'))
+
+    cache_key = await calendar_cache.apage_key(user.id, {
+        name: request.GET.get(name, '') for name in ('start_date', 'end_date', 'cursor', 'page_size')
+    })
+    cached = await calendar_cache.aget_page(cache_key)
+    if cached is not None:
+        next_cursor, data = cached
+        return _event_list_response(request, {'next': EventKeysetPagination.link(request, next_cursor), **data})
+
+    user_group_ids = list(await roles.aget_roles(user.id, request))
+    visible = Q(type='solo', user=user) | Q(type='group', group_id__in=user_group_ids)
+
+    data, next_cursor, error = await _paginated(request, UserEvent.objects.filter(visible).filter(
+        date__range=(start_date, end_date)
+    ))
+    if error:
+        return error
+    if not request.GET.get('cursor'):
+        data['occurrences'] = await RecurringEvent.objects.filter(visible).aoccurrences(start_date, end_date)
+    await calendar_cache.aset_page(cache_key, next_cursor,
+                                   {name: value for name, value in data.items() if name != 'next'})
+    return _event_list_response(request, data)
+
+
+@require_GET
+@gzip_large_responses
+async def filtered_user_events(request):
+    """Async FilteredUserEventView.get."""
+    user_id = request.GET.get('id')
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+
+    if not user_id or not start_date or not end_date:
+        return json_response({"error": "Missing required parameters"}, status=400)
+
+    data, _, error = await _paginated(request, UserEvent.objects.filter(
+        type='solo',
+        user_id=user_id,
+        date__range=[start_date, end_date]
+    ))
+    if error:
+        return error
+    if not request.GET.get('cursor'):
+        data['occurrences'] = await RecurringEvent.objects.filter(
+            type='solo', user_id=user_id
+        ).aoccurrences(parse_date(start_date), parse_date(end_date))
+    return _event_list_response(request, data)
+
+
+@require_GET
+async def my_groups(request):
+    """Async my_groups."""
+    user, error = await aauthenticate(request)
+    if error:
+        return error
+    groups = [membership.group async for membership in
+              GroupMembership.objects.filter(user=user).select_related('group')]
+    return json_response(GroupSerializer(groups, many=True).data)
+
+
+@require_GET
+async def get_group_members(request, group_id):
+    """Async get_group_members."""
+    user, error = await aauthenticate(request)
+    if error:
+        return error
+    group = await Group.objects.filter(id=group_id).afirst()
+    if group is None:
+        return json_response({"detail": "No Group matches the given query."}, status=404)
+
+    members = [
+        {
+            "id": membership.user.id,
+            "username": membership.user.username,
+            "role": membership.role
+        }
+        async for membership in GroupMembership.objects.filter(group=group).select_related('user')
+    ]
+    return json_response(members)
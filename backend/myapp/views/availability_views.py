@@ -0,0 +1,216 @@
+from collections import defaultdict
+
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.utils.dateparse import parse_date, parse_time
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .. import busymap, heatmap, roles
+from ..freebusy import FreeBusyWindow, MINUTES_PER_DAY, find_common_slots, time_to_minutes
+from ..models import Group, GroupMembership, RecurringEvent, UserEvent
+
+
+# Longest windows served in one response; the work grows with days x members.
+MAX_FREEBUSY_DAYS = 92
+MAX_SUGGEST_DAYS = 31
+MAX_HEATMAP_DAYS = 92
+
+
+def _parse_window(params, max_days):
+    """Return (start_date, end_date, error_response) from query params."""
+    start_date = parse_date(params.get('start_date') or '')
+    end_date = parse_date(params.get('end_date') or '')
+    if not start_date or not end_date:
+        return None, None, Response({"error": "start_date and end_date are required (YYYY-MM-DD)."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+    if end_date < start_date:
+        return None, None, Response({"error": "end_date must not be before start_date."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+    if (end_date - start_date).days >= max_days:
+        return None, None, Response({"error": f"The window may span at most {max_days} days."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+    return start_date, end_date, None
+
+
+def _parse_granularity(params, default=15):
+    try:
+        granularity = int(params.get('granularity', default))
+    except (TypeError, ValueError):
+        return None
+    if granularity <= 0 or MINUTES_PER_DAY % granularity:
+        return None
+    return granularity
+
+
+def _parse_int(params, name, default, minimum=1):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        return None
+    return value if value >= minimum else None
+
+
+def _parse_minutes(params, name, default):
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    if value == '24:00':
+        return MINUTES_PER_DAY
+    parsed = parse_time(value)
+    return time_to_minutes(parsed) if parsed else None
+
+
+def _parse_weekdays(params, default=(0, 1, 2, 3, 4)):
+    value = params.get('weekdays')
+    if not value:
+        return default
+    try:
+        weekdays = tuple(sorted({int(day) for day in value.split(',')}))
+    except ValueError:
+        return None
+    return weekdays if all(0 <= day <= 6 for day in weekdays) else None
+
+
+def _member_groups(group):
+    """Map every group a member of ``group`` belongs to onto those members."""
+    rows = GroupMembership.objects.filter(
+        user_id__in=GroupMembership.objects.filter(group=group).values('user_id')
+    ).values_list('user_id', 'group_id')
+    members_by_group = defaultdict(list)
+    for user_id, group_id in rows:
+        members_by_group[group_id].append(user_id)
+    return members_by_group
+
+
+def build_group_window(group, start_date, end_date, granularity):
+    """Load all busy time of ``group``'s members into a FreeBusyWindow.
+
+    Granularities on the 15-minute grid read the members' busy bitmaps, one
+    row per member and day; finer ones scan the events themselves.
+    """
+    members_by_group = _member_groups(group)
+    member_ids = members_by_group.get(group.id, [])
+    window = FreeBusyWindow(start_date, end_date, granularity)
+
+    def add(event_type, user_id, group_id, day, start_time, end_time):
+        if event_type == 'solo':
+            window.add_event(user_id, day, start_time, end_time)
+        else:
+            for member_id in members_by_group.get(group_id, ()):
+                window.add_event(member_id, day, start_time, end_time)
+
+    if granularity % busymap.SLOT_MINUTES == 0:
+        busymap.fill_window(window, member_ids, start_date, end_date)
+    else:
+        events = UserEvent.objects.filter(
+            Q(type='solo', user_id__in=member_ids) |
+            Q(type='group', group_id__in=list(members_by_group))
+        ).filter(
+            date__range=(start_date, end_date)
+        ).order_by().values_list('type', 'user_id', 'group_id', 'date', 'start_time', 'end_time')
+        for row in events:
+            add(*row)
+
+    series_list = RecurringEvent.objects.filter(
+        Q(type='solo', user_id__in=member_ids) |
+        Q(type='group', group_id__in=list(members_by_group))
+    ).overlapping(start_date, end_date)
+    for series in series_list:
+        for day in series.occurrence_dates(start_date, end_date):
+            add(series.type, series.user_id, series.group_id, day, series.start_time, series.end_time)
+    return window, sorted(member_ids)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def group_freebusy(request, group_id):
+    group = get_object_or_404(Group, id=group_id)
+
+    start_date, end_date, error = _parse_window(request.query_params, MAX_FREEBUSY_DAYS)
+    if error:
+        return error
+    granularity = _parse_granularity(request.query_params)
+    if granularity is None:
+        return Response({"error": "granularity must be a positive number of minutes dividing a day."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if not roles.is_member(request.user, group.id, request):
+        return Response({"error": "You are not a member of this group."}, status=status.HTTP_403_FORBIDDEN)
+
+    window, member_ids = build_group_window(group, start_date, end_date, granularity)
+
+    return Response({
+        "group": group.id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "granularity": granularity,
+        "busy": window.to_slots(window.group_busy()),
+        "members": [
+            {"user": member_id, "busy": window.to_slots(window.member_busy(member_id))}
+            for member_id in member_ids
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def suggest_group_slots(request, group_id):
+    group = get_object_or_404(Group, id=group_id)
+    params = request.query_params
+
+    start_date, end_date, error = _parse_window(params, MAX_SUGGEST_DAYS)
+    if error:
+        return error
+
+    granularity = _parse_granularity(params)
+    duration = _parse_int(params, 'duration', 60)
+    quorum = _parse_int(params, 'quorum', 1)
+    limit = _parse_int(params, 'limit', 5)
+    work_start = _parse_minutes(params, 'work_start', 9 * 60)
+    work_end = _parse_minutes(params, 'work_end', 17 * 60)
+    weekdays = _parse_weekdays(params)
+
+    if None in (granularity, duration, quorum, limit, work_start, work_end, weekdays):
+        return Response({"error": "Invalid granularity, duration, quorum, limit, work hours or weekdays."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if work_end <= work_start:
+        return Response({"error": "work_end must be after work_start."}, status=status.HTTP_400_BAD_REQUEST)
+    if not roles.is_member(request.user, group.id, request):
+        return Response({"error": "You are not a member of this group."}, status=status.HTTP_403_FORBIDDEN)
+
+    window, member_ids = build_group_window(group, start_date, end_date, granularity)
+
+    slots = find_common_slots(
+        window, member_ids, duration, work_start, work_end,
+        weekdays=weekdays, quorum=quorum, limit=min(limit, 50),
+    )
+    return Response({
+        "group": group.id,
+        "duration": duration,
+        "member_count": len(member_ids),
+        "slots": slots,
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def group_heatmap(request, group_id):
+    """Busy member counts per 30-minute bucket, read from the precomputed table."""
+    group = get_object_or_404(Group, id=group_id)
+
+    start_date, end_date, error = _parse_window(request.query_params, MAX_HEATMAP_DAYS)
+    if error:
+        return error
+    if not roles.is_member(request.user, group.id, request):
+        return Response({"error": "You are not a member of this group."}, status=status.HTTP_403_FORBIDDEN)
+
+    return Response({
+        "group": group.id,
+        "start_date": start_date,
+        "end_date": end_date,
+        "bucket_minutes": heatmap.BUCKET_MINUTES,
+        "member_count": group.member_count,
+        "days": heatmap.read(group, start_date, end_date),
+    }, status=status.HTTP_200_OK)
@@ -1,7 +1,11 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.db.models import Q
+from django.utils import timezone
 import requests
-from myapp.models import UserEvent
+from myapp.models import GroupMembership, UserEvent
+from myapp.google_calendar import GoogleCalendarSync, attendees_by_group
+from myapp import calendar_cache
 from rest_framework.permissions import IsAuthenticated
 
 
@@ -13,11 +17,6 @@ def add_to_google_calendar(request):
     if not token or not event:
         return Response({"error": "Missing token or event"}, status=400)
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
-
     # Base event data
     event_data = {
         "summary": event["title"],
@@ -36,46 +35,66 @@ def add_to_google_calendar(request):
 
     # Add group members as attendees if this is a group event
     user_event_id = event.get("id")
+    owner = None
     if user_event_id:
-        try:
-            user_event = UserEvent.objects.select_related("group").get(id=user_event_id)
-            group = user_event.group
-            if group:
-                from myapp.models import GroupMembership  # adjust import if needed
-                memberships = GroupMembership.objects.filter(group=group).select_related("user")
-                attendees = [{"email": member.user.email} for member in memberships if member.user.email]
-                event_data["attendees"] = attendees
-        except UserEvent.DoesNotExist:
-            print(f"UserEvent with id={user_event_id} not found")
+        owner = UserEvent.objects.filter(id=user_event_id).values_list("user_id", "group_id").first()
+        if owner and owner[1]:
+            event_data["attendees"] = attendees_by_group([owner[1]]).get(owner[1], [])
 
     google_event_id = event.get("google_event_id")
-
-    if google_event_id:
-        response = requests.patch(
-            f"https://www.googleapis.com/calendar/v3/calendars/primary/events/{google_event_id}",
-            headers=headers,
-            json=event_data
+    try:
+        response = GoogleCalendarSync(token).push(event_data, google_event_id)
+    except requests.RequestException as e:
+        return Response({"error": f"Google Calendar request failed: {e}"}, status=502)
+
+    if not google_event_id and response.status_code in (200, 201) and owner:
+        UserEvent.objects.filter(id=user_event_id).update(
+            google_event_id=response.json().get("id"), updated_at=timezone.now()
         )
-    else:
-        response = requests.post(
-            "https://www.googleapis.com/calendar/v3/calendars/primary/events",
-            headers=headers,
-            json=event_data
-        )
-
-        if response.status_code in (200, 201):
-            google_event_id = response.json().get("id")
-
-            try:
-                user_event = UserEvent.objects.get(id=user_event_id)
-                user_event.google_event_id = google_event_id
-                user_event.save()
-            except UserEvent.DoesNotExist:
-                print(f"UserEvent with id={user_event_id} not found")
+        calendar_cache.invalidate_event_owners([owner])
 
     return Response(response.json(), status=response.status_code)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def bulk_add_to_google_calendar(request):
+    """Push many stored events at once: {"token": ..., "event_ids": [...]}."""
+    token = request.data.get("token")
+    event_ids = request.data.get("event_ids")
+
+    if not token or not isinstance(event_ids, list) or not event_ids:
+        return Response({"error": "Missing token or event_ids"}, status=400)
+    if any(isinstance(event_id, bool) or not isinstance(event_id, int) for event_id in event_ids):
+        return Response({"error": "event_ids must be a list of integers"}, status=400)
+
+    user_group_ids = GroupMembership.objects.filter(user=request.user).values_list("group_id", flat=True)
+    user_events = list(UserEvent.objects.filter(
+        Q(type="solo", user=request.user) |
+        Q(type="group", group_id__in=user_group_ids)
+    ).filter(id__in=event_ids))
+
+    results = GoogleCalendarSync(token).push_many(user_events)
+
+    synced = []
+    now = timezone.now()
+    for user_event, status_code, google_event_id in results:
+        if status_code in (200, 201) and google_event_id != user_event.google_event_id:
+            user_event.google_event_id = google_event_id
+            user_event.updated_at = now
+            synced.append(user_event)
+    UserEvent.objects.bulk_update(synced, ["google_event_id", "updated_at"])
+    calendar_cache.invalidate_event_owners((user_event.user_id, user_event.group_id) for user_event in synced)
+
+    found_ids = {user_event.id for user_event in user_events}
+    return Response({
+        "results": [
+            {"id": user_event.id, "status": status_code, "google_event_id": google_event_id}
+            for user_event, status_code, google_event_id in results
+        ],
+        "not_found": [event_id for event_id in event_ids if event_id not in found_ids],
+    }, status=200)
+
 
 @api_view(["POST"])
 def delete_from_google_calendar(request):
@@ -85,23 +104,16 @@ def delete_from_google_calendar(request):
     if not token or not google_event_id:
         return Response({"error": "Missing token or google_event_id"}, status=400)
 
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-
-    response = requests.delete(
-        f"https://www.googleapis.com/calendar/v3/calendars/primary/events/{google_event_id}",
-        headers=headers
-    )
+    try:
+        response = GoogleCalendarSync(token).delete(google_event_id)
+    except requests.RequestException as e:
+        return Response({"error": f"Google Calendar request failed: {e}"}, status=502)
 
     if response.status_code == 204:
-        try:
-            user_event = UserEvent.objects.get(google_event_id=google_event_id)
-            user_event.google_event_id = None
-            user_event.save()
-        except UserEvent.DoesNotExist:
-            pass
-
+        synced = UserEvent.objects.filter(google_event_id=google_event_id)
+        owners = list(synced.values_list("user_id", "group_id"))
+        synced.update(google_event_id=None, updated_at=timezone.now())
+        calendar_cache.invalidate_event_owners(owners)
         return Response({"message": "Deleted from Google Calendar"}, status=204)
     else:
         return Response(response.json(), status=response.status_code)
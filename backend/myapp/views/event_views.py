@@ -1,26 +1,44 @@
 #view/event_views.py
 from django.conf import settings
-from ..models import EventParticipation, Group, UserEvent, GroupMembership
-from ..serializers import UserEventSerializer, EventSubmissionSerializer
+from ..models import EmailOutbox, EventParticipation, RecurringEvent, UserEvent, GroupMembership
+from ..serializers import UserEventRowSerializer, UserEventSerializer, EventSubmissionSerializer
+from ..pagination import EventKeysetPagination
+from ..middleware import gzip_large_responses
+from ..renderers import EVENT_LIST_RENDERERS
+from .. import calendar_cache, roles
+from ..conflicts import ALLOW, REJECT, SKIP, EventConflictError, conflict_mode, overlapping_events
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.utils.dateparse import parse_date
+from django.utils.decorators import method_decorator
 from django.db.models import Q
-from rest_framework.permissions import IsAuthenticated
-from django.core.mail import send_mass_mail
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.decorators import api_view, permission_classes
+from django.db import transaction
 
 
+@method_decorator(gzip_large_responses, name='dispatch')
 class UserEventListCreateView(generics.ListCreateAPIView):
     queryset = UserEvent.objects.all()
     serializer_class = UserEventSerializer
+    pagination_class = EventKeysetPagination
+    renderer_classes = EVENT_LIST_RENDERERS
+
+    def list(self, request, *args, **kwargs):
+        events = UserEventRowSerializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(events)
+        return self.get_paginated_response(UserEventRowSerializer(page).data)
 
 class UserEventDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = UserEvent.objects.all()
     serializer_class = UserEventSerializer
     
+@method_decorator(gzip_large_responses, name='dispatch')
 class FilteredUserEventView(APIView):
+    renderer_classes = EVENT_LIST_RENDERERS
+
     def get(self, request, format=None):
         user_id = request.query_params.get('id')
         start_date = request.query_params.get('start_date')
@@ -34,34 +52,58 @@ class FilteredUserEventView(APIView):
             user_id=user_id,
             date__range=[start_date, end_date]
         )
-        serializer = UserEventSerializer(user_events, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        paginator = EventKeysetPagination()
+        page = paginator.paginate_queryset(UserEventRowSerializer.values(user_events), request, view=self)
+        response = paginator.get_paginated_response(UserEventRowSerializer(page).data)
+        # Recurring series are expanded for the window and sent with the first page only.
+        if not request.query_params.get('cursor'):
+            response.data['occurrences'] = RecurringEvent.objects.filter(
+                type='solo', user_id=user_id
+            ).occurrences(parse_date(start_date), parse_date(end_date))
+        return response
 
 class EventSlotSubmissionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        serializer = EventSubmissionSerializer(data=request.data, context={'request': request})
+        mode = conflict_mode(request)
+        if mode is None:
+            return Response({"error": f"conflicts must be one of {ALLOW}, {REJECT} or {SKIP}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        serializer = EventSubmissionSerializer(data=request.data, context={'request': request, 'conflicts': mode})
         if serializer.is_valid():
-            events = serializer.save()
-            return Response({"message": f"{len(events)} events created."}, status=status.HTTP_201_CREATED)
+            try:
+                events = serializer.save()
+            except EventConflictError as error:
+                return Response({"error": "Some slots overlap existing events or each other.",
+                                 "conflicts": error.conflicts}, status=status.HTTP_409_CONFLICT)
+            data = {
+                "message": f"{len(events)} events created.",
+                "ids": [event.id for event in events],
+            }
+            if mode == SKIP:
+                data["skipped"] = serializer.skipped
+            return Response(data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 class EventSubmissionView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
-    def _get_group_member_emails(self, group):
+    def _get_group_member_emails(self, group_id):
         """Get email addresses of all group members except the requesting user."""
-        return list(GroupMembership.objects.filter(group=group)
+        return list(GroupMembership.objects.filter(group_id=group_id)
                    .exclude(user=self.request.user)
                    .select_related('user')
                    .values_list('user__email', flat=True))
 
-    def _send_group_event_notification(self, event, action):
-        """Send email notification to group members about event actions."""
-        if event.type != 'group' or not event.group:
-            print(f"No notification sent for event {event.id}: Not a group event or no group specified")
+    def _queue_group_event_notification(self, event, action):
+        """Queue email notifications to group members in the current transaction.
+
+        The run_outbox management command delivers them, so SMTP latency and
+        outages never reach the request.
+        """
+        if event.type != 'group' or not event.group_id:
             return
 
         subject = f"Group Event {action}: {event.description}"
@@ -73,58 +115,57 @@ class EventSubmissionView(APIView):
             f"Location: {event.location or 'Not specified'}\n"
             f"Modified by: {self.request.user.username}"
         )
-        from_email = settings.DEFAULT_FROM_EMAIL
-        recipient_list = self._get_group_member_emails(event.group)
-        print(f"Attempting to send emails for event {event.id} to: {recipient_list}")
-
-        if recipient_list:
-            messages = [(subject, message, from_email, [email]) for email in recipient_list]
-            try:
-                sent = send_mass_mail(messages, fail_silently=False)
-
-                print(f"Sent {sent} email notifications for event {event.id}")
-            except Exception as e:
-                print(f"Failed to send email notifications for event {event.id}: {str(e)}")
-        else:
-            print(f"No recipients found for event {event.id} notification")
+        recipient_list = self._get_group_member_emails(event.group_id)
+        EmailOutbox.objects.enqueue(subject, message, settings.DEFAULT_FROM_EMAIL, recipient_list)
 
     def _create_participation_records(self, event):
         """Create EventParticipation records for group members."""
-        if event.type != 'group' or not event.group:
-            return
-
-        members = GroupMembership.objects.filter(group=event.group).exclude(user=self.request.user)
-        for membership in members:
-            EventParticipation.objects.get_or_create(
-                user=membership.user,
-                event=event,
-                defaults={'response': 'maybe'}
-            )
-            print(f"Created participation record for {membership.user.username} in event {event.id}")
+        EventParticipation.objects.create_for_event(event, exclude_user=self.request.user)
+
+    def _conflicts(self, validated_data, user):
+        """Existing events of the new event's owner that it overlaps."""
+        group = validated_data.get('group')
+        events = overlapping_events(
+            validated_data.get('type'), user.id if user else None, group.id if group else None,
+            validated_data['date'], validated_data['start_time'], validated_data['end_time'],
+        )
+        return [
+            {"event": event_id, "date": day, "start_time": start_time, "end_time": end_time,
+             "description": description}
+            for event_id, day, start_time, end_time, description
+            in events.values_list('id', 'date', 'start_time', 'end_time', 'description')
+        ]
 
     def post(self, request):
+        mode = conflict_mode(request, (ALLOW, REJECT))
+        if mode is None:
+            return Response({"error": f"conflicts must be {ALLOW} or {REJECT}."},
+                            status=status.HTTP_400_BAD_REQUEST)
         serializer = UserEventSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             event_type = serializer.validated_data.get('type')
             group = serializer.validated_data.get('group')
 
             if event_type == 'group':
+                # The serializer already rejected unknown group ids.
                 if not group:
                     return Response({"error": "Group event must have a group."}, status=status.HTTP_400_BAD_REQUEST)
-                # Validate group exists
-                if not Group.objects.filter(id=group.id).exists():
-                    return Response({"error": "Specified group does not exist."}, status=status.HTTP_400_BAD_REQUEST)
 
-                membership = GroupMembership.objects.filter(user=request.user, group=group).first()
-                if not membership or not membership.can_create_events():
+                if not roles.can_create_events(request.user, group.id, request):
                     return Response({"error": "You don't have permission to create group events."},
                                     status=status.HTTP_403_FORBIDDEN)
 
             # Set user only for solo events
             user = request.user if event_type == 'solo' else None
-            event = serializer.save(user=user)
-            self._create_participation_records(event)
-            self._send_group_event_notification(event, "Created")
+            with transaction.atomic():
+                if mode == REJECT:
+                    found = self._conflicts(serializer.validated_data, user)
+                    if found:
+                        return Response({"error": "The event overlaps existing events.", "conflicts": found},
+                                        status=status.HTTP_409_CONFLICT)
+                event = serializer.save(user=user)
+                self._create_participation_records(event)
+                self._queue_group_event_notification(event, "Created")
             return Response(UserEventSerializer(event).data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -137,14 +178,14 @@ class EventSubmissionView(APIView):
         event = get_object_or_404(UserEvent, id=event_id)
 
         if event.type == 'solo':
-            if event.user != request.user:
+            if event.user_id != request.user.id:
                 return Response({"error": "You don't have permission to edit this solo event."},
                                 status=status.HTTP_403_FORBIDDEN)
         elif event.type == 'group':
-            if not event.group or not Group.objects.filter(id=event.group.id).exists():
+            # group_id is a cascading FK, so a set id always points at an existing group.
+            if not event.group_id:
                 return Response({"error": "Associated group does not exist."}, status=status.HTTP_400_BAD_REQUEST)
-            membership = GroupMembership.objects.filter(user=request.user, group=event.group).first()
-            if not membership or not membership.can_modify_events():
+            if not roles.can_modify_events(request.user, event.group_id, request):
                 return Response({"error": "You don't have permission to edit this group event."},
                                 status=status.HTTP_403_FORBIDDEN)
 
@@ -152,8 +193,9 @@ class EventSubmissionView(APIView):
         if serializer.is_valid():
             # Set user only for solo events
             user = request.user if serializer.validated_data.get('type') == 'solo' else None
-            updated_event = serializer.save(user=user)
-            self._send_group_event_notification(updated_event, "Updated")
+            with transaction.atomic():
+                updated_event = serializer.save(user=user)
+                self._queue_group_event_notification(updated_event, "Updated")
             return Response(UserEventSerializer(updated_event).data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -165,31 +207,41 @@ class EventSubmissionView(APIView):
         event = get_object_or_404(UserEvent, id=event_id)
 
         if event.type == 'solo':
-            if event.user != request.user:
+            if event.user_id != request.user.id:
                 return Response({"error": "You don't have permission to delete this solo event."},
                                 status=status.HTTP_403_FORBIDDEN)
         elif event.type == 'group':
-            if not event.group or not Group.objects.filter(id=event.group.id).exists():
+            if not event.group_id:
                 return Response({"error": "Associated group does not exist."}, status=status.HTTP_400_BAD_REQUEST)
-            membership = GroupMembership.objects.filter(user=request.user, group=event.group).first()
-            if not membership or not membership.can_delete_events():
+            if not roles.can_delete_events(request.user, event.group_id, request):
                 return Response({"error": "Only group owners can delete this group event."},
                                 status=status.HTTP_403_FORBIDDEN)
 
-        self._send_group_event_notification(event, "Deleted")
-        event.delete()
+        with transaction.atomic():
+            self._queue_group_event_notification(event, "Deleted")
+            event.delete()
         return Response({"message": "Event deleted."}, status=status.HTTP_204_NO_CONTENT)
 
 
+@method_decorator(gzip_large_responses, name='dispatch')
 class UserEventListView(APIView):
     permission_classes = [IsAuthenticated]
+    renderer_classes = EVENT_LIST_RENDERERS
 
     def get(self, request):
         user = request.user
         start_date = parse_date(request.GET.get('start_date'))
         end_date = parse_date(request.GET.get('end_date'))
 
-        user_group_ids = GroupMembership.objects.filter(user=user).values_list('group_id', flat=True)
+        cache_key = calendar_cache.page_key(user.id, {
+            name: request.GET.get(name, '') for name in ('start_date', 'end_date', 'cursor', 'page_size')
+        })
+        cached = calendar_cache.get_page(cache_key)
+        if cached is not None:
+            next_cursor, data = cached
+            return Response({'next': EventKeysetPagination.link(request, next_cursor), **data})
+
+        user_group_ids = list(roles.get_roles(user.id, request))
 
         events = UserEvent.objects.filter(
             Q(type='solo', user=user) |
@@ -198,7 +250,23 @@ class UserEventListView(APIView):
             date__range=(start_date, end_date)
         )
 
-        serializer = UserEventSerializer(events, many=True)
-        return Response(serializer.data)
+        paginator = EventKeysetPagination()
+        page = paginator.paginate_queryset(UserEventRowSerializer.values(events), request, view=self)
+        response = paginator.get_paginated_response(UserEventRowSerializer(page).data)
+        # Recurring series are expanded for the window and sent with the first page only.
+        if not request.GET.get('cursor'):
+            response.data['occurrences'] = RecurringEvent.objects.filter(
+                Q(type='solo', user=user) |
+                Q(type='group', group_id__in=user_group_ids)
+            ).occurrences(start_date, end_date)
+        calendar_cache.set_page(cache_key, paginator.next_cursor,
+                                {name: value for name, value in response.data.items() if name != 'next'})
+        return response
     
 
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def calendar_cache_stats(request):
+    return Response(calendar_cache.stats())
@@ -1,6 +1,8 @@
+from .. import roles
+from ..group_search import GroupSearchFilter, not_member
 from ..models import Group, GroupMembership
 from ..serializers import GroupSerializer, GroupMembershipSerializer
-from rest_framework import viewsets, permissions, status, filters
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
@@ -10,16 +12,16 @@ from rest_framework.permissions import IsAuthenticated
 class GroupViewSet(viewsets.ModelViewSet):
     serializer_class = GroupSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name']
+    filter_backends = [GroupSearchFilter]
 
     def get_queryset(self):
-        user_groups = GroupMembership.objects.filter(user=self.request.user).values_list('group_id', flat=True)
-        return Group.objects.exclude(id__in=user_groups)
+        return Group.objects.filter(not_member(self.request.user))
 
     def perform_create(self, serializer):
         group = serializer.save(owner=self.request.user)
         GroupMembership.objects.create(user=self.request.user, group=group, role='owner')
+        # The membership signal counted the owner in the database only.
+        group.refresh_from_db(fields=['member_count'])
 
 class GroupMembershipViewSet(viewsets.ModelViewSet):
     queryset = GroupMembership.objects.all()
@@ -63,12 +65,11 @@ def remove_user_from_group(request, group_id, user_id):
     requester = request.user
     group = get_object_or_404(Group, id=group_id)
 
-    try:
-        requester_membership = GroupMembership.objects.get(user=requester, group=group)
-    except GroupMembership.DoesNotExist:
+    requester_role = roles.get_role(requester, group.id, request)
+    if requester_role is None:
         return Response({"detail": "You are not a member of this group."}, status=status.HTTP_403_FORBIDDEN)
 
-    if requester_membership.role != 'owner':
+    if requester_role != 'owner':
         return Response({"detail": "Only the group owner can remove users."}, status=status.HTTP_403_FORBIDDEN)
 
     if requester.id == user_id:
@@ -103,10 +104,12 @@ def get_user_group_role(request):
         return Response({"error": "Missing group_id or user_id"}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        membership = GroupMembership.objects.get(group_id=group_id, user_id=user_id)
-        return Response({"role": membership.role}, status=status.HTTP_200_OK)
-    except GroupMembership.DoesNotExist:
+        role = roles.get_roles(int(user_id), request).get(int(group_id))
+    except ValueError:
+        return Response({"error": "group_id and user_id must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+    if role is None:
         return Response({"error": "User is not a member of this group"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({"role": role}, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -148,12 +151,11 @@ def update_user_role_in_group(request, group_id, user_id):
     requester = request.user
     group = get_object_or_404(Group, id=group_id)
 
-    try:
-        requester_membership = GroupMembership.objects.get(user=requester, group=group)
-        if requester_membership.role != 'owner':
-            return Response({"detail": "Only the group owner can update roles."}, status=status.HTTP_403_FORBIDDEN)
-    except GroupMembership.DoesNotExist:
+    requester_role = roles.get_role(requester, group.id, request)
+    if requester_role is None:
         return Response({"detail": "You are not a member of this group."}, status=status.HTTP_403_FORBIDDEN)
+    if requester_role != 'owner':
+        return Response({"detail": "Only the group owner can update roles."}, status=status.HTTP_403_FORBIDDEN)
 
     if requester.id == user_id:
         return Response({"detail": "Group owner cannot change their own role."}, status=status.HTTP_400_BAD_REQUEST)
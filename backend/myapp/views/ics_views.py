@@ -0,0 +1,142 @@
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.decorators import (
+    api_view, authentication_classes, parser_classes, permission_classes, renderer_classes,
+)
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .. import ics, roles
+from ..ics_import import ICSImporter
+from ..models import CalendarFeedToken, Group
+
+class ICalendarRenderer(BaseRenderer):
+    """Lets calendar clients asking for text/calendar through content negotiation.
+
+    Feeds themselves are streamed; only error bodies pass through here.
+    """
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'error' in data:
+            return str(data['error'])
+        return str(data or '')
+
+
+class FeedKeyAuthentication(BaseAuthentication):
+    """``?key=`` with the user's CalendarFeedToken, for calendar apps polling a subscription.
+
+    JWTs expire after minutes, so subscribed calendars authenticate with a
+    long-lived key that only opens the feeds and can be rotated.
+    """
+
+    def authenticate(self, request):
+        key = request.query_params.get('key')
+        if not key:
+            return None
+        token = CalendarFeedToken.objects.select_related('user').filter(key=key).first()
+        if token is None or not token.user.is_active:
+            raise AuthenticationFailed("Invalid calendar feed key.")
+        return token.user, token
+
+
+# JWT first: its WWW-Authenticate challenge keeps unauthenticated requests at 401.
+FEED_AUTHENTICATION = [*api_settings.DEFAULT_AUTHENTICATION_CLASSES, FeedKeyAuthentication]
+
+
+def _ics_response(request, name, filename, events, series, group_ids=()):
+    """Stream a feed, or answer 304 when the client's copy is still current."""
+    etag, last_modified = ics.feed_version(events, series, group_ids)
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    not_modified = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = StreamingHttpResponse(ics.stream_calendar(name, events, series),
+                                     content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes(FEED_AUTHENTICATION)
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, ICalendarRenderer])
+def user_calendar_feed(request):
+    user = request.user
+    group_ids = list(roles.get_roles(user.id, request))
+    events, series = ics.user_calendar(user.id, group_ids)
+    return _ics_response(request, f"{user.username} calendar", "calendar.ics", events, series, group_ids)
+
+
+@api_view(['GET'])
+@authentication_classes(FEED_AUTHENTICATION)
+@permission_classes([IsAuthenticated])
+@renderer_classes([JSONRenderer, ICalendarRenderer])
+def group_calendar_feed(request, group_id):
+    group = get_object_or_404(Group, id=group_id)
+    if not roles.is_member(request.user, group.id, request):
+        return Response({"error": "You are not a member of this group."}, status=status.HTTP_403_FORBIDDEN)
+    events, series = ics.group_calendar(group.id)
+    return _ics_response(request, group.name, f"group-{group.id}.ics", events, series)
+
+
+@api_view(['GET', 'POST', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def calendar_feed_key(request):
+    """The user's feed key and subscription link: GET reads or creates it, POST rotates it, DELETE revokes it."""
+    if request.method == 'DELETE':
+        CalendarFeedToken.objects.filter(user=request.user).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    token = CalendarFeedToken.objects.filter(user=request.user).first()
+    if token is None or request.method == 'POST':
+        token = CalendarFeedToken.objects.rotate(request.user)
+    return Response({
+        "key": token.key,
+        "feed_url": request.build_absolute_uri(reverse('user-calendar-feed')) + f"?key={token.key}",
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def import_calendar(request):
+    """Import an uploaded .ics file as solo events, or as events of ``group``.
+
+    The upload is parsed line by line and written in batches; the response
+    reports counts, throughput and the rows that could not be imported.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "Upload an .ics file in the 'file' field."}, status=status.HTTP_400_BAD_REQUEST)
+
+    group = None
+    group_id = request.data.get('group')
+    if group_id:
+        try:
+            group_id = int(group_id)
+        except (TypeError, ValueError):
+            return Response({"error": "group must be an integer id."}, status=status.HTTP_400_BAD_REQUEST)
+        group = get_object_or_404(Group, id=group_id)
+        if not roles.can_create_events(request.user, group.id, request):
+            return Response({"error": "You don't have permission to create group events."},
+                            status=status.HTTP_403_FORBIDDEN)
+
+    report = ICSImporter(request.user, group).run(upload)
+    report['error_count'] = len(report['errors']) + report['errors_truncated']
+    return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
@@ -3,7 +3,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from ..models import GroupMembership, UserEvent, EventParticipation
+from .. import roles
+from ..models import UserEvent, EventParticipation
 from ..serializers import EventParticipationSerializer
 
 @api_view(["POST"])
@@ -23,7 +24,7 @@ def respond_to_event(request, event_id):
     if event.type != "group":
         return Response({"error": "Only group events support participation responses."}, status=400)
 
-    if not GroupMembership.objects.filter(user=user, group=event.group).exists():
+    if not roles.is_member(user, event.group_id, request):
         return Response({"error": "You are not a member of this group."}, status=403)
 
     participation, created = EventParticipation.objects.get_or_create(
@@ -1,26 +1,23 @@
 from rest_framework import permissions
-from ..models import GroupMembership, UserEvent
+from .. import roles
 
 class IsGroupAdminOrOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        if obj.type == 'group' and obj.group:
-            membership = GroupMembership.objects.filter(user=request.user, group=obj.group).first()
-            return membership and membership.can_modify_events()
+        if obj.type == 'group' and obj.group_id:
+            return roles.can_modify_events(request.user, obj.group_id, request)
         return False
 
 class IsEventOwnerOrGroupAdmin(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if obj.type == 'solo':
-            return obj.user == request.user
+            return obj.user_id == request.user.id
         if obj.type == 'group':
-            membership = GroupMembership.objects.filter(user=request.user, group=obj.group).first()
-            return membership and membership.can_modify_events()
+            return roles.can_modify_events(request.user, obj.group_id, request)
         return False
 
 class CanDeleteGroupEvent(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if obj.type == 'group':
-            membership = GroupMembership.objects.filter(user=request.user, group=obj.group).first()
-            return membership and membership.can_delete_events()
+            return roles.can_delete_events(request.user, obj.group_id, request)
         return False
     
\ No newline at end of file
@@ -0,0 +1,48 @@
+from django.db.models import Q
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import PermissionDenied
+
+from .. import roles
+from ..models import RecurringEvent
+from ..serializers import RecurringEventSerializer
+
+
+class RecurringEventViewSet(viewsets.ModelViewSet):
+    serializer_class = RecurringEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        group_ids = list(roles.get_roles(user.id, self.request))
+        return RecurringEvent.objects.filter(
+            Q(type='solo', user=user) | Q(type='group', group_id__in=group_ids)
+        ).order_by('start_date', 'start_time', 'id')
+
+    def _check_group_permission(self, group, check, message):
+        if group is not None and not check(self.request.user, group.id, self.request):
+            raise PermissionDenied(message)
+
+    def perform_create(self, serializer):
+        is_solo = serializer.validated_data['type'] == 'solo'
+        if not is_solo:
+            self._check_group_permission(serializer.validated_data['group'], roles.can_create_events,
+                                         "You don't have permission to create group events.")
+        serializer.save(user=self.request.user if is_solo else None)
+
+    def perform_update(self, serializer):
+        instance = serializer.instance
+        if instance.type == 'group':
+            self._check_group_permission(instance.group, roles.can_modify_events,
+                                         "You don't have permission to edit this group event.")
+        event_type = serializer.validated_data.get('type', instance.type)
+        if event_type == 'group':
+            self._check_group_permission(serializer.validated_data.get('group', instance.group),
+                                         roles.can_modify_events,
+                                         "You don't have permission to edit this group event.")
+        serializer.save(user=self.request.user if event_type == 'solo' else None)
+
+    def perform_destroy(self, instance):
+        if instance.type == 'group':
+            self._check_group_permission(instance.group, roles.can_delete_events,
+                                         "Only group owners can delete this group event.")
+        instance.delete()
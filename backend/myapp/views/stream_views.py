@@ -0,0 +1,53 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+
+from .. import push, roles
+from .async_views import aauthenticate
+
+# Idle streams send a comment this often so proxies keep the connection open.
+KEEPALIVE_SECONDS = 15
+
+
+async def _stream(user_id, subscription):
+    try:
+        yield push.encode("ready", {"channels": sorted(subscription.channels)})
+        while True:
+            message = await subscription.get(KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keepalive\n\n"
+                continue
+            kind, data, frame = message
+            # Follow the caller's own membership changes.
+            if kind == "membership" and data['user'] == user_id:
+                subscription.add(push.group_channel(data['group']))
+            elif kind == "membership.delete" and data['user'] == user_id:
+                subscription.discard(push.group_channel(data['group']))
+            yield frame
+    finally:
+        subscription.close()
+
+
+async def event_stream(request):
+    """Server-sent events for the caller's own and group calendars.
+
+    Frames are named ``event``, ``event.delete``, ``participation``,
+    ``participation.delete``, ``membership``, ``membership.delete`` and
+    ``resync``; the last one means "reload through events/changes/".
+    Only served under ASGI, since a WSGI worker would be held per client.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "The event stream needs the ASGI server (backend.asgi)."},
+                            status=status.HTTP_501_NOT_IMPLEMENTED)
+    user, error = await aauthenticate(request, allow_query_token=True)
+    if error:
+        return error
+
+    group_ids = list(await roles.aget_roles(user.id))
+    channels = [push.user_channel(user.id)] + [push.group_channel(group_id) for group_id in group_ids]
+    subscription = push.get_broker().subscribe(channels)
+
+    response = StreamingHttpResponse(_stream(user.id, subscription), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
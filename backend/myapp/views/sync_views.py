@@ -0,0 +1,117 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..models import ChangeTombstone, EventParticipation, GroupMembership, UserEvent
+from ..serializers import EventParticipationSerializer, UserEventSerializer
+
+# Rows committed slightly after a token was issued can carry an older
+# timestamp, so every feed re-reads this much history. Clients upsert by id.
+SYNC_OVERLAP = timedelta(seconds=5)
+# Tombstones older than this are pruned; older tokens need a full reload.
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+
+def encode_sync_token(moment):
+    return urlsafe_b64encode(moment.isoformat().encode()).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    try:
+        moment = datetime.fromisoformat(urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode())
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return moment if timezone.is_aware(moment) else None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def event_changes(request):
+    """Delta sync for the caller's calendar.
+
+    Without ``sync_token`` every visible event in start_date..end_date is
+    returned. With a token only events and participations changed since then
+    are returned, plus ids of deleted events and groups the caller left.
+    Either way the response carries the token for the next call.
+    """
+    user = request.user
+    now = timezone.now()
+    token = request.query_params.get('sync_token')
+    start_date = parse_date(request.query_params.get('start_date') or '')
+    end_date = parse_date(request.query_params.get('end_date') or '')
+
+    memberships = list(GroupMembership.objects.filter(user=user).values_list('group_id', 'joined_at'))
+    group_ids = [group_id for group_id, _ in memberships]
+    visible = Q(type='solo', user=user) | Q(type='group', group_id__in=group_ids)
+
+    events = UserEvent.objects.filter(visible)
+    if start_date and end_date:
+        events = events.filter(date__range=(start_date, end_date))
+    participations = EventParticipation.objects.filter(event__type='group', event__group_id__in=group_ids)
+
+    if token is None:
+        if not start_date or not end_date:
+            return Response({"error": "start_date and end_date are required for the initial sync."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        participations = participations.filter(event__in=events)
+        return Response({
+            "sync_token": encode_sync_token(now),
+            "events": UserEventSerializer(events, many=True).data,
+            "participations": EventParticipationSerializer(participations, many=True).data,
+            "deleted_events": [],
+            "deleted_participations": [],
+            "removed_groups": [],
+        }, status=status.HTTP_200_OK)
+
+    since = decode_sync_token(token)
+    if since is None:
+        return Response({"error": "Invalid sync_token."}, status=status.HTTP_400_BAD_REQUEST)
+    if since < now - TOMBSTONE_RETENTION:
+        return Response({"error": "sync_token expired, reload the full window."}, status=status.HTTP_410_GONE)
+    since -= SYNC_OVERLAP
+
+    # Joining a group makes all of its events new to this user.
+    joined_group_ids = [group_id for group_id, joined_at in memberships if joined_at > since]
+    changed_events = events.filter(Q(updated_at__gt=since) | Q(group_id__in=joined_group_ids))
+    changed_participations = participations.filter(
+        Q(responded_at__gt=since) | Q(event__group_id__in=joined_group_ids)
+    )
+    if start_date and end_date:
+        changed_participations = changed_participations.filter(event__date__range=(start_date, end_date))
+
+    tombstones = ChangeTombstone.objects.filter(deleted_at__gt=since).filter(
+        Q(kind='event', user_id=user.id) |
+        Q(kind='event', group_id__in=group_ids) |
+        Q(kind='participation', object_id__in=UserEvent.objects.filter(group_id__in=group_ids).values('id')) |
+        Q(kind='membership', user_id=user.id)
+    ).values_list('kind', 'object_id', 'user_id')
+
+    # Events moved between calendars leave a tombstone for their old audience;
+    # callers who can still see them get them as changed instead.
+    changed_event_data = UserEventSerializer(changed_events, many=True).data
+    changed_event_ids = {event['id'] for event in changed_event_data}
+    deleted_events, deleted_participations, removed_groups = [], [], []
+    for kind, object_id, user_id in tombstones:
+        if kind == 'event':
+            if object_id not in changed_event_ids:
+                deleted_events.append(object_id)
+        elif kind == 'participation':
+            deleted_participations.append({"user": user_id, "event": object_id})
+        elif object_id not in group_ids:
+            removed_groups.append(object_id)
+
+    return Response({
+        "sync_token": encode_sync_token(now),
+        "events": changed_event_data,
+        "participations": EventParticipationSerializer(changed_participations, many=True).data,
+        "deleted_events": list(dict.fromkeys(deleted_events)),
+        "deleted_participations": deleted_participations,
+        "removed_groups": removed_groups,
+    }, status=status.HTTP_200_OK)
@@ -7,17 +7,26 @@ import { fetchWithAuth } from "@/utils/fetchWithAuth";
 import { UserEvent } from "@/interfaces";
 
 const fetchAvailability = async (startDate: string, endDate: string, navigate: NavigateFunction) => {
-  const res = await fetchWithAuth(`/api/events/?start_date=${startDate}&end_date=${endDate}`, {
-    method: "GET",
-    headers: getAuthHeaders(),
-  }, navigate);
-  return res.json();
+  const events: UserEvent[] = [];
+  let url: string | null = `/api/events/?start_date=${startDate}&end_date=${endDate}`;
+
+  // The endpoint is cursor paginated; follow `next` until the window is complete.
+  while (url) {
+    const res = await fetchWithAuth(url, {
+      method: "GET",
+      headers: getAuthHeaders(),
+    }, navigate);
+    const page: { next: string | null; results: UserEvent[] } = await res.json();
+    events.push(...page.results);
+    url = page.next ? new URL(page.next).pathname + new URL(page.next).search : null;
+  }
+  return events;
 };
 
 export default function AvailabilityPage() {
   const navigate = useNavigate();
   const [currentDate, setCurrentDate] = useState(new Date());
-  const [data, setData] = useState([]);
+  const [data, setData] = useState<UserEvent[]>([]);
   const [loading, setLoading] = useState(true);
 
   const weekStart = startOfWeek(currentDate, { weekStartsOn: 1 });